@@ -7,7 +7,6 @@ Définit les agents :
 - MemoryAgent : agent spécialisé mémoire, wrappe memory_core
 """
 
-import os
 import yaml
 import logging
 from pathlib import Path
@@ -21,6 +20,7 @@ except ImportError:
     raise ImportError("pyautogen n'est pas installé. Installez-le avec: pip install pyautogen")
 
 from drivers.fs_driver import FSDriver
+from drivers.llm_driver import llm_client_settings
 from memory.memory_core import init_db, save_item, get_items, search_items, update_item, delete_item
 from memory.helpers import save_note, save_todo, save_process, save_protocol
 from memory.contacts import save_contact, find_contacts, get_all_contacts, update_contact
@@ -36,21 +36,19 @@ def build_llm_config() -> Dict[str, Any]:
     with open(config_path, "r", encoding="utf-8") as f:
         cfg = yaml.safe_load(f) or {}
     
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY not found in environment variables")
+    # Clé et URL : API OpenAI, ou serveur LLM simulé si mock_llm.enabled
+    client_settings = llm_client_settings(cfg)
     
     model = cfg.get("model", "gpt-5.1")
     temperature = float(cfg.get("temperature", 0.7))
-    base_url = cfg.get("base_url") or os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
     
     return {
         "temperature": temperature,
         "config_list": [
             {
                 "model": model,
-                "api_key": api_key,
-                "base_url": base_url,
+                "api_key": client_settings["api_key"],
+                "base_url": client_settings["base_url"],
                 "price": [0.000002, 0.000006],  # Pour supprimer le warning Autogen
             }
         ],
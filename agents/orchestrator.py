@@ -7,13 +7,21 @@ Gère la conversation, l'historique et appelle le LLM
 import yaml
 import json
 import re
+import threading
 from datetime import datetime
 from drivers.llm_driver import LLMDriver
 from utils.logger import DebugLogger
 from memory.helpers import save_note, save_todo, save_process, save_protocol
-from memory.memory_core import get_items, search_items, delete_item, save_preference, update_item
+from memory.memory_core import get_items, search_items, delete_item, delete_items, save_preference, update_item
 from memory.contacts import save_contact, update_contact, find_contacts, get_all_contacts
+from memory.dedup import merge_into_existing, DUPLICATE_MIN_SCORE
+from memory.tagging import STOPWORDS
+from memory.retrieval import retrieve_context, format_contact_line, DEFAULT_TOP_K, DEFAULT_TOKEN_BUDGET
 from agents.helpers import set_fs_driver, execute_fs_action
+from agents.sessions import SessionManager, SessionState
+from agents.summarizer import ConversationSummarizer
+from agents.streaming import ActionBlockFilter
+from utils.prompt import assemble_prompt, DEFAULT_PROMPT_TOKEN_BUDGET
 from drivers.fs_driver import FSDriver
 from typing import Optional
 
@@ -21,6 +29,21 @@ from typing import Optional
 class Orchestrator:
     """Orchestrateur central de Clara"""
     
+    # Mots désignant chaque type d'item dans un message
+    MEMORY_TYPE_WORDS = {
+        'note': ('note',),
+        'todo': ('todo', 'tâche'),
+        'process': ('process', 'processus', 'procédure'),
+        'protocol': ('protocol', 'protocole'),
+    }
+    
+    # Mots d'intention retirés de la requête de recherche (préfixes)
+    RETRIEVAL_IGNORED_STEMS = (
+        'cherch', 'trouv', 'recherch', 'montr', 'list', 'affich', 'voir', 'consult',
+        'note', 'todo', 'tâche', 'process', 'procédure', 'protocol',
+        'contact', 'numéro', 'email', 'téléphone', 'phone', 'mémoire',
+    )
+    
     def __init__(self, config_path="config/settings.yaml", fs_driver: Optional[FSDriver] = None):
         # Charger la configuration
         with open(config_path, 'r', encoding='utf-8') as f:
@@ -33,9 +56,14 @@ class Orchestrator:
         if fs_driver:
             set_fs_driver(fs_driver)
         
-        # Historique de conversation (en mémoire RAM)
-        self.conversation_history = []
+        # Historique de conversation par session (LRU en RAM, persisté en base)
         self.max_history = self.config.get('max_history_messages', 20)
+        # Messages sortis de l'historique : résumé glissant calculé en arrière-plan
+        self.sessions = SessionManager.from_config(
+            self.config, summarizer=ConversationSummarizer.from_config(self.config, self.llm_driver.generate)
+        )
+        # Session et logger du tour en cours, propres à chaque thread de requête
+        self._turn = threading.local()
         
         # System prompt
         self.system_prompt = self._build_system_prompt()
@@ -246,21 +274,49 @@ RÈGLE ABSOLUE : Ne JAMAIS expliquer comment faire. EXÉCUTE directement l'actio
 Pour l'instant, tu es en phase de construction (Phase 2.5).
 Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et travailler avec des fichiers."""
     
-    def handle_message(self, user_message, session_id, debug_logger):
+    @property
+    def conversation_history(self):
+        """Historique de la session du tour en cours (vide hors d'un tour)"""
+        session = getattr(self._turn, 'session', None)
+        return session.history if session is not None else []
+    
+    @property
+    def _debug_logger_ref(self):
+        """Logger de debug du tour en cours (pour les pré-fetches)"""
+        return getattr(self._turn, 'debug_logger', None)
+    
+    def handle_message(self, user_message, session_id, debug_logger, on_delta=None, cancel_token=None):
         """
         Traite un message utilisateur
         
+        Les tours d'une même session sont sérialisés ; des sessions différentes
+        peuvent être traitées en parallèle sans partager leur historique.
+        
         Args:
             user_message: Message de l'utilisateur
             session_id: ID de la session
             debug_logger: Logger de debug
+            on_delta: Si fourni, la réponse du LLM est streamée et sa prose (sans les
+                blocs d'action JSON) est passée à on_delta(texte) au fil de l'eau ;
+                la réponse finale (avec le résultat des actions) reste retournée
+            cancel_token: CancelToken (drivers/llm_driver.py) qui annule l'appel LLM
+                en cours, ex: quand le client HTTP se déconnecte
         
         Returns:
             str: Réponse de Clara
         """
-        # Stocker la référence au logger pour les pré-fetches
-        self._debug_logger_ref = debug_logger
-        
+        session = self.sessions.get(session_id)
+        with session.lock:
+            self._turn.session = session
+            self._turn.debug_logger = debug_logger
+            try:
+                return self._handle_turn(session, user_message, debug_logger, on_delta, cancel_token)
+            finally:
+                self._turn.session = None
+                self._turn.debug_logger = None
+    
+    def _handle_turn(self, session: SessionState, user_message, debug_logger, on_delta=None, cancel_token=None):
+        """Traite un message dans une session dont le verrou est tenu"""
         try:
             # PRÉ-VÉRIFICATION : Détecter si c'est une demande de lecture mémoire
             memory_context = self._check_memory_read_intent(user_message)
@@ -268,28 +324,26 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
             # PRÉ-VÉRIFICATION : Détecter si c'est une demande de lecture filesystem
             fs_read_context = self._check_fs_read_intent(user_message)
             
-            # Ajouter le message utilisateur à l'historique
-            self.conversation_history.append({
-                'role': 'user',
-                'content': user_message
-            })
+            # Ajouter le message utilisateur à l'historique de la session
+            session.append('user', user_message)
             
-            # Construire les messages pour le LLM
-            messages = self._build_prompt()
-            
-            # Si on a un contexte mémoire, l'ajouter au prompt
+            # Construire les messages pour le LLM dans le budget de tokens
+            # (contexte mémoire puis fichier lu, ajoutés après l'historique)
+            contexts = []
             if memory_context:
-                messages.append({
-                    'role': 'system',
-                    'content': f"DONNÉES MÉMOIRE RÉELLES :\n{memory_context}"
-                })
-            
-            # Si on a un contexte filesystem (fichier lu), l'ajouter au prompt
+                contexts.append(f"DONNÉES MÉMOIRE RÉELLES :\n{memory_context}")
             if fs_read_context:
-                messages.append({
-                    'role': 'system',
-                    'content': f"CONTENU FICHIER RÉEL LU :\n{fs_read_context}"
-                })
+                contexts.append(f"CONTENU FICHIER RÉEL LU :\n{fs_read_context}")
+            messages, prompt_metrics = self._build_prompt(contexts)
+            
+            # Logger l'assemblage du prompt (tokens économisés par le budget)
+            debug_logger.log_execution(
+                step_type='prompt_build',
+                action='assemble',
+                params={'token_budget': prompt_metrics['token_budget']},
+                result=prompt_metrics,
+                error=None
+            )
             
             # Logger l'appel LLM
             debug_logger.log_execution(
@@ -300,8 +354,11 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
                 error=None
             )
             
-            # Appeler le LLM
-            response = self.llm_driver.generate(messages)
+            # Appeler le LLM (en streaming si un consommateur de deltas est fourni)
+            if on_delta is None:
+                response = self.llm_driver.generate(messages, cancel_token=cancel_token)
+            else:
+                response = self._generate_streaming(messages, on_delta, cancel_token)
             llm_raw_response = response['text']  # Réponse brute du LLM
             
             # Logger le résultat LLM
@@ -309,7 +366,11 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
                 step_type='llm_call',
                 action='generate',
                 params={'model': self.llm_driver.model},
-                result={'response_length': len(llm_raw_response), 'usage': response.get('usage')},
+                result={
+                    'response_length': len(llm_raw_response),
+                    'usage': response.get('usage'),
+                    'cached': response.get('cached', False)
+                },
                 error=None
             )
             
@@ -330,15 +391,8 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
             else:
                 clara_response = cleaned_response
             
-            # Ajouter la réponse à l'historique
-            self.conversation_history.append({
-                'role': 'assistant',
-                'content': clara_response
-            })
-            
-            # Limiter la taille de l'historique
-            if len(self.conversation_history) > self.max_history:
-                self.conversation_history = self.conversation_history[-self.max_history:]
+            # Ajouter la réponse à l'historique (tronqué à max_history par la session)
+            session.append('assistant', clara_response)
             
             # Extraire les données internes pour l'UI (utiliser la réponse brute du LLM pour la réflexion)
             internal_data = self._extract_internal_data(
@@ -386,6 +440,30 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
                 }
             }
     
+    def _generate_streaming(self, messages, on_delta, cancel_token=None):
+        """
+        Appelle le LLM en streaming et transmet la prose au fil de l'eau
+        
+        Les blocs d'action JSON sont retenus par ActionBlockFilter : ils sont
+        exécutés ensuite sur la réponse complète, comme en mode non streamé.
+        
+        Returns:
+            dict: {"text": réponse brute complète, "usage": {...}}
+        """
+        action_filter = ActionBlockFilter()
+        response = {'text': '', 'usage': None}
+        for event in self.llm_driver.generate_stream(messages, cancel_token=cancel_token):
+            if event['type'] == 'delta':
+                prose = action_filter.feed(event['text'])
+                if prose:
+                    on_delta(prose)
+            else:
+                response = {'text': event['text'], 'usage': event.get('usage'), 'cached': event.get('cached', False)}
+        tail = action_filter.flush()
+        if tail:
+            on_delta(tail)
+        return response
+    
     def _process_memory_action(self, response_text):
         """
         Extrait et exécute une action mémoire depuis la réponse du LLM
@@ -636,7 +714,11 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
                 contact = intent.get('contact')
                 if contact:
                     item_id = save_contact(contact)
-                    result_message = f"✓ Contact sauvegardé (ID: {item_id})"
+                    kept_id = self._merge_duplicate_contact(item_id)
+                    if kept_id != item_id:
+                        result_message = f"✓ Contact fusionné avec le contact existant (ID: {kept_id})"
+                    else:
+                        result_message = f"✓ Contact sauvegardé (ID: {item_id})"
                 else:
                     result_message = "⚠ Données contact manquantes"
             
@@ -719,50 +801,39 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
                     memory_ops.append({"action": "delete_item", "result": "error", "error": "ID manquant"})
             
             elif action == 'delete_all_notes':
-                items = get_items(type='note')
-                count = len(items)
+                # Suppression ensembliste : une seule requête DELETE
+                count = delete_items(type='note')
                 if count == 0:
                     result_message = "Aucune note à supprimer."
                     memory_ops.append({"action": "delete_all_notes", "result": "empty"})
                 else:
-                    for item in items:
-                        delete_item(item_id=item['id'])
                     result_message = f"✓ {count} note(s) supprimée(s)"
                     memory_ops.append({"action": "delete_all_notes", "result": "success", "count": count})
             
             elif action == 'delete_all_todos':
-                items = get_items(type='todo')
-                count = len(items)
+                count = delete_items(type='todo')
                 if count == 0:
                     result_message = "Aucun todo à supprimer."
                     memory_ops.append({"action": "delete_all_todos", "result": "empty"})
                 else:
-                    for item in items:
-                        delete_item(item_id=item['id'])
                     result_message = f"✓ {count} todo(s) supprimé(s)"
                     memory_ops.append({"action": "delete_all_todos", "result": "success", "count": count})
             
             elif action == 'delete_all_processes':
-                items = get_items(type='process')
-                count = len(items)
+                count = delete_items(type='process')
                 if count == 0:
                     result_message = "Aucun processus à supprimer."
                     memory_ops.append({"action": "delete_all_processes", "result": "empty"})
                 else:
-                    for item in items:
-                        delete_item(item_id=item['id'])
                     result_message = f"✓ {count} processus supprimé(s)"
                     memory_ops.append({"action": "delete_all_processes", "result": "success", "count": count})
             
             elif action == 'delete_all_protocols':
-                items = get_items(type='protocol')
-                count = len(items)
+                count = delete_items(type='protocol')
                 if count == 0:
                     result_message = "Aucun protocole à supprimer."
                     memory_ops.append({"action": "delete_all_protocols", "result": "empty"})
                 else:
-                    for item in items:
-                        delete_item(item_id=item['id'])
                     result_message = f"✓ {count} protocole(s) supprimé(s)"
                     memory_ops.append({"action": "delete_all_protocols", "result": "success", "count": count})
             
@@ -1163,25 +1234,23 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
         contact_keywords = ['contact', 'numéro', 'email', 'téléphone', 'téléphone', 'phone']
         is_contact_intent = any(kw in msg_lower for kw in contact_keywords)
         
+        # Termes de recherche (message sans les mots d'intention)
+        query = self._retrieval_query(msg_lower) if is_search_intent else ''
+        
+        if is_contact_intent and query:
+            # Contacts les plus pertinents pour la recherche (BM25 + vecteurs)
+            retrieved = self._retrieve_memory_context(query, sources=("contacts",))
+            if retrieved:
+                return f"CONTACTS PERTINENTS (recherche '{query}') :\n{retrieved}"
+            return f"CONTACTS: Aucun contact trouvé pour '{query}'."
+        
         if is_contact_intent and (is_list_intent or is_search_intent):
             # Interroger la DB AVANT l'appel LLM
             contacts = get_all_contacts(limit=20)
             if contacts:
                 context = f"CONTACTS ENREGISTRÉS ({len(contacts)} trouvé(s)) :\n"
                 for contact in contacts[:10]:
-                    name = contact.get('display_name', f"{contact.get('first_name', '')} {contact.get('last_name', '')}".strip())
-                    if not name:
-                        name = "Sans nom"
-                    phones = contact.get('phones', [])
-                    emails = contact.get('emails', [])
-                    context += f"- ID {contact.get('id')}: {name}"
-                    if phones:
-                        primary_phone = next((p for p in phones if p.get('primary')), phones[0])
-                        context += f" | Tél: {primary_phone.get('number', 'N/A')}"
-                    if emails:
-                        primary_email = next((e for e in emails if e.get('primary')), emails[0])
-                        context += f" | Email: {primary_email.get('address', 'N/A')}"
-                    context += "\n"
+                    context += format_contact_line(contact) + "\n"
                 return context
             else:
                 return "CONTACTS: Aucun contact enregistré."
@@ -1189,20 +1258,26 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
         if not (is_list_intent or is_search_intent):
             return None
         
-        # Détecter le type demandé
+        if query:
+            # Recherche : éléments les plus pertinents (items + préférences),
+            # pas les plus récents, dans la limite du budget de tokens
+            types = [
+                item_type for item_type, words in self.MEMORY_TYPE_WORDS.items()
+                if any(word in msg_lower for word in words)
+            ]
+            retrieved = self._retrieve_memory_context(
+                query, types=types or None, sources=("items", "preferences")
+            )
+            if retrieved:
+                return f"MÉMOIRE PERTINENTE (recherche '{query}') :\n{retrieved}"
+            return f"MÉMOIRE: Aucun élément trouvé pour '{query}'."
+        
+        # Liste (ou recherche sans terme) : items les plus récents par type
         result_parts = []
         
         if 'note' in msg_lower:
-            if is_search_intent:
-                # Extraire le mot-clé de recherche (simpliste)
-                words = msg_lower.split()
-                query = ' '.join(words[-3:])  # Derniers mots comme approximation
-                items = search_items(query=query, type='note', limit=20)
-                result_parts.append(f"NOTES (recherche '{query}'): {len(items)} trouvée(s)")
-            else:
-                items = get_items(type='note', limit=20)
-                result_parts.append(f"NOTES: {len(items)} en mémoire")
-            
+            items = get_items(type='note', limit=20)
+            result_parts.append(f"NOTES: {len(items)} en mémoire")
             for item in items[:5]:
                 result_parts.append(f"  - ID {item['id']}: {item['content'][:60]}")
         
@@ -1229,6 +1304,34 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
         
         return None
     
+    def _retrieval_query(self, msg_lower):
+        """Requête de recherche : le message sans les mots d'intention ni stopwords"""
+        words = re.findall(r'\w+', msg_lower)
+        kept = [
+            w for w in words
+            if w not in STOPWORDS and not any(w.startswith(stem) for stem in self.RETRIEVAL_IGNORED_STEMS)
+        ]
+        return ' '.join(kept)
+    
+    def _merge_duplicate_contact(self, contact_id):
+        """Fusionne un contact créé dans son doublon existant (téléphone ou email partagé) selon la section contacts"""
+        cfg = self.config.get('contacts') or {}
+        if not cfg.get('deduplicate_on_save', True):
+            return contact_id
+        return merge_into_existing(contact_id, min_score=cfg.get('duplicate_min_score', DUPLICATE_MIN_SCORE))
+    
+    def _retrieve_memory_context(self, query, types=None, sources=("items", "preferences", "contacts")):
+        """Bloc de contexte mémoire (fusion BM25 + vecteurs) selon memory_retrieval"""
+        cfg = self.config.get('memory_retrieval') or {}
+        result = retrieve_context(
+            query,
+            top_k=cfg.get('top_k', DEFAULT_TOP_K),
+            token_budget=cfg.get('token_budget', DEFAULT_TOKEN_BUDGET),
+            types=types,
+            sources=sources,
+        )
+        return result['context']
+    
     def _clean_response(self, response_text):
         """Nettoie la réponse en enlevant le bloc JSON"""
         return re.sub(r'```json\s*\{.*?\}\s*```', '', response_text, flags=re.DOTALL).strip()
@@ -1300,13 +1403,24 @@ Tu peux converser, gérer des notes/todos/processus/protocoles en mémoire, et t
         
         return internal
     
-    def _build_prompt(self):
-        """Construit le prompt complet avec system + historique"""
-        messages = [
-            {'role': 'system', 'content': self.system_prompt}
-        ]
+    def _build_prompt(self, contexts=None):
+        """
+        Construit le prompt complet (system + historique + contextes) sous budget de tokens
         
-        # Ajouter l'historique
-        messages.extend(self.conversation_history)
+        Le dernier message de l'historique est le tour courant.
         
-        return messages
+        Returns:
+            tuple: (messages, métriques de l'assemblage)
+        """
+        history = self.conversation_history
+        session = getattr(self._turn, 'session', None)
+        summary = session.summary if session is not None else ""
+        cfg = self.config.get('prompt') or {}
+        return assemble_prompt(
+            self.system_prompt,
+            history[:-1],
+            current=history[-1] if history else None,
+            contexts=contexts,
+            token_budget=cfg.get('token_budget', DEFAULT_PROMPT_TOKEN_BUDGET),
+            summary=f"RÉSUMÉ DE LA CONVERSATION PRÉCÉDENTE :\n{summary}" if summary else None,
+        )
@@ -0,0 +1,233 @@
+# Clara - Sessions
+"""
+État de conversation par session
+
+Chaque session_id a son propre historique (plus de contexte partagé entre
+utilisateurs). Les sessions actives vivent dans un cache LRU borné en taille
+et en durée ; une session évincée est réhydratée à la demande depuis la table
+session_messages, où chaque message est écrit au fil de l'eau.
+
+Les messages qui sortent de la fenêtre max_history sont confiés au résumeur
+(agents/summarizer.py, hors du chemin de la requête) qui maintient un résumé
+glissant par session, persisté dans session_summaries.
+
+Concurrence : le gestionnaire ne crée jamais deux états pour la même session
+(y compris pendant qu'une requête en cours tient un état déjà évincé), et
+chaque état porte un verrou qui sérialise les tours d'une même session.
+"""
+
+import sqlite3
+import logging
+import threading
+import weakref
+from typing import Optional
+
+from memory.connection import get_connection, transaction
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_SESSION_TTL = 3600  # secondes
+DEFAULT_MAX_HISTORY = 20
+
+
+class SessionState:
+    """Historique d'une session, résumé glissant et verrou de ses tours de conversation"""
+
+    def __init__(
+        self,
+        session_id: str,
+        history: list[dict],
+        max_history: int,
+        db_path: Optional[str] = None,
+        summary: str = "",
+        summarizer=None
+    ):
+        self.session_id = session_id
+        self.history = history
+        self.max_history = max(max_history, 0)
+        self.db_path = db_path
+        self.summarizer = summarizer
+        # Réentrant : un tour peut relire l'état de sa propre session
+        self.lock = threading.RLock()
+
+        # Résumé : verrou séparé, le résumeur ne doit pas attendre la fin d'un tour
+        self.summary = summary
+        self.summary_lock = threading.Lock()
+        self.pending_summary: list[dict] = []  # messages évincés pas encore résumés
+        self.summarizing = False
+        self.closed = False
+
+    def append(self, role: str, content: str) -> None:
+        """Ajoute un message à l'historique (tronqué à max_history) et le persiste"""
+        message = {'role': role, 'content': content}
+        with self.lock:
+            self.history.append(message)
+            # Pas de self.history[:-max_history] : avec 0, [:-0] ne retirerait rien
+            evicted = self.history[:max(len(self.history) - self.max_history, 0)]
+            del self.history[:len(evicted)]
+            _store_message(self.session_id, message, self.max_history, self.db_path)
+        if evicted and self.summarizer is not None:
+            self.summarizer.submit(self, evicted)
+
+    def set_summary(self, summary: str, messages_summarized: int) -> None:
+        """Remplace le résumé glissant et le persiste (ignoré si la session a été supprimée)"""
+        with self.summary_lock:
+            if self.closed:
+                return
+            self.summary = summary
+            _store_summary(self.session_id, summary, messages_summarized, self.db_path)
+
+    def close(self) -> None:
+        """Vide la session (suppression) ; un résumé en cours de calcul sera ignoré"""
+        with self.lock, self.summary_lock:
+            self.history.clear()
+            self.summary = ""
+            self.pending_summary.clear()
+            self.closed = True
+
+
+class SessionManager:
+    """Sessions actives en LRU (taille + TTL), réhydratées depuis la base à la demande"""
+
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        ttl: Optional[float] = DEFAULT_SESSION_TTL,
+        max_history: int = DEFAULT_MAX_HISTORY,
+        db_path: Optional[str] = None,
+        summarizer=None
+    ):
+        """
+        Args:
+            max_sessions: Nombre maximum de sessions gardées en mémoire
+            ttl: Inactivité (secondes) avant éviction (None = pas d'expiration)
+            max_history: Messages conservés par session (en mémoire et en base, 0 = aucun)
+            db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+            summarizer: ConversationSummarizer des messages évincés (None = oubliés)
+        """
+        # Négatif = 0 (un LIMIT négatif relirait tout l'historique)
+        self.max_history = max(max_history, 0)
+        self.db_path = db_path
+        self.summarizer = summarizer
+        self._cache = LRUCache(max_size=max_sessions, ttl=ttl)
+        # États encore référencés (tour en cours) même après éviction du cache
+        self._live: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict, db_path: Optional[str] = None, summarizer=None) -> "SessionManager":
+        """Construit le gestionnaire depuis settings.yaml (section sessions, max_history_messages)"""
+        settings = config.get('sessions') or {}
+        return cls(
+            max_sessions=settings.get('max_sessions', DEFAULT_MAX_SESSIONS),
+            ttl=settings.get('ttl_seconds', DEFAULT_SESSION_TTL),
+            max_history=config.get('max_history_messages', DEFAULT_MAX_HISTORY),
+            db_path=db_path,
+            summarizer=summarizer
+        )
+
+    def get(self, session_id: str) -> SessionState:
+        """Retourne l'état de la session (cache, état vivant, ou réhydraté depuis la base)"""
+        state = self._cache.get(session_id)
+        if state is not None:
+            return state
+
+        with self._lock:
+            # Re-vérifier sous le verrou : une autre requête a pu charger la session
+            state = self._cache.get(session_id) or self._live.get(session_id)
+            if state is None:
+                state = self._load(session_id)
+                self._live[session_id] = state
+            self._cache.set(session_id, state)
+        return state
+
+    def delete(self, session_id: str) -> None:
+        """Oublie une session (mémoire et base)"""
+        with self._lock:
+            self._cache.invalidate(session_id)
+            state = self._live.pop(session_id, None)
+        if state is not None:
+            state.close()
+        with transaction(self.db_path) as conn:
+            conn.execute("DELETE FROM session_messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_summaries WHERE session_id = ?", (session_id,))
+
+    def clear(self) -> None:
+        """Oublie toutes les sessions (mémoire et base)"""
+        with self._lock:
+            self._cache.clear()
+            states = list(self._live.values())
+            self._live.clear()
+        for state in states:
+            state.close()
+        with transaction(self.db_path) as conn:
+            conn.execute("DELETE FROM session_messages")
+            conn.execute("DELETE FROM session_summaries")
+
+    def stats(self) -> dict:
+        """Statistiques du cache de sessions"""
+        return self._cache.stats()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête le résumeur (hook de shutdown)"""
+        if self.summarizer is not None:
+            self.summarizer.shutdown(wait=wait)
+
+    def _load(self, session_id: str) -> SessionState:
+        """État d'une session depuis ses derniers messages et son résumé persistés (vide si base indisponible)"""
+        rows, summary = [], ""
+        try:
+            conn = get_connection(self.db_path)
+            rows = conn.execute(
+                """SELECT role, content FROM (
+                       SELECT id, role, content FROM session_messages
+                       WHERE session_id = ? ORDER BY id DESC LIMIT ?
+                   ) ORDER BY id""",
+                (session_id, self.max_history)
+            ).fetchall()
+            row = conn.execute(
+                "SELECT summary FROM session_summaries WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            summary = row[0] if row else ""
+        except sqlite3.Error as e:
+            logger.warning(f"Réhydratation de la session {session_id} impossible: {e}")
+        history = [{'role': role, 'content': content} for role, content in rows]
+        return SessionState(session_id, history, self.max_history, self.db_path, summary, self.summarizer)
+
+
+def _store_message(session_id: str, message: dict, max_history: int, db_path: Optional[str]) -> None:
+    """Persiste un message et purge ceux qui sortent de la fenêtre max_history"""
+    try:
+        with transaction(db_path) as conn:
+            conn.execute(
+                "INSERT INTO session_messages (session_id, role, content) VALUES (?, ?, ?)",
+                (session_id, message['role'], message['content'])
+            )
+            conn.execute(
+                """DELETE FROM session_messages WHERE session_id = ? AND id <= (
+                       SELECT id FROM session_messages WHERE session_id = ?
+                       ORDER BY id DESC LIMIT 1 OFFSET ?
+                   )""",
+                (session_id, session_id, max_history)
+            )
+    except sqlite3.Error as e:
+        # L'historique en mémoire reste valable : seule la réhydratation est dégradée
+        logger.warning(f"Persistance du message de la session {session_id} impossible: {e}")
+
+
+def _store_summary(session_id: str, summary: str, messages_summarized: int, db_path: Optional[str]) -> None:
+    """Persiste le résumé glissant d'une session"""
+    try:
+        with transaction(db_path) as conn:
+            conn.execute(
+                """INSERT INTO session_summaries (session_id, summary, messages_summarized) VALUES (?, ?, ?)
+                   ON CONFLICT(session_id) DO UPDATE SET
+                       summary = excluded.summary,
+                       messages_summarized = messages_summarized + excluded.messages_summarized,
+                       updated_at = CURRENT_TIMESTAMP""",
+                (session_id, summary, messages_summarized)
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Persistance du résumé de la session {session_id} impossible: {e}")
@@ -0,0 +1,119 @@
+# Clara - Streaming
+"""
+Filtrage incrémental des blocs d'action dans une réponse streamée
+
+Le LLM mêle sa prose et des blocs JSON d'action (```json {...}```, ou objet
+nu {"memory_action": ...} / {"intent": "filesystem", ...}) destinés à
+l'orchestrateur. Pendant le streaming, la prose est transmise dès qu'elle
+arrive ; un bloc qui commence est retenu jusqu'à sa fin, puis supprimé s'il
+s'agit d'une action, ou transmis tel quel sinon (code, accolades de prose).
+"""
+
+import json
+import re
+from typing import Optional
+
+FENCE = "```"
+
+# Clés qui font d'un objet JSON nu un bloc d'action (cf. _process_memory_action / _process_filesystem_action)
+ACTION_KEYS = ('memory_action', 'intent')
+
+
+class ActionBlockFilter:
+    """Filtre incrémental : feed() les fragments du LLM, récupère la prose à transmettre"""
+
+    def __init__(self):
+        self._pending = ""  # texte retenu : bloc en cours ou début possible de marqueur
+        self.blocks: list[str] = []  # blocs d'action retenus
+        # Reprise de l'analyse du bloc en cours (pas de re-parcours à chaque fragment)
+        self._fence_from = len(FENCE)
+        self._scan: Optional[tuple] = None
+
+    def feed(self, text: str) -> str:
+        """Ajoute un fragment, retourne la prose qui peut être transmise"""
+        self._pending += text
+        out = []
+        while self._pending:
+            pending = self._pending
+
+            if pending.startswith(FENCE):
+                end = pending.find(FENCE, self._fence_from)
+                if end == -1:
+                    self._fence_from = max(len(FENCE), len(pending) - len(FENCE) + 1)
+                    break  # bloc de code pas encore fermé
+                self._fence_from = len(FENCE)
+                block, self._pending = pending[:end + len(FENCE)], pending[end + len(FENCE):]
+                body = re.sub(r'^[A-Za-z]*\s*', '', block[len(FENCE):-len(FENCE)])
+                out.append(self._release(block, body, fenced=True))
+                continue
+
+            if pending.startswith('{'):
+                end, self._scan = _scan_json_object(pending, self._scan)
+                if end is None:
+                    break  # objet pas encore fermé
+                self._scan = None
+                block, self._pending = pending[:end], pending[end:]
+                out.append(self._release(block, block, fenced=False))
+                continue
+
+            # Prose jusqu'au prochain début possible de bloc
+            starts = [i for i in (pending.find('`'), pending.find('{')) if i != -1]
+            if not starts:
+                out.append(pending)
+                self._pending = ""
+            elif min(starts) > 0:
+                out.append(pending[:min(starts)])
+                self._pending = pending[min(starts):]
+            elif len(pending) < len(FENCE) and FENCE.startswith(pending):
+                break  # "`" ou "``" : peut-être le début d'une clôture
+            else:
+                # Code en ligne (` ou ``) : pas un bloc
+                ticks = len(pending) - len(pending.lstrip('`'))
+                out.append(pending[:ticks])
+                self._pending = pending[ticks:]
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Fin du flux : retourne le texte encore retenu (bloc jamais fermé)"""
+        pending, self._pending = self._pending, ""
+        self._fence_from, self._scan = len(FENCE), None
+        return pending
+
+    def _release(self, block: str, body: str, fenced: bool) -> str:
+        """Retient le bloc s'il s'agit d'une action, sinon le retourne pour transmission"""
+        try:
+            data = json.loads(body.strip())
+        except json.JSONDecodeError:
+            return block
+        if isinstance(data, dict) and (fenced or any(key in data for key in ACTION_KEYS)):
+            self.blocks.append(block)
+            return ""
+        return block
+
+
+def _scan_json_object(text: str, state: Optional[tuple]) -> tuple[Optional[int], Optional[tuple]]:
+    """
+    Cherche la fin de l'objet JSON qui commence text, en reprenant l'analyse précédente
+
+    Returns:
+        (position après l'accolade fermante, None) ou (None, état de reprise) si incomplet
+    """
+    start, depth, in_string, escaped = state or (0, 0, False, False)
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return index + 1, None
+    return None, (len(text), depth, in_string, escaped)
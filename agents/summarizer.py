@@ -0,0 +1,173 @@
+# Clara - Résumé glissant
+"""
+Résumé glissant des conversations longues
+
+Les messages qui sortent de l'historique d'une session (max_history) sont
+compactés dans un résumé par session, hors du chemin de la requête : un thread
+dédié les fusionne avec le résumé précédent. Le résumé est borné en tokens,
+donc la taille du prompt reste constante quelle que soit la longueur de la
+session.
+
+Deux stratégies :
+- extractive_summary : locale et gratuite, garde les phrases les plus
+  représentatives (fréquence des termes, memory/tagging.py)
+- llm_summarizer : fait résumer par le LLM (repli sur l'extractif en cas d'erreur)
+"""
+
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from memory.tagging import extract_terms
+from utils.tokens import estimate_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_TOKENS = 300
+
+# Une phrase trop longue est coupée avant d'entrer dans le résumé
+MAX_SENTENCE_TOKENS = 60
+
+ROLE_LABELS = {'user': "Utilisateur", 'assistant': "Clara"}
+
+LLM_SUMMARY_PROMPT = (
+    "Tu mets à jour le résumé d'une conversation entre un utilisateur et Clara. "
+    "Intègre les nouveaux échanges au résumé existant en gardant les faits, décisions, "
+    "demandes en cours et préférences exprimées. Réponds uniquement par le résumé, "
+    "en français, en phrases courtes, sans dépasser {max_words} mots."
+)
+
+Summarize = Callable[[str, list[dict], int], str]
+
+
+def extractive_summary(previous: str, messages: list[dict], max_tokens: int = DEFAULT_SUMMARY_TOKENS) -> str:
+    """
+    Résumé extractif : phrases du résumé précédent et des nouveaux messages,
+    classées par fréquence moyenne de leurs termes, gardées dans l'ordre d'origine
+
+    Args:
+        previous: Résumé précédent (une phrase par ligne)
+        messages: Messages évincés {role, content}, du plus ancien au plus récent
+        max_tokens: Budget du résumé
+
+    Returns:
+        Résumé (une phrase par ligne)
+    """
+    candidates = [line for line in previous.splitlines() if line.strip()]
+    for message in messages:
+        label = ROLE_LABELS.get(message.get('role'), message.get('role', ''))
+        for sentence in re.split(r'(?<=[.!?])\s+|\n+', message.get('content') or ''):
+            sentence = sentence.strip()
+            if sentence:
+                candidates.append(f"{label} : {truncate_to_tokens(sentence, MAX_SENTENCE_TOKENS)}")
+
+    # Phrases répétées : une seule occurrence, à sa position la plus récente
+    last_index = {candidate: index for index, candidate in enumerate(candidates)}
+    candidates = [candidate for index, candidate in enumerate(candidates) if last_index[candidate] == index]
+
+    terms_list = [extract_terms(candidate) for candidate in candidates]
+    frequency: dict[str, int] = {}
+    for terms in terms_list:
+        for term, (count, _) in terms.items():
+            frequency[term] = frequency.get(term, 0) + count
+
+    # Score : fréquence moyenne des termes ; à égalité, la phrase la plus récente
+    ranked = sorted(
+        (index for index, terms in enumerate(terms_list) if terms),
+        key=lambda index: (-sum(frequency[t] for t in terms_list[index]) / len(terms_list[index]), -index)
+    )
+
+    kept, used = set(), 0
+    for index in ranked:
+        cost = estimate_tokens(candidates[index]) + 1
+        if used + cost <= max_tokens:
+            kept.add(index)
+            used += cost
+    return "\n".join(candidates[index] for index in sorted(kept))
+
+
+def llm_summarizer(generate: Callable[[list[dict]], dict]) -> Summarize:
+    """
+    Stratégie de résumé par le LLM
+
+    Args:
+        generate: LLMDriver.generate (messages -> {text, usage})
+
+    Returns:
+        Fonction (previous, messages, max_tokens) -> résumé
+    """
+    def summarize(previous: str, messages: list[dict], max_tokens: int) -> str:
+        transcript = "\n".join(
+            f"{ROLE_LABELS.get(m.get('role'), m.get('role', ''))} : {m.get('content', '')}" for m in messages
+        )
+        response = generate([
+            {'role': 'system', 'content': LLM_SUMMARY_PROMPT.format(max_words=int(max_tokens * 0.75))},
+            {'role': 'user', 'content': f"RÉSUMÉ EXISTANT :\n{previous or '(vide)'}\n\nNOUVEAUX ÉCHANGES :\n{transcript}"},
+        ])
+        return truncate_to_tokens(response['text'].strip(), max_tokens)
+    return summarize
+
+
+class ConversationSummarizer:
+    """Compacte en arrière-plan les messages évincés dans le résumé de leur session"""
+
+    def __init__(self, summarize: Optional[Summarize] = None, max_tokens: int = DEFAULT_SUMMARY_TOKENS):
+        """
+        Args:
+            summarize: Stratégie (previous, messages, max_tokens) -> résumé (défaut : extractive_summary)
+            max_tokens: Budget du résumé de chaque session
+        """
+        self.summarize = summarize or extractive_summary
+        self.max_tokens = max_tokens
+        # Un seul thread : les résumés d'une session sont calculés dans l'ordre
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clara-summarizer")
+
+    @classmethod
+    def from_config(cls, config: dict, generate: Optional[Callable] = None) -> Optional["ConversationSummarizer"]:
+        """Résumeur selon la section summarization de settings.yaml (None si désactivé)"""
+        settings = config.get('summarization') or {}
+        if not settings.get('enabled', True):
+            return None
+        summarize = llm_summarizer(generate) if settings.get('mode') == 'llm' and generate else None
+        return cls(summarize, max_tokens=settings.get('max_tokens', DEFAULT_SUMMARY_TOKENS))
+
+    def submit(self, state, messages: list[dict]) -> None:
+        """Confie des messages évincés d'une session (SessionState) au thread de résumé"""
+        with state.summary_lock:
+            if state.closed:
+                return
+            state.pending_summary.extend(messages)
+            if state.summarizing:
+                return  # le job en cours reprendra ces messages
+            state.summarizing = True
+        try:
+            self._executor.submit(self._run, state)
+        except RuntimeError:
+            # Résumeur arrêté (shutdown) : les messages restent simplement hors du résumé
+            with state.summary_lock:
+                state.summarizing = False
+
+    def flush(self) -> None:
+        """Attend la fin des résumés en cours"""
+        self._executor.submit(lambda: None).result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête le thread de résumé (hook de shutdown)"""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, state) -> None:
+        """Intègre les messages en attente au résumé, jusqu'à épuisement"""
+        while True:
+            with state.summary_lock:
+                pending, state.pending_summary = state.pending_summary, []
+                previous = state.summary
+                if not pending:
+                    state.summarizing = False
+                    return
+            try:
+                summary = self.summarize(previous, pending, self.max_tokens)
+            except Exception as e:
+                logger.warning(f"Résumé de la session {state.session_id} en repli extractif: {e}")
+                summary = extractive_summary(previous, pending, self.max_tokens)
+            state.set_summary(summary, len(pending))
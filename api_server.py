@@ -7,6 +7,7 @@ Expose Clara via FastAPI pour l'UI de chat
 
 import sys
 import os
+import asyncio
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -27,12 +28,18 @@ logging.basicConfig(
 # Ajouter le répertoire courant au path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from agents.orchestrator import Orchestrator
+from drivers.llm_driver import AsyncLLMDriver, LLMLoopBridge, CancelToken
 from utils.logger import SessionLogger, DebugLogger
 from memory.memory_core import init_db
+from memory.connection import configure_from_settings, close_all_connections
+from memory import async_api as async_memory
+from memory.vector.semantic import sync_vector_index, save_vector_indexes
 from drivers.fs_driver import FSDriver
 from agents.helpers import set_fs_driver
 import json
@@ -54,12 +61,50 @@ except ImportError:
     AUTOGEN_AVAILABLE = False
     logging.warning("Autogen non disponible. Le mode Autogen sera désactivé.")
 
-# Initialiser la base de données au démarrage
+# Initialiser la base de données au démarrage (connexions partagées configurées une fois)
+configure_from_settings()
 init_db()
 
 # Créer l'app FastAPI
 app = FastAPI(title="Clara API", version="1.0.0")
 
+
+@app.on_event("startup")
+def start_vector_index():
+    """Synchronise l'index vectoriel hors du chemin des requêtes (reconstruction au premier démarrage)"""
+    sync_vector_index()
+
+
+@app.on_event("startup")
+async def start_async_llm():
+    """Branche l'orchestrateur sur le driver LLM asynchrone (pool HTTP partagé, sur la boucle du serveur)"""
+    if not (orchestrator.config.get('llm_async') or {}).get('enabled', True):
+        return
+    app.state.async_llm = AsyncLLMDriver()
+    # Quota, reprises et disjoncteur communs avec le driver synchrone (résumeur LLM)
+    app.state.async_llm.resilience = orchestrator.llm_driver.resilience
+    # Même cache de réponses que le driver synchrone remplacé
+    orchestrator.llm_driver = LLMLoopBridge(
+        app.state.async_llm, asyncio.get_running_loop(), cache=orchestrator.llm_driver.cache
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_async_llm():
+    """Ferme le pool de connexions du driver LLM asynchrone"""
+    async_llm = getattr(app.state, 'async_llm', None)
+    if async_llm is not None:
+        await async_llm.aclose()
+
+
+@app.on_event("shutdown")
+def shutdown_memory():
+    """Arrête le résumeur de sessions et le pool mémoire async, écrit l'index vectoriel, ferme les connexions SQLite partagées"""
+    orchestrator.sessions.shutdown()
+    async_memory.shutdown()
+    save_vector_indexes()
+    close_all_connections()
+
 # CORS pour permettre l'UI de se connecter
 app.add_middleware(
     CORSMiddleware,
@@ -170,6 +215,29 @@ class RenamePayload(BaseModel):
 # Endpoints
 # ============================================
 
+# Intervalle de vérification de la déconnexion du client pendant un tour (secondes)
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+async def run_cancellable_turn(http_request: Request, message: str, session_id: str, debug_logger):
+    """
+    Exécute un tour de l'orchestrateur dans le pool de threads
+
+    Si le client HTTP se déconnecte avant la fin, l'appel LLM en cours est annulé.
+    """
+    cancel_token = CancelToken()
+    turn = asyncio.ensure_future(run_in_threadpool(
+        orchestrator.handle_message, message, session_id, debug_logger, None, cancel_token
+    ))
+    while not turn.done():
+        await asyncio.wait({turn}, timeout=DISCONNECT_POLL_INTERVAL)
+        if not turn.done() and await http_request.is_disconnected():
+            logging.info(f"Client déconnecté, tour annulé (session {session_id})")
+            cancel_token.cancel()
+            break
+    return await turn
+
+
 @app.get("/health")
 async def health():
     """Endpoint de santé"""
@@ -177,7 +245,7 @@ async def health():
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
     """
     Endpoint principal pour envoyer un message à Clara
     
@@ -198,8 +266,9 @@ async def chat(request: ChatRequest):
         # Logger l'input utilisateur
         session_logger.log_user(request.message)
         
-        # Appeler l'orchestrateur (même logique que run_clara.py)
-        orchestrator_response = orchestrator.handle_message(request.message, session_id, debug_logger)
+        # Appeler l'orchestrateur (même logique que run_clara.py), hors de la boucle
+        # d'événements : les sessions différentes sont traitées en parallèle
+        orchestrator_response = await run_cancellable_turn(http_request, request.message, session_id, debug_logger)
         
         # L'orchestrator retourne maintenant un dict avec 'response' et 'internal'
         if isinstance(orchestrator_response, dict):
@@ -238,6 +307,77 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def format_sse(event: dict) -> str:
+    """Formate un événement Server-Sent Events (data JSON)"""
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Variante streamée de /chat (Server-Sent Events)
+    
+    Événements (une ligne data: JSON chacun) :
+    - {"type": "session", "session_id": ...} dès l'ouverture
+    - {"type": "delta", "text": ...} : prose de Clara au fil de la génération
+      (les blocs d'action JSON sont retenus)
+    - {"type": "done", "reply": ..., "session_id": ..., "internal": ...} : réponse
+      finale, avec le résultat des actions exécutées (remplace le texte streamé)
+    - {"type": "error", "detail": ...}
+    
+    Si le client se déconnecte, l'appel LLM en cours est annulé.
+    """
+    session_id = request.session_id or generate_session_id()
+    session_logger = SessionLogger(session_id)
+    debug_logger = DebugLogger(session_id)
+    session_logger.log_user(request.message)
+    
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    cancel_token = CancelToken()
+    
+    def on_delta(text):
+        # Appelé depuis le thread du tour
+        loop.call_soon_threadsafe(events.put_nowait, {"type": "delta", "text": text})
+    
+    async def run_turn():
+        try:
+            orchestrator_response = await run_in_threadpool(
+                orchestrator.handle_message, request.message, session_id, debug_logger, on_delta, cancel_token
+            )
+            if isinstance(orchestrator_response, dict):
+                reply = orchestrator_response.get('response', '')
+                internal_data = orchestrator_response.get('internal', {})
+            else:
+                reply, internal_data = orchestrator_response, {}
+            session_logger.log_clara(reply)
+            await events.put({"type": "done", "reply": reply, "session_id": session_id, "internal": internal_data})
+        except Exception as e:
+            logging.exception(f"Erreur dans /chat/stream: {e}")
+            await events.put({"type": "error", "detail": str(e)})
+    
+    async def event_stream():
+        turn = asyncio.create_task(run_turn())
+        try:
+            yield format_sse({"type": "session", "session_id": session_id})
+            while True:
+                event = await events.get()
+                yield format_sse(event)
+                if event["type"] in ("done", "error"):
+                    break
+            await turn
+        finally:
+            # Flux interrompu (client déconnecté) : annuler l'appel LLM
+            if not turn.done():
+                cancel_token.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/chat/autogen", response_model=ChatResponse)
 async def chat_autogen(request: ChatRequest):
     """Endpoint pour envoyer un message à Clara en mode Autogen (multi-agents)"""
@@ -512,6 +652,9 @@ async def delete_session(session_id: str):
     if debug_file.exists():
         debug_file.unlink()
     
+    # Oublier l'historique de conversation (cache et base)
+    await run_in_threadpool(orchestrator.sessions.delete, session_id)
+    
     # Supprimer le titre de la liste
     if session_id in titles:
         del titles[session_id]
@@ -547,6 +690,9 @@ async def delete_all_sessions():
     if titles_file.exists():
         titles_file.unlink()
     
+    # Oublier tous les historiques de conversation (cache et base)
+    await run_in_threadpool(orchestrator.sessions.clear)
+    
     return {"success": True, "deleted_count": deleted_count}
 
 
@@ -571,15 +717,17 @@ async def create_session():
 
 
 @app.get("/sessions/{session_id}/todos")
-async def get_session_todos(session_id: str):
+async def get_session_todos(session_id: str, limit: int = 50, cursor: Optional[str] = None):
     """
     Récupère les todos d'une session depuis la mémoire ou les logs
+    
+    Pagination par curseur : passer le next_cursor retourné pour la page suivante
     """
     # D'abord, essayer de récupérer depuis la mémoire
     try:
-        from memory.memory_core import get_items
-        todos = get_items(type='todo', limit=50)
-        if todos:
+        page = await async_memory.get_items_page(type='todo', limit=limit, cursor=cursor)
+        todos = page['items']
+        if todos or cursor:
             formatted_todos = []
             for todo in todos:
                 formatted_todos.append({
@@ -587,7 +735,9 @@ async def get_session_todos(session_id: str):
                     "timestamp": todo.get('created_at', ''),
                     "done": False  # Pour l'instant, pas de champ done dans la DB
                 })
-            return {"todos": formatted_todos}
+            return {"todos": formatted_todos, "next_cursor": page['next_cursor']}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.exception(f"Erreur récupération todos depuis mémoire: {e}")
     
@@ -1,34 +1,570 @@
 # Clara - Driver LLM
 """
 Driver pour les appels au LLM (OpenAI)
+
+- LLMDriver : client synchrone (run_clara.py, scripts, threads)
+- AsyncLLMDriver : client asyncio pour le serveur API, avec pool de connexions
+  keep-alive partagé, limite d'appels simultanés, timeout par appel et annulation
+- LLMLoopBridge : façade synchrone d'un AsyncLLMDriver, pour l'orchestrateur
+  exécuté dans un thread du serveur
+- LLMResponseCache : cache SQLite des réponses pour les réglages déterministes
+- LLMResilience : reprises avec backoff, limitation de débit et disjoncteur,
+  appliqués par les deux drivers
 """
 
 import os
+import re
+import json
+import time
+import random
+import hashlib
+import sqlite3
+import logging
+import asyncio
+import threading
+import concurrent.futures
 import yaml
+import openai
+import httpx
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+
+from memory.connection import get_connection, transaction
+from utils.tokens import estimate_message_tokens
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 60.0  # secondes, par appel
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+
+DEFAULT_CACHE_PATH = "memory/llm_cache.sqlite"
+DEFAULT_CACHE_TTL = 3600  # secondes
+DEFAULT_CACHE_MAX_ENTRIES = 1000
+# Au-dessus de cette température, la réponse n'est pas reproductible : pas de cache
+DEFAULT_CACHE_MAX_TEMPERATURE = 0.0
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MOCK_BASE_URL = "http://127.0.0.1:8100/v1"
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5  # secondes
+DEFAULT_BACKOFF_MAX = 20.0  # secondes
+DEFAULT_CIRCUIT_FAILURE_THRESHOLD = 5
+DEFAULT_CIRCUIT_RESET_TIMEOUT = 30.0  # secondes
+
+
+class LLMCancelledError(Exception):
+    """Appel LLM annulé (ex: client HTTP déconnecté)"""
+
+
+class CancelToken:
+    """Jeton d'annulation d'un tour, partagé entre le serveur et les appels LLM (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Annule : les callbacks enregistrés sont appelés une fois"""
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Enregistre un callback d'annulation (appelé tout de suite si déjà annulé)"""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise LLMCancelledError("Appel LLM annulé")
+
+
+class LLMUnavailableError(Exception):
+    """API LLM jugée indisponible (circuit ouvert) : l'appel échoue sans être tenté"""
+
+
+class TokenBucket:
+    """
+    Seau à jetons (thread-safe) : per_minute jetons par minute, rafale bornée par capacity
+
+    reserve() prélève tout de suite et retourne l'attente nécessaire : le solde
+    peut devenir négatif, les appelants suivants attendent d'autant plus
+    (ordre d'arrivée respecté, sans boucle d'attente active).
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        if per_minute <= 0:
+            raise ValueError("per_minute doit être > 0")
+        self.rate = per_minute / 60.0  # jetons par seconde
+        self.capacity = capacity or per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """Prélève amount jetons (plafonné à capacity), retourne l'attente en secondes avant l'appel"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= min(amount, self.capacity)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur (thread-safe) : après failure_threshold échecs consécutifs,
+    les appels échouent immédiatement pendant reset_timeout secondes
+
+    Passé ce délai, un seul appel d'essai est laissé passer par période
+    (demi-ouvert) : un succès referme le circuit, un échec le rouvre.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None  # None = circuit fermé
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """closed, open ou half_open"""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "open" if time.monotonic() - self._opened_at < self.reset_timeout else "half_open"
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            LLMUnavailableError: Si le circuit est ouvert
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            remaining = self.reset_timeout - (now - self._opened_at)
+            if remaining > 0:
+                raise LLMUnavailableError(f"API LLM indisponible, nouvel essai dans {remaining:.0f}s")
+            # Demi-ouvert : cet appel est l'essai, les suivants attendent la période suivante
+            self._opened_at = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Circuit LLM ouvert après {self.failures} échecs consécutifs")
+                self._opened_at = time.monotonic()
+
+
+class LLMResilience:
+    """
+    Politique d'appel au LLM : limitation de débit côté client, disjoncteur et
+    reprises avec backoff exponentiel (jitter complet, Retry-After respecté)
+
+    Seules les erreurs transitoires (connexion, timeout, 408/409/429/5xx) sont
+    reprises et comptent comme échecs du disjoncteur. Partagée entre les
+    drivers qui visent la même API, elle tient un quota commun.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Args:
+            max_retries: Reprises après le premier essai
+            backoff_base: Attente de base en secondes (doublée à chaque reprise)
+            backoff_max: Attente maximale ; un Retry-After plus long n'est pas attendu (échec)
+            requests_per_minute: Requêtes par minute (None = pas de limite)
+            tokens_per_minute: Tokens (prompt estimé + max_tokens) par minute (None = pas de limite)
+            circuit_breaker: Disjoncteur (défaut : CircuitBreaker())
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.breaker = circuit_breaker or CircuitBreaker()
+        self.retries = 0
+        self.rate_limited_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config: dict) -> "LLMResilience":
+        """Politique selon la section llm_resilience de settings.yaml"""
+        settings = config.get("llm_resilience") or {}
+        return cls(
+            max_retries=settings.get("max_retries", DEFAULT_MAX_RETRIES),
+            backoff_base=settings.get("backoff_base_seconds", DEFAULT_BACKOFF_BASE),
+            backoff_max=settings.get("backoff_max_seconds", DEFAULT_BACKOFF_MAX),
+            requests_per_minute=settings.get("requests_per_minute"),
+            tokens_per_minute=settings.get("tokens_per_minute"),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=settings.get("circuit_failure_threshold", DEFAULT_CIRCUIT_FAILURE_THRESHOLD),
+                reset_timeout=settings.get("circuit_reset_seconds", DEFAULT_CIRCUIT_RESET_TIMEOUT),
+            ),
+        )
+
+    def call(self, request: Callable[[], object], messages: list[dict], max_tokens: int,
+             cancel_token: Optional[CancelToken] = None):
+        """
+        Exécute request() (appel synchrone à l'API) selon la politique
+
+        Raises:
+            LLMUnavailableError: Circuit ouvert
+            LLMCancelledError: cancel_token annulé pendant une attente
+            L'erreur de l'API si elle n'est pas transitoire ou si les reprises sont épuisées
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            _sleep(self._admit(messages, max_tokens), cancel_token)
+            try:
+                result = request()
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                _sleep(delay, cancel_token)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, request: Callable[[], Awaitable], messages: list[dict], max_tokens: int):
+        """Équivalent asynchrone de call : request() retourne la coroutine de l'appel"""
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            delay = self._admit(messages, max_tokens)
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                result = await request()
+            except Exception as e:
+                await asyncio.sleep(self._on_error(e, attempt))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Attente avant la reprise n° attempt + 1 : Retry-After s'il est fourni, sinon jitter complet"""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "rate_limited_seconds": round(self.rate_limited_seconds, 3),
+            "circuit": self.breaker.state,
+        }
+
+    def _admit(self, messages: list[dict], max_tokens: int) -> float:
+        """Prélève le quota d'un essai, retourne l'attente imposée par le limiteur"""
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.reserve(1)
+        if self.tokens is not None:
+            estimated = sum(estimate_message_tokens(m) for m in messages) + max_tokens
+            delay = max(delay, self.tokens.reserve(estimated))
+        self.rate_limited_seconds += delay
+        return delay
+
+    def _on_error(self, error: Exception, attempt: int) -> float:
+        """Attente avant reprise, ou relève error si elle n'est pas à reprendre"""
+        if not _is_transient(error):
+            # L'API a répondu (requête invalide, authentification...) : elle n'est pas en panne
+            self.breaker.record_success()
+            raise error
+        self.breaker.record_failure()
+        retry_after = _retry_after(error)
+        if attempt >= self.max_retries or (retry_after is not None and retry_after > self.backoff_max):
+            raise error
+        delay = self.backoff(attempt, retry_after)
+        self.retries += 1
+        logger.warning(f"Appel LLM en échec ({error.__class__.__name__}), reprise {attempt + 1} dans {delay:.2f}s")
+        return delay
+
+
+def _is_transient(error: Exception) -> bool:
+    """Erreur passagère de l'API, qui mérite une reprise"""
+    if isinstance(error, openai.APIConnectionError):  # timeouts compris
+        return True
+    if isinstance(error, openai.APIStatusError):
+        if getattr(error, "code", None) == "insufficient_quota":
+            return False  # 429 de facturation : reprendre ne sert à rien
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Délai demandé par l'API (retry-after-ms ou Retry-After, en secondes ou date HTTP)"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return max(float(headers["retry-after-ms"]) / 1000, 0.0)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _sleep(delay: float, cancel_token: Optional[CancelToken]) -> None:
+    """time.sleep interrompu par l'annulation de cancel_token (LLMCancelledError)"""
+    if delay <= 0:
+        return
+    if cancel_token is None:
+        time.sleep(delay)
+        return
+    woken = threading.Event()
+    cancel_token.add_callback(woken.set)
+    try:
+        woken.wait(delay)
+    finally:
+        cancel_token.remove_callback(woken.set)
+    cancel_token.raise_if_cancelled()
+
+
+class LLMResponseCache:
+    """
+    Cache des réponses LLM (SQLite), borné en durée (TTL) et en taille (LRU)
+
+    Clé : hash de l'endpoint (base_url : API OpenAI ou serveur simulé), du
+    modèle, des paramètres de génération et des messages normalisés (espaces
+    compactés). Le prompt contient le contexte mémoire : une mémoire
+    modifiée donne une autre clé. Les appels dont la température dépasse
+    max_temperature ne sont ni lus ni écrits.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: Optional[float] = DEFAULT_CACHE_TTL,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_temperature: float = DEFAULT_CACHE_MAX_TEMPERATURE
+    ):
+        """
+        Args:
+            path: Fichier SQLite du cache
+            ttl: Durée de vie d'une réponse en secondes (None = pas d'expiration)
+            max_entries: Nombre maximum de réponses (les moins récemment utilisées sont évincées)
+            max_temperature: Température maximale d'un appel mis en cache
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries doit être > 0")
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_temperature = max_temperature
+        self.hits = 0
+        self.misses = 0
+        self._ready = False  # table créée au premier accès (pas de fichier tant que le cache ne sert pas)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["LLMResponseCache"]:
+        """Cache selon la section llm_cache de settings.yaml (None si désactivé)"""
+        settings = config.get("llm_cache") or {}
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            path=settings.get("path", DEFAULT_CACHE_PATH),
+            ttl=settings.get("ttl_seconds", DEFAULT_CACHE_TTL),
+            max_entries=settings.get("max_entries", DEFAULT_CACHE_MAX_ENTRIES),
+            max_temperature=settings.get("max_temperature", DEFAULT_CACHE_MAX_TEMPERATURE),
+        )
+
+    def cacheable(self, temperature: float) -> bool:
+        """Vrai si un appel à cette température est déterministe au sens du cache"""
+        return temperature <= self.max_temperature
+
+    @staticmethod
+    def make_key(endpoint: str, model: str, temperature: float, max_tokens: int, messages: list[dict]) -> str:
+        """Hash SHA-256 de l'endpoint, des paramètres de génération et des messages normalisés"""
+        normalized = [
+            [m.get("role", ""), re.sub(r"\s+", " ", m.get("content") or "").strip()] for m in messages
+        ]
+        payload = json.dumps([endpoint, model, temperature, max_tokens, normalized], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Réponse en cache (et la marque récente), ou None si absente / expirée"""
+        now = time.time()
+        try:
+            self._ensure_table()
+            row = get_connection(self.path).execute(
+                "SELECT text, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl is not None and row[1] <= now - self.ttl):
+                self.misses += 1
+                return None
+            with transaction(self.path) as conn:
+                conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning(f"Lecture du cache LLM impossible: {e}")
+            return None
+        self.hits += 1
+        return row[0]
+
+    def set(self, key: str, text: str) -> None:
+        """Enregistre une réponse, puis évince les expirées et les moins récemment utilisées"""
+        now = time.time()
+        try:
+            self._ensure_table()
+            with transaction(self.path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, text, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, text, now, now)
+                )
+                if self.ttl is not None:
+                    conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,))
+                excess = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used LIMIT ?)",
+                        (excess,)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Écriture du cache LLM impossible: {e}")
+
+    def lookup(
+        self, endpoint: str, model: str, temperature: float, max_tokens: int, messages: list[dict]
+    ) -> Optional[dict]:
+        """Réponse en cache au format de generate ({text, usage, cached}), ou None"""
+        if not self.cacheable(temperature):
+            return None
+        text = self.get(self.make_key(endpoint, model, temperature, max_tokens, messages))
+        return None if text is None else {"text": text, "usage": None, "cached": True}
+
+    def store(
+        self, endpoint: str, model: str, temperature: float, max_tokens: int, messages: list[dict], text: str
+    ) -> None:
+        """Met en cache la réponse d'un appel (ignoré si la température n'est pas cacheable)"""
+        if self.cacheable(temperature) and text:
+            self.set(self.make_key(endpoint, model, temperature, max_tokens, messages), text)
+
+    def _ensure_table(self) -> None:
+        if self._ready:
+            return
+        with transaction(self.path) as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                       key TEXT PRIMARY KEY,
+                       text TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       last_used REAL NOT NULL
+                   )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+        self._ready = True
+
+    def stats(self) -> dict:
+        """Compteurs du cache"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _cached_stream(cached: dict) -> Iterator[dict]:
+    """Événements de generate_stream pour une réponse en cache"""
+    yield {"type": "delta", "text": cached["text"]}
+    yield {"type": "done", "text": cached["text"], "usage": None, "cached": True}
+
+
+def _load_llm_config(config_path: str) -> dict:
+    """Config YAML (settings.yaml)"""
+    with open(config_path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def _get_api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY not found in environment variables")
+    return api_key
+
+
+def llm_client_settings(config: dict) -> dict:
+    """
+    api_key et base_url des clients LLM
+
+    Avec mock_llm.enabled, le serveur simulé local (mock_llm_server.py) : pas
+    de clé requise. Sinon l'API OpenAI (base_url de settings.yaml, à défaut
+    OPENAI_BASE_URL ou l'URL officielle).
+    """
+    mock = config.get("mock_llm") or {}
+    if mock.get("enabled"):
+        return {"api_key": "mock", "base_url": mock.get("base_url", DEFAULT_MOCK_BASE_URL)}
+    return {
+        "api_key": _get_api_key(),
+        "base_url": config.get("base_url") or os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL),
+    }
+
 
 class LLMDriver:
     def __init__(self, config_path: str = "config/settings.yaml") -> None:
         # Charger la config YAML
-        with open(config_path, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f) or {}
+        cfg = _load_llm_config(config_path)
 
         self.model = cfg.get("model", "gpt-5.1")
         self.temperature = float(cfg.get("temperature", 0.7))
         self.max_tokens = int(cfg.get("max_tokens", 4096))
 
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY not found in environment variables")
-
         # IMPORTANT : aucun proxies ici
-        self.client = OpenAI(api_key=api_key)
+        # Reprises gérées par self.resilience (pas de reprises internes au client en plus)
+        self.client = OpenAI(**llm_client_settings(cfg), max_retries=0)
+        self.base_url = str(self.client.base_url)
+        self.cache = LLMResponseCache.from_config(cfg)
+        if self.cache is not None and not self.cache.cacheable(self.temperature):
+            logger.info(
+                f"Cache LLM inactif : temperature {self.temperature} > max_temperature {self.cache.max_temperature}"
+            )
+        self.resilience = LLMResilience.from_config(cfg)
 
-    def generate(self, messages: list[dict]) -> dict:
+    def generate(self, messages: list[dict], cancel_token: Optional[CancelToken] = None) -> dict:
         """
         messages = [
           {"role": "system", "content": "..."},
@@ -36,15 +572,309 @@ class LLMDriver:
           ...
         ]
         Retourne un dict avec { "text": str, "usage": {...} }
+        (+ "cached": True si la réponse vient du cache, usage vaut alors None)
+
+        Client synchrone : cancel_token n'est vérifié qu'avant l'appel et
+        pendant les attentes (limiteur, backoff).
+
+        Raises:
+            LLMUnavailableError: Si le disjoncteur est ouvert
         """
-        resp = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=self.temperature,
-            max_completion_tokens=self.max_tokens,
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+
+        cached = self._cache_lookup(messages)
+        if cached is not None:
+            return cached
+
+        resp = self.resilience.call(
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_completion_tokens=self.max_tokens,
+            ),
+            messages, self.max_tokens, cancel_token
         )
 
         choice = resp.choices[0]
         text = choice.message.content or ""
         usage = resp.usage.model_dump() if resp.usage else None
+        self._cache_store(messages, text)
         return {"text": text, "usage": usage}
+
+    def generate_stream(self, messages: list[dict], cancel_token: Optional[CancelToken] = None) -> Iterator[dict]:
+        """
+        Variante streamée de generate : la complétion est produite au fil de l'eau
+
+        Événements produits :
+          {"type": "delta", "text": str}                  # fragment de texte
+          {"type": "done", "text": str, "usage": {...}}   # texte complet + usage (dernier événement)
+
+        Interrompre l'itération (close() du générateur) ferme la requête HTTP ;
+        cancel_token est vérifié entre les fragments (LLMCancelledError).
+        Seule l'ouverture du flux est reprise en cas d'erreur transitoire :
+        une fois des fragments transmis, l'erreur remonte.
+        """
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+
+        cached = self._cache_lookup(messages)
+        if cached is not None:
+            yield from _cached_stream(cached)
+            return
+
+        stream = self.resilience.call(
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_completion_tokens=self.max_tokens,
+                stream=True,
+                stream_options={"include_usage": True},
+            ),
+            messages, self.max_tokens, cancel_token
+        )
+
+        parts = []
+        usage = None
+        try:
+            for chunk in stream:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                if chunk.usage:
+                    usage = chunk.usage.model_dump()
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    yield {"type": "delta", "text": text}
+        finally:
+            stream.close()
+
+        self._cache_store(messages, "".join(parts))
+        yield {"type": "done", "text": "".join(parts), "usage": usage}
+
+    def _cache_lookup(self, messages: list[dict]) -> Optional[dict]:
+        if self.cache is None:
+            return None
+        return self.cache.lookup(self.base_url, self.model, self.temperature, self.max_tokens, messages)
+
+    def _cache_store(self, messages: list[dict], text: str) -> None:
+        if self.cache is not None:
+            self.cache.store(self.base_url, self.model, self.temperature, self.max_tokens, messages, text)
+
+
+class AsyncLLMDriver:
+    """
+    Driver LLM asyncio : un client HTTP keep-alive partagé par tous les appels
+
+    Le nombre d'appels simultanés est borné par un sémaphore (les suivants
+    attendent leur tour) ; chaque appel a un timeout global. À utiliser depuis
+    une seule boucle d'événements (celle du serveur). Reprises, limitation de
+    débit et disjoncteur : self.resilience, à l'intérieur du timeout.
+    """
+
+    def __init__(
+        self,
+        config_path: str = "config/settings.yaml",
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None
+    ) -> None:
+        """
+        Args:
+            config_path: settings.yaml (model, temperature, max_tokens, section llm_async)
+            max_concurrency: Appels LLM simultanés maximum
+            timeout: Durée maximale d'un appel en secondes (streaming compris)
+            max_connections: Taille du pool de connexions HTTP
+            max_keepalive_connections: Connexions gardées ouvertes entre deux appels
+        """
+        cfg = _load_llm_config(config_path)
+        settings = cfg.get("llm_async") or {}
+
+        self.model = cfg.get("model", "gpt-5.1")
+        self.temperature = float(cfg.get("temperature", 0.7))
+        self.max_tokens = int(cfg.get("max_tokens", 4096))
+        self.max_concurrency = max_concurrency or settings.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+        self.timeout = timeout or settings.get("timeout_seconds", DEFAULT_TIMEOUT)
+
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections or settings.get("max_connections", DEFAULT_MAX_CONNECTIONS),
+                max_keepalive_connections=max_keepalive_connections
+                or settings.get("max_keepalive_connections", DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+            ),
+            timeout=httpx.Timeout(self.timeout),
+        )
+        self.client = AsyncOpenAI(**llm_client_settings(cfg), http_client=self._http_client, max_retries=0)
+        self.base_url = str(self.client.base_url)
+        self.resilience = LLMResilience.from_config(cfg)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+
+    async def generate(self, messages: list[dict], timeout: Optional[float] = None) -> dict:
+        """
+        Équivalent asynchrone de LLMDriver.generate
+
+        Raises:
+            TimeoutError: Si l'appel (attente du sémaphore non comprise) dépasse timeout
+        """
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                resp = await asyncio.wait_for(
+                    self.resilience.acall(
+                        lambda: self.client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            temperature=self.temperature,
+                            max_completion_tokens=self.max_tokens,
+                        ),
+                        messages, self.max_tokens
+                    ),
+                    timeout or self.timeout,
+                )
+            finally:
+                self.in_flight -= 1
+
+        choice = resp.choices[0]
+        usage = resp.usage.model_dump() if resp.usage else None
+        return {"text": choice.message.content or "", "usage": usage}
+
+    async def generate_stream(self, messages: list[dict], timeout: Optional[float] = None) -> AsyncIterator[dict]:
+        """
+        Équivalent asynchrone de LLMDriver.generate_stream (mêmes événements)
+
+        Le timeout porte sur toute la durée du flux ; fermer l'itérateur
+        (aclose) ferme la requête HTTP et libère la place dans le sémaphore.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                deadline = loop.time() + (timeout or self.timeout)
+                stream = await asyncio.wait_for(
+                    self.resilience.acall(
+                        lambda: self.client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            temperature=self.temperature,
+                            max_completion_tokens=self.max_tokens,
+                            stream=True,
+                            stream_options={"include_usage": True},
+                        ),
+                        messages, self.max_tokens
+                    ),
+                    deadline - loop.time(),
+                )
+                parts = []
+                usage = None
+                try:
+                    chunks = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), max(deadline - loop.time(), 0))
+                        except StopAsyncIteration:
+                            break
+                        if chunk.usage:
+                            usage = chunk.usage.model_dump()
+                        if not chunk.choices:
+                            continue
+                        text = chunk.choices[0].delta.content
+                        if text:
+                            parts.append(text)
+                            yield {"type": "delta", "text": text}
+                finally:
+                    await stream.close()
+            finally:
+                self.in_flight -= 1
+
+        yield {"type": "done", "text": "".join(parts), "usage": usage}
+
+    async def aclose(self) -> None:
+        """Ferme le pool de connexions (hook de shutdown)"""
+        await self._http_client.aclose()
+
+
+class LLMLoopBridge:
+    """
+    Façade synchrone (interface de LLMDriver) d'un AsyncLLMDriver
+
+    Les appels sont exécutés sur la boucle d'événements du serveur depuis le
+    thread de l'appelant ; annuler le CancelToken annule la coroutine en cours
+    (et donc la requête HTTP). Le cache de réponses (SQLite, bloquant) est
+    consulté dans ce thread, jamais sur la boucle.
+    """
+
+    def __init__(
+        self,
+        driver: AsyncLLMDriver,
+        loop: asyncio.AbstractEventLoop,
+        cache: Optional[LLMResponseCache] = None
+    ):
+        self.driver = driver
+        self.loop = loop
+        self.cache = cache
+
+    @property
+    def model(self) -> str:
+        return self.driver.model
+
+    def generate(self, messages: list[dict], cancel_token: Optional[CancelToken] = None) -> dict:
+        cached = self._cache_lookup(messages)
+        if cached is not None:
+            return cached
+        response = self._run(self.driver.generate(messages), cancel_token)
+        self._cache_store(messages, response["text"])
+        return response
+
+    def generate_stream(self, messages: list[dict], cancel_token: Optional[CancelToken] = None) -> Iterator[dict]:
+        cached = self._cache_lookup(messages)
+        if cached is not None:
+            yield from _cached_stream(cached)
+            return
+
+        events = self.driver.generate_stream(messages)
+        try:
+            while True:
+                try:
+                    event = self._run(_next_event(events), cancel_token)
+                except StopAsyncIteration:
+                    return
+                if event["type"] == "done":
+                    self._cache_store(messages, event["text"])
+                yield event
+        finally:
+            asyncio.run_coroutine_threadsafe(events.aclose(), self.loop).result()
+
+    def _cache_lookup(self, messages: list[dict]) -> Optional[dict]:
+        if self.cache is None:
+            return None
+        driver = self.driver
+        return self.cache.lookup(driver.base_url, driver.model, driver.temperature, driver.max_tokens, messages)
+
+    def _cache_store(self, messages: list[dict], text: str) -> None:
+        if self.cache is not None:
+            driver = self.driver
+            self.cache.store(driver.base_url, driver.model, driver.temperature, driver.max_tokens, messages, text)
+
+    def _run(self, coro, cancel_token: Optional[CancelToken]):
+        """Exécute coro sur la boucle et attend son résultat (annulable par cancel_token)"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if cancel_token is None:
+            return future.result()
+        cancel_token.add_callback(future.cancel)
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            raise LLMCancelledError("Appel LLM annulé") from None
+        finally:
+            cancel_token.remove_callback(future.cancel)
+
+
+async def _next_event(events: AsyncIterator[dict]) -> dict:
+    """Coroutine de l'événement suivant (run_coroutine_threadsafe exige une coroutine)"""
+    return await events.__anext__()
@@ -0,0 +1,152 @@
+# Clara - Memory Async API
+"""
+Façade asyncio au-dessus de memory_core et contacts
+
+Les appels SQLite (bloquants) sont exécutés dans un pool de threads dédié,
+pour ne pas bloquer la boucle d'événements de FastAPI. Mêmes signatures que
+les fonctions synchrones :
+
+    from memory import async_api as amem
+    todos = await amem.get_items(type='todo', limit=50)
+
+Chaque thread du pool garde sa propre connexion (memory.connection).
+Le nombre d'appels en cours + en attente est borné : au-delà, les appelants
+attendent (backpressure) au lieu d'empiler des tâches sans limite.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from memory import memory_core
+from memory import contacts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_PENDING = 64  # appels en cours + en file d'attente
+
+_max_workers = DEFAULT_MAX_WORKERS
+_max_pending = DEFAULT_MAX_PENDING
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Un sémaphore par boucle d'événements (asyncio.Semaphore est lié à sa boucle)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def configure(max_workers: int = DEFAULT_MAX_WORKERS, max_pending: int = DEFAULT_MAX_PENDING) -> None:
+    """
+    Configure le pool de threads mémoire (l'ancien pool est arrêté)
+
+    Args:
+        max_workers: Nombre de threads SQLite
+        max_pending: Nombre maximum d'appels en cours + en attente
+    """
+    global _max_workers, _max_pending
+    if max_pending < max_workers:
+        raise ValueError("max_pending doit être >= max_workers")
+    shutdown()
+    _max_workers = max_workers
+    _max_pending = max_pending
+    _semaphores.clear()
+
+
+def shutdown(wait: bool = True) -> None:
+    """Arrête le pool de threads (hook de shutdown)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run_in_memory_executor(func: Callable, *args, **kwargs) -> Any:
+    """
+    Exécute une fonction mémoire synchrone dans le pool dédié
+
+    Args:
+        func: Fonction bloquante à exécuter
+        *args, **kwargs: Arguments de la fonction
+
+    Returns:
+        Le résultat de func
+    """
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore(loop):
+        return await loop.run_in_executor(
+            _get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Crée le pool à la première utilisation"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers,
+                thread_name_prefix="clara-memory",
+            )
+        return _executor
+
+
+def _get_semaphore(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    """Sémaphore borné propre à la boucle courante"""
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_max_pending)
+    return semaphore
+
+
+def _async_wrap(func: Callable) -> Callable:
+    """Construit la version async d'une fonction mémoire (même signature)"""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_in_memory_executor(func, *args, **kwargs)
+
+    return wrapper
+
+
+# ============================================
+# MEMORY CORE
+# ============================================
+
+init_db = _async_wrap(memory_core.init_db)
+save_item = _async_wrap(memory_core.save_item)
+update_item = _async_wrap(memory_core.update_item)
+get_items = _async_wrap(memory_core.get_items)
+get_items_page = _async_wrap(memory_core.get_items_page)
+get_items_by_tags = _async_wrap(memory_core.get_items_by_tags)
+search_items = _async_wrap(memory_core.search_items)
+search_items_ranked = _async_wrap(memory_core.search_items_ranked)
+delete_item = _async_wrap(memory_core.delete_item)
+save_items = _async_wrap(memory_core.save_items)
+update_items = _async_wrap(memory_core.update_items)
+delete_items = _async_wrap(memory_core.delete_items)
+save_preference = _async_wrap(memory_core.save_preference)
+get_preference_by_key = _async_wrap(memory_core.get_preference_by_key)
+list_preferences = _async_wrap(memory_core.list_preferences)
+search_preferences = _async_wrap(memory_core.search_preferences)
+reset_memory = _async_wrap(memory_core.reset_memory)
+
+# ============================================
+# CONTACTS
+# ============================================
+
+save_contact = _async_wrap(contacts.save_contact)
+update_contact = _async_wrap(contacts.update_contact)
+update_contacts = _async_wrap(contacts.update_contacts)
+get_contact_by_id = _async_wrap(contacts.get_contact_by_id)
+get_contact_by_phone = _async_wrap(contacts.get_contact_by_phone)
+get_contact_by_email = _async_wrap(contacts.get_contact_by_email)
+find_contacts = _async_wrap(contacts.find_contacts)
+get_all_contacts = _async_wrap(contacts.get_all_contacts)
+get_contacts_page = _async_wrap(contacts.get_contacts_page)
+get_contacts_by_tags = _async_wrap(contacts.get_contacts_by_tags)
+import_contacts = _async_wrap(contacts.import_contacts)
@@ -0,0 +1,233 @@
+# Clara - Connexions SQLite
+"""
+Gestionnaire de connexions SQLite partagé par tous les modules mémoire
+
+- Une connexion longue durée par thread et par base, réutilisée entre les appels
+- PRAGMA appliqués une seule fois à l'ouverture (WAL, synchronous, cache, mmap)
+- Configuration unique depuis config/settings.yaml (memory_db_path, memory_sqlite,
+  contacts.default_country_code)
+- Fermeture propre au shutdown (api_server.py, run_clara.py)
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import yaml
+
+from memory import identifiers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "memory/memory.sqlite"
+
+# PRAGMA appliqués à chaque nouvelle connexion
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",       # lectures concurrentes pendant les écritures
+    "synchronous": "NORMAL",     # sûr en WAL, un fsync par checkpoint seulement
+    "cache_size": -16000,        # négatif = KiB (16 Mo de cache de pages)
+    "mmap_size": 134217728,      # 128 Mo lus via mmap
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,        # ms d'attente si la base est verrouillée
+}
+
+_db_path = DEFAULT_DB_PATH
+_pragmas = dict(DEFAULT_PRAGMAS)
+
+# Connexions du thread courant : {chemin absolu: _PooledConnection}
+_local = threading.local()
+
+# Toutes les connexions ouvertes (tous threads), pour la fermeture globale
+_registry_lock = threading.Lock()
+_registry: list["_PooledConnection"] = []
+
+
+class _PooledConnection:
+    """Connexion ouverte + identité du fichier au moment de l'ouverture"""
+
+    def __init__(self, path: str, conn: sqlite3.Connection, inode: Optional[int]):
+        self.path = path
+        self.conn = conn
+        self.inode = inode
+        self.closed = False
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Fermeture connexion {self.path} échouée: {e}")
+
+
+def configure(db_path: Optional[str] = None, pragmas: Optional[dict] = None) -> None:
+    """
+    Configure le chemin par défaut et les PRAGMA des connexions
+
+    Les connexions déjà ouvertes sont fermées pour que la nouvelle
+    configuration s'applique aux prochains appels.
+
+    Args:
+        db_path: Chemin par défaut de la base (si fourni)
+        pragmas: PRAGMA à surcharger (fusionnés avec DEFAULT_PRAGMAS)
+    """
+    global _db_path, _pragmas
+
+    close_all_connections()
+    if db_path:
+        _db_path = db_path
+    _pragmas = dict(DEFAULT_PRAGMAS)
+    if pragmas:
+        _pragmas.update(pragmas)
+
+
+def configure_from_settings(config_path: str = "config/settings.yaml") -> None:
+    """
+    Configure le gestionnaire depuis config/settings.yaml
+
+    Lit memory_db_path, la section optionnelle memory_sqlite (PRAGMA) et
+    l'indicatif des numéros nationaux (contacts.default_country_code).
+    """
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            cfg = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        logger.warning(f"Config introuvable ({config_path}), connexions SQLite par défaut")
+        cfg = {}
+
+    configure(
+        db_path=cfg.get("memory_db_path", DEFAULT_DB_PATH),
+        pragmas=cfg.get("memory_sqlite") or None,
+    )
+    identifiers.configure((cfg.get("contacts") or {}).get("default_country_code"))
+
+
+def get_db_path(db_path: Optional[str] = None) -> str:
+    """Retourne db_path, ou le chemin configuré si None"""
+    return db_path or _db_path
+
+
+def get_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Retourne la connexion du thread courant pour cette base
+
+    La connexion est ouverte à la première demande puis réutilisée.
+    Elle est rouverte si le fichier a été supprimé ou remplacé entre-temps.
+    Utilisable comme `with get_connection(path) as conn:` (commit / rollback
+    automatiques, la connexion reste ouverte).
+
+    Args:
+        db_path: Chemin vers la base de données (défaut : chemin configuré)
+
+    Returns:
+        sqlite3.Connection avec row_factory = sqlite3.Row
+    """
+    path = os.path.abspath(get_db_path(db_path))
+
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    pooled = connections.get(path)
+    if pooled is not None and not pooled.closed and pooled.inode == _inode(path):
+        return pooled.conn
+
+    if pooled is not None:
+        _discard(pooled)
+
+    pooled = _open(path)
+    connections[path] = pooled
+    return pooled.conn
+
+
+@contextmanager
+def transaction(db_path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """
+    Ouvre une transaction d'écriture sur la connexion partagée
+
+    BEGIN IMMEDIATE prend le verrou d'écriture dès le début : toutes les
+    écritures du bloc partagent un seul commit (un seul fsync).
+    """
+    conn = get_connection(db_path)
+    if conn.in_transaction:
+        # Transaction déjà ouverte par l'appelant : on s'y intègre
+        yield conn
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+
+def close_connections(db_path: Optional[str] = None) -> None:
+    """
+    Ferme toutes les connexions (tous threads) ouvertes sur une base
+
+    Args:
+        db_path: Chemin de la base (défaut : chemin configuré)
+    """
+    path = os.path.abspath(get_db_path(db_path))
+    with _registry_lock:
+        targets = [p for p in _registry if p.path == path]
+        for pooled in targets:
+            _registry.remove(pooled)
+    for pooled in targets:
+        pooled.close()
+
+
+def close_all_connections() -> None:
+    """Ferme toutes les connexions ouvertes (hook de shutdown)"""
+    with _registry_lock:
+        targets = list(_registry)
+        _registry.clear()
+    for pooled in targets:
+        pooled.close()
+    if targets:
+        logger.debug(f"{len(targets)} connexion(s) SQLite fermée(s)")
+
+
+def _open(path: str) -> _PooledConnection:
+    """Ouvre une connexion et applique les PRAGMA configurés"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # check_same_thread=False : la connexion reste propre à un thread,
+    # mais doit pouvoir être fermée depuis le thread de shutdown
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+
+    for name, value in _pragmas.items():
+        try:
+            conn.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.Error as e:
+            logger.warning(f"PRAGMA {name}={value} ignoré: {e}")
+
+    pooled = _PooledConnection(path, conn, _inode(path))
+    with _registry_lock:
+        _registry.append(pooled)
+    logger.debug(f"Connexion SQLite ouverte: {path}")
+    return pooled
+
+
+def _discard(pooled: _PooledConnection) -> None:
+    """Retire une connexion obsolète du registre et la ferme"""
+    with _registry_lock:
+        if pooled in _registry:
+            _registry.remove(pooled)
+    pooled.close()
+
+
+def _inode(path: str) -> Optional[int]:
+    """Identité du fichier (None s'il n'existe pas)"""
+    try:
+        return os.stat(path).st_ino
+    except OSError:
+        return None
@@ -4,14 +4,64 @@ Helpers pour la gestion des contacts structurés
 Utilise la table contacts dédiée (pas la table memory)
 """
 
+import os
+import re
+import csv
 import json
 import sqlite3
 import logging
-from typing import Optional
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from memory.connection import get_connection, transaction
+from memory.memory_core import encode_cursor, decode_cursor, _build_fts_query, _table_exists
+from memory.tagging import normalize_tags, strip_accents, index_contact_tags
+from memory.identifiers import normalize_phone, normalize_email, write_contact_identifiers
 
 logger = logging.getLogger(__name__)
 
-DB_PATH = "memory/memory.sqlite"
+# None = chemin configuré (memory_db_path de config/settings.yaml)
+DB_PATH: Optional[str] = None
+
+# Poids BM25 des colonnes de contacts_fts (name, aliases, company, emails, phones)
+CONTACTS_FTS_WEIGHTS = (2.0, 1.5, 0.5, 1.0, 1.0)
+
+# Recherche floue : candidats lus dans l'index trigramme, similarité minimale retenue
+FUZZY_CANDIDATES = 50
+FUZZY_MIN_SIMILARITY = 0.4
+
+# Import en masse : contacts par transaction, erreurs détaillées conservées au maximum
+IMPORT_BATCH_SIZE = 500
+MAX_IMPORT_ERRORS = 100
+
+_IMPORT_EXTENSIONS = {'.vcf': 'vcard', '.vcard': 'vcard', '.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+# En-têtes CSV reconnus (minuscules, sans accents) -> champ contact
+_CSV_FIELDS = {
+    'first_name': 'first_name', 'first name': 'first_name', 'given name': 'first_name', 'prenom': 'first_name',
+    'last_name': 'last_name', 'last name': 'last_name', 'family name': 'last_name', 'nom': 'last_name',
+    'display_name': 'display_name', 'name': 'display_name', 'full name': 'display_name', 'nom complet': 'display_name',
+    'company': 'company', 'organization': 'company', 'organization 1 - name': 'company', 'societe': 'company',
+    'role': 'role', 'title': 'role', 'job title': 'role', 'organization 1 - title': 'role', 'fonction': 'role',
+    'aliases': 'aliases', 'nickname': 'aliases', 'surnom': 'aliases',
+    'notes': 'notes', 'note': 'notes',
+    'category': 'category', 'categorie': 'category',
+    'whatsapp': 'whatsapp_number', 'whatsapp_number': 'whatsapp_number',
+}
+_CSV_PHONE_WORDS = {'phone', 'telephone', 'tel', 'mobile', 'portable', 'cell'}
+_CSV_EMAIL_WORDS = {'email', 'mail', 'courriel'}
+
+# Libellés des téléphones / emails importés
+_CONTACT_LABELS = {
+    'mobile': {'cell', 'mobile', 'portable'},
+    'pro': {'work', 'business', 'pro', 'bureau'},
+    'perso': {'home', 'perso', 'personal', 'domicile'},
+}
+
+
+class ContactConflictError(ValueError):
+    """Le contact a été modifié depuis la version lue (verrouillage optimiste)"""
 
 
 def save_contact(contact: dict) -> int:
@@ -27,35 +77,10 @@ def save_contact(contact: dict) -> int:
     # Normaliser le contact
     normalized = _normalize_contact(contact)
     
-    # Générer des tags depuis le contact
-    tags = _generate_contact_tags(normalized)
-    
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO contacts (
-                    first_name, last_name, display_name, aliases, category,
-                    relationship, phones, emails, company, role, notes,
-                    whatsapp_number, tags
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                normalized.get('first_name'),
-                normalized.get('last_name'),
-                normalized.get('display_name'),
-                json.dumps(normalized.get('aliases', [])),
-                normalized.get('category', 'other'),
-                json.dumps(normalized.get('relationship', {})) if isinstance(normalized.get('relationship'), dict) else normalized.get('relationship', ''),
-                json.dumps(normalized.get('phones', [])),
-                json.dumps(normalized.get('emails', [])),
-                normalized.get('company'),
-                normalized.get('role'),
-                json.dumps(normalized.get('notes', [])),
-                normalized.get('whatsapp_number'),
-                json.dumps(tags)
-            ))
+        with get_connection(DB_PATH) as conn:
+            contact_id = _insert_contact(conn, normalized)
             conn.commit()
-            contact_id = cursor.lastrowid
             logger.debug(f"Contact sauvegardé: id={contact_id}, name={normalized.get('display_name')}")
             return contact_id
     except Exception as e:
@@ -63,18 +88,383 @@ def save_contact(contact: dict) -> int:
         raise
 
 
-def update_contact(contact_id: int, updates: dict) -> None:
+def update_contact(contact_id: int, updates: dict, expected_version: Optional[int] = None) -> int:
     """
     Met à jour un contact existant dans la table contacts
     
+    Lecture, fusion et écriture se font dans une seule transaction
+    (BEGIN IMMEDIATE) : aucune mise à jour concurrente ne peut s'intercaler.
+    
     Args:
         contact_id: ID du contact à mettre à jour
         updates: Dict avec les champs à mettre à jour
+        expected_version: Version lue par l'appelant (verrouillage optimiste) ;
+                          None = pas de contrôle
+    
+    Returns:
+        Nouvelle version du contact
+    
+    Raises:
+        ValueError: Si le contact n'existe pas
+        ContactConflictError: Si le contact a été modifié depuis expected_version
+    """
+    try:
+        with transaction(DB_PATH) as conn:
+            version = _apply_contact_update(conn, contact_id, updates, expected_version)
+        logger.debug(f"Contact mis à jour: id={contact_id}, version={version}")
+        return version
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.exception(f"update_contact failed for id={contact_id}: {e}")
+        raise
+
+
+def update_contacts(updates: list[dict]) -> int:
+    """
+    Met à jour plusieurs contacts en une seule transaction
+    
+    Args:
+        updates: Liste de dicts {id, expected_version (optionnel), champs à modifier...}
+                 Les contacts inexistants sont ignorés
+    
+    Returns:
+        Nombre de contacts modifiés
+    
+    Raises:
+        ContactConflictError: Si un contact a changé depuis son expected_version
+                              (aucune mise à jour du lot n'est appliquée)
+    """
+    updated = 0
+    try:
+        with transaction(DB_PATH) as conn:
+            for update in updates:
+                fields = {k: v for k, v in update.items() if k not in ('id', 'expected_version')}
+                try:
+                    _apply_contact_update(conn, update['id'], fields, update.get('expected_version'))
+                except ContactConflictError:
+                    raise
+                except ValueError:
+                    continue  # contact inexistant
+                updated += 1
+        logger.debug(f"{updated} contact(s) mis à jour en batch")
+        return updated
+    except ContactConflictError:
+        raise
+    except Exception as e:
+        logger.exception(f"update_contacts failed ({len(updates)} contacts): {e}")
+        raise
+
+
+def get_contact_by_id(contact_id: int) -> Optional[dict]:
+    """
+    Récupère un contact par son ID
+    
+    Args:
+        contact_id: ID du contact
+    
+    Returns:
+        Dict avec le contact ou None
+    """
+    with get_connection(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM contacts WHERE id = ?", (contact_id,))
+        row = cursor.fetchone()
+        if row:
+            return _row_to_contact_dict(row)
+        return None
+
+
+def get_contact_by_phone(number: str) -> Optional[dict]:
+    """
+    Résout un contact par numéro de téléphone (ou WhatsApp)
+
+    Le numéro est normalisé en E.164 : "06 12 34 56 78", "+33612345678"
+    et "0033 6 12 34 56 78" désignent le même contact.
+
+    Args:
+        number: Numéro dans un format libre
+
+    Returns:
+        Dict avec le contact ou None (numéro principal puis contact le plus récent
+        si plusieurs contacts partagent le numéro)
+    """
+    phone = normalize_phone(number)
+    if not phone:
+        return None
+    return _get_contact_by_identifier("contact_phones", "phone", phone)
+
+
+def get_contact_by_email(address: str) -> Optional[dict]:
+    """
+    Résout un contact par adresse email (insensible à la casse)
+
+    Args:
+        address: Adresse email
+
+    Returns:
+        Dict avec le contact ou None
+    """
+    email = normalize_email(address)
+    if not email:
+        return None
+    return _get_contact_by_identifier("contact_emails", "email", email)
+
+
+def find_contacts(query: str, limit: int = 50, fuzzy: bool = True) -> list[dict]:
+    """
+    Recherche des contacts par nom, alias, email, téléphone, company
+    
+    Args:
+        query: Texte à rechercher
+        limit: Limite de résultats
+        fuzzy: Tolère les fautes de frappe si rien n'est trouvé ("Mikael" -> "Michael")
+    
+    Returns:
+        Liste de contacts (dicts parsés), les plus pertinents en premier
+    """
+    results = search_contacts_ranked(query, limit=limit, fuzzy=fuzzy)
+    for contact in results:
+        contact.pop('score', None)
+        contact.pop('match', None)
+    return results
+
+
+def search_contacts_ranked(query: str, limit: int = 20, fuzzy: bool = True) -> list[dict]:
+    """
+    Recherche de contacts classée par pertinence, en trois étapes
+    
+    1. Mots (préfixes, sans accents) dans noms, alias, company, emails, téléphones (BM25)
+    2. Sinon, sous-chaîne n'importe où (comme LIKE '%q%', via l'index trigramme)
+    3. Sinon (si fuzzy), recherche floue par similarité de trigrammes
+    
+    Sans index de recherche (FTS5 indisponible), repli sur LIKE.
+    
+    Args:
+        query: Texte à rechercher
+        limit: Nombre maximum de résultats
+        fuzzy: Active l'étape floue
+    
+    Returns:
+        Liste de contacts + 'score' (plus grand = plus pertinent) et
+        'match' ("word", "substring" ou "fuzzy")
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+    
+    with get_connection(DB_PATH) as conn:
+        if not _table_exists(conn, 'contacts_fts'):
+            return _find_contacts_like(conn, query, limit)
+        
+        results = _search_contacts_words(conn, query, limit)
+        if results:
+            return results
+        
+        if not _table_exists(conn, 'contacts_trigram'):
+            return _find_contacts_like(conn, query, limit)
+        
+        results = _search_contacts_substring(conn, query, limit)
+        if results or not fuzzy:
+            return results
+        return _search_contacts_fuzzy(conn, query, limit)
+
+
+def get_all_contacts(limit: int = 100) -> list[dict]:
+    """
+    Récupère tous les contacts
+    
+    Args:
+        limit: Limite de résultats
+    
+    Returns:
+        Liste de contacts (dicts parsés)
+    """
+    with get_connection(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT * FROM contacts
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """, (limit,))
+        rows = cursor.fetchall()
+        return [_row_to_contact_dict(row) for row in rows]
+
+
+def get_contacts_page(limit: int = 50, cursor: Optional[str] = None) -> dict:
+    """
+    Récupère une page de contacts (pagination par curseur sur created_at, id)
+    
+    Args:
+        limit: Taille de la page
+        cursor: Curseur retourné par la page précédente (None = première page)
+    
+    Returns:
+        Dict {"contacts": [...], "next_cursor": str ou None si dernière page}
+    """
+    query = "SELECT * FROM contacts"
+    params = []
+    if cursor:
+        query += " WHERE (created_at, id) < (?, ?)"
+        params.extend(decode_cursor(cursor))
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+    
+    with get_connection(DB_PATH) as conn:
+        rows = conn.execute(query, params).fetchall()
+    
+    contacts = [_row_to_contact_dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and contacts:
+        next_cursor = encode_cursor(contacts[-1]['created_at'], contacts[-1]['id'])
+    return {"contacts": contacts, "next_cursor": next_cursor}
+
+
+def iter_contacts(batch_size: int = 200) -> Iterator[dict]:
+    """
+    Parcourt tous les contacts sans tout charger en mémoire (fetchmany par lots)
+    
+    Args:
+        batch_size: Nombre de lignes lues à la fois
+    
+    Yields:
+        Contacts (dicts parsés)
+    """
+    db_cursor = get_connection(DB_PATH).cursor()
+    try:
+        db_cursor.execute("SELECT * FROM contacts ORDER BY created_at DESC, id DESC")
+        while True:
+            rows = db_cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield _row_to_contact_dict(row)
+    finally:
+        db_cursor.close()
+
+
+def get_contacts_by_tags(tags: list[str], match: str = "any", limit: int = 100) -> list[dict]:
+    """
+    Récupère les contacts portant certains tags (résolu en SQL via contact_tags)
+    
+    Args:
+        tags: Tags recherchés (comparaison insensible à la casse)
+        match: "any" (au moins un tag) ou "all" (tous les tags)
+        limit: Limite de résultats
+    
+    Returns:
+        Liste de contacts (dicts parsés)
+    """
+    if match not in ("any", "all"):
+        raise ValueError(f"match doit valoir 'any' ou 'all' (reçu: {match})")
+    
+    normalized = normalize_tags(tags)
+    if not normalized:
+        return []
+    
+    placeholders = ','.join('?' for _ in normalized)
+    subquery = f"SELECT contact_id FROM contact_tags WHERE tag IN ({placeholders})"
+    params = list(normalized)
+    if match == "all":
+        subquery += " GROUP BY contact_id HAVING COUNT(*) = ?"
+        params.append(len(normalized))
+    params.append(limit)
+    
+    with get_connection(DB_PATH) as conn:
+        rows = conn.execute(
+            f"SELECT * FROM contacts WHERE id IN ({subquery}) ORDER BY created_at DESC LIMIT ?",
+            params
+        ).fetchall()
+        return [_row_to_contact_dict(row) for row in rows]
+
+def import_contacts(
+    source,
+    format: Optional[str] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    dry_run: bool = False,
+    progress: Optional[Callable[[dict], None]] = None
+) -> dict:
     """
-    # Récupérer le contact existant
-    existing = get_contact_by_id(contact_id)
-    if not existing:
+    Importe un carnet d'adresses (vCard, CSV ou JSON lines) en flux
+    
+    Le fichier est lu ligne à ligne (jamais chargé en entier) ; chaque contact
+    passe par _normalize_contact puis est écrit par lots, un lot = une transaction.
+    Un lot en échec est annulé et l'erreur remontée (les lots précédents restent).
+    
+    Args:
+        source: Chemin du fichier, ou itérable de lignes (fichier ouvert, liste...)
+        format: "vcard", "csv" ou "jsonl" (None = déduit de l'extension du chemin)
+        batch_size: Nombre de contacts par transaction
+        dry_run: Analyse et normalise sans rien écrire
+        progress: Appelé après chaque lot avec une copie du rapport
+    
+    Returns:
+        Rapport {parsed, imported, skipped, errors: [{position, error}], dry_run}
+        (position = numéro de ligne du début de l'enregistrement)
+    
+    Raises:
+        ValueError: Si le format est inconnu ou batch_size <= 0
+    """
+    if format is None:
+        if not isinstance(source, (str, os.PathLike)):
+            raise ValueError("format requis pour un flux (vcard, csv ou jsonl)")
+        format = _IMPORT_EXTENSIONS.get(Path(source).suffix.lower())
+    if format not in _IMPORT_PARSERS:
+        raise ValueError(f"Format d'import inconnu: {format} (disponibles: {sorted(_IMPORT_PARSERS)})")
+    if batch_size <= 0:
+        raise ValueError("batch_size doit être > 0")
+    
+    report = {"parsed": 0, "imported": 0, "skipped": 0, "errors": [], "dry_run": dry_run}
+    
+    def reject(position: int, error: str) -> None:
+        report["skipped"] += 1
+        if len(report["errors"]) < MAX_IMPORT_ERRORS:
+            report["errors"].append({"position": position, "error": error})
+    
+    def flush(batch: list[dict]) -> None:
+        if not dry_run:
+            with transaction(DB_PATH) as conn:
+                for normalized in batch:
+                    _insert_contact(conn, normalized)
+        report["imported"] += len(batch)
+        logger.info(f"Import contacts: {report['imported']} importé(s), {report['skipped']} ignoré(s)")
+        if progress:
+            progress({**report, "errors": list(report["errors"])})
+    
+    with _open_import_source(source) as lines:
+        batch = []
+        for position, raw in _IMPORT_PARSERS[format](lines):
+            report["parsed"] += 1
+            if isinstance(raw, Exception):
+                reject(position, str(raw))
+                continue
+            
+            normalized = _normalize_contact(raw)
+            if not (normalized['display_name'] or normalized['phones'] or normalized['emails']):
+                reject(position, "contact sans nom, téléphone ni email")
+                continue
+            
+            batch.append(normalized)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    
+    return report
+
+
+def _apply_contact_update(conn, contact_id: int, updates: dict, expected_version: Optional[int]) -> int:
+    """Lit, fusionne et réécrit un contact dans la transaction courante (retourne la nouvelle version)"""
+    row = conn.execute("SELECT * FROM contacts WHERE id = ?", (contact_id,)).fetchone()
+    if row is None:
         raise ValueError(f"Contact {contact_id} not found")
+    existing = _row_to_contact_dict(row)
+    if expected_version is not None and existing['version'] != expected_version:
+        raise ContactConflictError(
+            f"Contact {contact_id} modifié entre-temps (version {existing['version']}, attendue {expected_version})"
+        )
     
     # Appliquer les updates
     updated_data = existing.copy()
@@ -128,95 +518,360 @@ def update_contact(contact_id: int, updates: dict) -> None:
         set_clauses.append("whatsapp_number = ?")
         params.append(normalized.get('whatsapp_number'))
     
-    # Toujours mettre à jour tags et updated_at
+    # Toujours mettre à jour tags, updated_at et version
     set_clauses.append("tags = ?")
     params.append(json.dumps(tags))
     set_clauses.append("updated_at = CURRENT_TIMESTAMP")
+    set_clauses.append("version = version + 1")
     
-    params.append(contact_id)
+    params.extend([contact_id, existing['version']])
     
-    try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                f"UPDATE contacts SET {', '.join(set_clauses)} WHERE id = ?",
-                params
-            )
-            conn.commit()
-            logger.debug(f"Contact mis à jour: id={contact_id}")
-    except Exception as e:
-        logger.exception(f"update_contact failed for id={contact_id}: {e}")
-        raise
+    cursor = conn.execute(
+        f"UPDATE contacts SET {', '.join(set_clauses)} WHERE id = ? AND version = ?",
+        params
+    )
+    if cursor.rowcount == 0:
+        # Transaction différée de l'appelant : une autre écriture est passée entre lecture et UPDATE
+        raise ContactConflictError(f"Contact {contact_id} modifié entre-temps")
+    index_contact_tags(conn, [(contact_id, tags)])
+    if {'phones', 'emails', 'whatsapp_number'} & updates.keys():
+        write_contact_identifiers(
+            conn, contact_id,
+            normalized.get('phones', []),
+            normalized.get('emails', []),
+            normalized.get('whatsapp_number')
+        )
+    return existing['version'] + 1
 
 
-def get_contact_by_id(contact_id: int) -> Optional[dict]:
-    """
-    Récupère un contact par son ID
+def _search_contacts_words(conn, query: str, limit: int) -> list[dict]:
+    """Étape 1 : tous les mots de la requête, comme préfixes (contacts_fts)"""
+    fts_query = _build_fts_query(query)
+    if fts_query is None:
+        return []
     
-    Args:
-        contact_id: ID du contact
+    weights = ', '.join(str(w) for w in CONTACTS_FTS_WEIGHTS)
+    rows = conn.execute(f"""
+        SELECT c.*, -bm25(contacts_fts, {weights}) AS score
+        FROM contacts_fts
+        JOIN contacts c ON c.id = contacts_fts.rowid
+        WHERE contacts_fts MATCH ?
+        ORDER BY bm25(contacts_fts, {weights})
+        LIMIT ?
+    """, (fts_query, limit)).fetchall()
+    return [_row_to_ranked_contact(row, row['score'], 'word') for row in rows]
+
+
+def _search_contacts_substring(conn, query: str, limit: int) -> list[dict]:
+    """Étape 2 : sous-chaîne n'importe où (contacts_trigram, au moins 3 caractères)"""
+    if len(query) < 3:
+        return []
     
-    Returns:
-        Dict avec le contact ou None
-    """
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM contacts WHERE id = ?", (contact_id,))
-        row = cursor.fetchone()
-        if row:
-            return _row_to_contact_dict(row)
-        return None
+    rows = conn.execute("""
+        SELECT c.*, -bm25(contacts_trigram) AS score
+        FROM contacts_trigram
+        JOIN contacts c ON c.id = contacts_trigram.rowid
+        WHERE contacts_trigram MATCH ?
+        ORDER BY bm25(contacts_trigram)
+        LIMIT ?
+    """, ('"' + query.replace('"', '""') + '"', limit)).fetchall()
+    return [_row_to_ranked_contact(row, row['score'], 'substring') for row in rows]
 
 
-def find_contacts(query: str, limit: int = 50) -> list[dict]:
+def _search_contacts_fuzzy(conn, query: str, limit: int) -> list[dict]:
     """
-    Recherche des contacts par nom, alias, email, téléphone, company
+    Étape 3 : candidats partageant des trigrammes avec la requête, reclassés par
+    similarité (Dice sur trigrammes) entre chaque mot de la requête et le mot
+    le plus proche du contact
+    """
+    words = [strip_accents(word) for word in re.findall(r'\w+', query.lower())]
+    grams = set()
+    for word in re.findall(r'\w+', query.lower()) + words:
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    if not grams:
+        return []
     
-    Args:
-        query: Texte à rechercher
-        limit: Limite de résultats
+    rows = conn.execute("""
+        SELECT c.*
+        FROM contacts_trigram
+        JOIN contacts c ON c.id = contacts_trigram.rowid
+        WHERE contacts_trigram MATCH ?
+        ORDER BY bm25(contacts_trigram)
+        LIMIT ?
+    """, (' OR '.join(f'"{gram}"' for gram in sorted(grams)), FUZZY_CANDIDATES)).fetchall()
     
-    Returns:
-        Liste de contacts (dicts parsés)
-    """
+    scored = []
+    for row in rows:
+        contact = _row_to_contact_dict(row)
+        candidates = [strip_accents(word) for word in re.findall(r'\w+', _contact_search_text(contact).lower())]
+        if not candidates:
+            continue
+        score = sum(
+            max(_trigram_similarity(word, candidate) for candidate in candidates)
+            for word in words
+        ) / len(words)
+        if score >= FUZZY_MIN_SIMILARITY:
+            contact['score'] = score
+            contact['match'] = 'fuzzy'
+            scored.append(contact)
+    
+    scored.sort(key=lambda c: c['score'], reverse=True)
+    return scored[:limit]
+
+
+def _find_contacts_like(conn, query: str, limit: int) -> list[dict]:
+    """Recherche par sous-chaîne sur les colonnes brutes (repli sans index FTS5)"""
     search_pattern = f"%{query}%"
+    rows = conn.execute("""
+        SELECT * FROM contacts
+        WHERE first_name LIKE ? OR last_name LIKE ? OR display_name LIKE ?
+           OR aliases LIKE ? OR emails LIKE ? OR phones LIKE ? OR company LIKE ?
+        ORDER BY created_at DESC
+        LIMIT ?
+    """, (search_pattern, search_pattern, search_pattern, search_pattern,
+          search_pattern, search_pattern, search_pattern, limit)).fetchall()
+    return [_row_to_ranked_contact(row, 0.0, 'substring') for row in rows]
+
+
+def _get_contact_by_identifier(table: str, column: str, value: str) -> Optional[dict]:
+    """Lookup indexé (clé primaire) dans contact_phones / contact_emails"""
+    with get_connection(DB_PATH) as conn:
+        row = conn.execute(f"""
+            SELECT c.* FROM {table} i
+            JOIN contacts c ON c.id = i.contact_id
+            WHERE i.{column} = ?
+            ORDER BY i.is_primary DESC, c.updated_at DESC, c.id DESC
+            LIMIT 1
+        """, (value,)).fetchone()
+        return _row_to_contact_dict(row) if row else None
+
+
+def _row_to_ranked_contact(row: sqlite3.Row, score: float, match: str) -> dict:
+    """Contact parsé + score et type de correspondance"""
+    contact = _row_to_contact_dict(row)
+    contact['score'] = score
+    contact['match'] = match
+    return contact
+
+
+def _contact_search_text(contact: dict) -> str:
+    """Noms, alias, company et emails d'un contact (pour la similarité floue)"""
+    parts = [contact.get('first_name'), contact.get('last_name'), contact.get('display_name'), contact.get('company')]
+    parts += contact.get('aliases') or []
+    parts += [e.get('address') if isinstance(e, dict) else e for e in contact.get('emails') or []]
+    return ' '.join(str(part) for part in parts if part)
+
+
+def _trigram_similarity(a: str, b: str) -> float:
+    """Coefficient de Dice entre trigrammes (mots bordés d'espaces)"""
+    grams_a = {f"  {a} "[i:i + 3] for i in range(len(a) + 1)}
+    grams_b = {f"  {b} "[i:i + 3] for i in range(len(b) + 1)}
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def _open_import_source(source):
+    """Ouvre un chemin (UTF-8, BOM toléré) ou laisse un itérable de lignes tel quel"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, 'r', encoding='utf-8-sig', newline='')
+    return nullcontext(source)
+
+
+def _iter_jsonl_contacts(lines) -> Iterator[tuple]:
+    """Un objet JSON contact par ligne -> (ligne, dict ou erreur)"""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, ValueError(f"JSON invalide: {e.msg}")
+            continue
+        yield number, record if isinstance(record, dict) else ValueError("objet JSON attendu")
+
+
+def _iter_csv_contacts(lines) -> Iterator[tuple]:
+    """Lignes CSV avec en-têtes (exports Google / Outlook / maison) -> (ligne, dict)"""
+    reader = csv.DictReader(lines)
+    columns = {}
+    for header in reader.fieldnames or []:
+        key = strip_accents((header or '').strip().lower())
+        words = set(re.findall(r"[a-z]+", key))
+        if key in _CSV_FIELDS:
+            columns[header] = (_CSV_FIELDS[key], None)
+        elif words & {'type', 'label'}:
+            continue
+        elif words & _CSV_PHONE_WORDS:
+            columns[header] = ('phones', _contact_label(words))
+        elif words & _CSV_EMAIL_WORDS:
+            columns[header] = ('emails', _contact_label(words))
     
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM contacts
-            WHERE first_name LIKE ? OR last_name LIKE ? OR display_name LIKE ?
-               OR aliases LIKE ? OR emails LIKE ? OR phones LIKE ? OR company LIKE ?
-            ORDER BY created_at DESC
-            LIMIT ?
-        """, (search_pattern, search_pattern, search_pattern, search_pattern, 
-              search_pattern, search_pattern, search_pattern, limit))
-        rows = cursor.fetchall()
-        return [_row_to_contact_dict(row) for row in rows]
+    position = reader.line_num + 1
+    for row in reader:
+        contact: dict = {}
+        for header, (field, label) in columns.items():
+            value = (row.get(header) or '').strip()
+            if not value:
+                continue
+            if field == 'phones':
+                contact.setdefault('phones', []).extend(
+                    {'number': v.strip(), 'label': label} for v in value.split(':::') if v.strip()
+                )
+            elif field == 'emails':
+                contact.setdefault('emails', []).extend(
+                    {'address': v.strip(), 'label': label} for v in value.split(':::') if v.strip()
+                )
+            elif field == 'aliases':
+                contact['aliases'] = [a.strip() for a in value.split(',') if a.strip()]
+            elif field == 'notes':
+                contact['notes'] = [value]
+            else:
+                contact[field] = value
+        yield position, contact
+        position = reader.line_num + 1
 
 
-def get_all_contacts(limit: int = 100) -> list[dict]:
-    """
-    Récupère tous les contacts
+def _iter_vcard_contacts(lines) -> Iterator[tuple]:
+    """Cartes BEGIN:VCARD ... END:VCARD (vCard 2.1 / 3.0 / 4.0) -> (ligne, dict)"""
+    card, start = None, 0
+    for number, line in _unfold_vcard_lines(lines):
+        head, sep, value = line.partition(':')
+        if not sep:
+            continue
+        parts = head.split(';')
+        name = parts[0].rsplit('.', 1)[-1].upper()  # "item1.TEL" -> "TEL"
+        
+        if name == 'BEGIN' and value.strip().upper() == 'VCARD':
+            card, start = {}, number
+        elif name == 'END' and value.strip().upper() == 'VCARD':
+            if card is not None:
+                yield start, card
+            card = None
+        elif card is not None:
+            _apply_vcard_property(card, name, _vcard_types(parts[1:]), value)
     
-    Args:
-        limit: Limite de résultats
+    if card is not None:
+        yield start, ValueError("carte vCard sans END:VCARD")
+
+
+def _unfold_vcard_lines(lines) -> Iterator[tuple]:
+    """Recolle les lignes repliées (continuation commençant par espace / tabulation)"""
+    current, start = None, 0
+    for number, raw in enumerate(lines, start=1):
+        raw = raw.rstrip('\r\n')
+        if raw[:1] in (' ', '\t') and current is not None:
+            current += raw[1:]
+            continue
+        if current:
+            yield start, current
+        current, start = raw, number
+    if current:
+        yield start, current
+
+
+def _vcard_types(params: list[str]) -> set:
+    """Types d'une propriété : "TYPE=CELL,VOICE", "PREF=1" ou vCard 2.1 "CELL" """
+    types = set()
+    for param in params:
+        key, sep, value = param.partition('=')
+        if not sep:
+            types.add(key.upper())
+        elif key.upper() == 'TYPE':
+            types.update(v.strip('"').upper() for v in value.split(','))
+        elif key.upper() == 'PREF':
+            types.add('PREF')
+    return types
+
+
+def _apply_vcard_property(card: dict, name: str, types: set, value: str) -> None:
+    """Reporte une propriété vCard dans le dict contact"""
+    if name == 'FN':
+        card['display_name'] = _vcard_unescape(value)
+    elif name == 'N':
+        components = _vcard_split(value, ';') + ['', '']
+        card['last_name'], card['first_name'] = components[0], components[1]
+    elif name == 'NICKNAME':
+        card.setdefault('aliases', []).extend(a for a in _vcard_split(value, ',') if a)
+    elif name == 'TEL' and value.strip():
+        card.setdefault('phones', []).append({
+            'number': _vcard_unescape(value).strip(),
+            'label': _contact_label(types),
+            'primary': 'PREF' in types,
+        })
+    elif name == 'EMAIL' and value.strip():
+        card.setdefault('emails', []).append({
+            'address': _vcard_unescape(value).strip(),
+            'label': _contact_label(types),
+            'primary': 'PREF' in types,
+        })
+    elif name == 'ORG':
+        card['company'] = _vcard_split(value, ';')[0] or None
+    elif name == 'TITLE':
+        card['role'] = _vcard_unescape(value)
+    elif name == 'NOTE':
+        card.setdefault('notes', []).append(_vcard_unescape(value))
+
+
+def _contact_label(words: set) -> Optional[str]:
+    """Libellé d'un téléphone / email ("Mobile Phone" ou TYPE=CELL -> mobile, HOME -> perso, WORK -> pro)"""
+    words = {word.lower() for word in words}
+    for label, keywords in _CONTACT_LABELS.items():
+        if words & keywords:
+            return label
+    return None
+
+
+def _vcard_split(value: str, separator: str) -> list[str]:
+    """Découpe sur les séparateurs non échappés puis déséchappe"""
+    return [_vcard_unescape(part).strip() for part in re.split(r'(?<!\\)' + re.escape(separator), value)]
+
+
+def _vcard_unescape(value: str) -> str:
+    """Déséchappe une valeur vCard (retours à la ligne, virgules, points-virgules)"""
+    return re.sub(r'\\(.)', lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+
+_IMPORT_PARSERS = {
+    'vcard': _iter_vcard_contacts,
+    'csv': _iter_csv_contacts,
+    'jsonl': _iter_jsonl_contacts,
+}
+
+
+def _insert_contact(conn, normalized: dict) -> int:
+    """Insère un contact normalisé et ses téléphones / emails (sans commit)"""
+    # Générer des tags depuis le contact
+    tags = _generate_contact_tags(normalized)
     
-    Returns:
-        Liste de contacts (dicts parsés)
-    """
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM contacts
-            ORDER BY created_at DESC
-            LIMIT ?
-        """, (limit,))
-        rows = cursor.fetchall()
-        return [_row_to_contact_dict(row) for row in rows]
+    cursor = conn.execute("""
+        INSERT INTO contacts (
+            first_name, last_name, display_name, aliases, category,
+            relationship, phones, emails, company, role, notes,
+            whatsapp_number, tags
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        normalized.get('first_name'),
+        normalized.get('last_name'),
+        normalized.get('display_name'),
+        json.dumps(normalized.get('aliases', [])),
+        normalized.get('category', 'other'),
+        json.dumps(normalized.get('relationship', {})) if isinstance(normalized.get('relationship'), dict) else normalized.get('relationship', ''),
+        json.dumps(normalized.get('phones', [])),
+        json.dumps(normalized.get('emails', [])),
+        normalized.get('company'),
+        normalized.get('role'),
+        json.dumps(normalized.get('notes', [])),
+        normalized.get('whatsapp_number'),
+        json.dumps(tags)
+    ))
+    contact_id = cursor.lastrowid
+    index_contact_tags(conn, [(contact_id, tags)])
+    write_contact_identifiers(
+        conn, contact_id,
+        normalized.get('phones', []),
+        normalized.get('emails', []),
+        normalized.get('whatsapp_number')
+    )
+    return contact_id
 
 
 def _normalize_contact(contact: dict) -> dict:
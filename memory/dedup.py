@@ -0,0 +1,410 @@
+# Clara - Déduplication des contacts
+"""
+Détection et fusion des contacts en double
+
+Les candidats sont regroupés par clés de blocage (téléphone E.164, email,
+nom normalisé) : seuls les contacts d'un même bloc sont comparés, jamais
+toutes les paires. Chaque paire reçoit un score de similarité ; au-dessus
+du seuil, les contacts sont fusionnés dans le plus ancien, en une transaction.
+
+- deduplicate_contacts : job batch sur tout le carnet
+- merge_into_existing : déduplication incrémentale d'un contact qui vient d'être créé
+  (identifiant partagé exigé : un nom seul ne fusionne qu'en batch ou sur rapport)
+"""
+
+import re
+import json
+import logging
+from typing import Optional
+
+from memory.connection import get_connection, transaction
+from memory.contacts import (
+    iter_contacts, get_contact_by_id, search_contacts_ranked,
+    _normalize_contact, _generate_contact_tags, _row_to_contact_dict, _trigram_similarity
+)
+from memory.identifiers import (
+    normalize_phone, normalize_email, contact_phone_entries, contact_email_entries,
+    write_contact_identifiers
+)
+from memory.tagging import strip_accents, index_contact_tags
+import memory.contacts
+
+logger = logging.getLogger(__name__)
+
+# Score minimal pour considérer deux contacts comme la même personne
+DUPLICATE_MIN_SCORE = 0.8
+
+# Poids d'un type d'identifiant partagé (téléphone, email), complété par la similarité des noms :
+# un seul type -> 0.6, les deux -> 0.84 (preuves indépendantes)
+SHARED_IDENTIFIER_SCORE = 0.6
+
+# Noms identiques mais téléphones ET emails différents : probablement deux personnes
+CONFLICT_PENALTY = 0.7
+
+# Preuves exigées pour fusionner à l'enregistrement : deux homonymes sans
+# téléphone ni email (score 1.0 sur le nom seul) restent distincts
+AUTO_MERGE_REASONS = {"phone", "email"}
+
+# Blocs plus grands ignorés (standard partagé, nom très courant) : coût quadratique
+MAX_BLOCK_SIZE = 50
+
+
+def find_duplicates(contact_id: Optional[int] = None, min_score: float = DUPLICATE_MIN_SCORE) -> list[dict]:
+    """
+    Paires de contacts probablement en double
+
+    Args:
+        contact_id: Ne cherche que les doublons de ce contact (None = tout le carnet)
+        min_score: Score minimal retenu
+
+    Returns:
+        Liste de {ids: (id_a, id_b), score, reasons} triée par score décroissant
+        (reasons parmi "phone", "email", "name")
+    """
+    if contact_id is None:
+        profiles = {contact['id']: _profile(contact) for contact in iter_contacts()}
+        pairs = _blocked_pairs(profiles.values())
+    else:
+        contact = get_contact_by_id(contact_id)
+        if not contact:
+            return []
+        target = _profile(contact)
+        profiles = {target['id']: target}
+        for candidate in _candidates_for(target):
+            profiles.setdefault(candidate['id'], _profile(candidate))
+        pairs = {tuple(sorted((contact_id, other))) for other in profiles if other != contact_id}
+
+    duplicates = []
+    for a, b in pairs:
+        score, reasons = score_pair(profiles[a], profiles[b])
+        if score >= min_score:
+            duplicates.append({"ids": (a, b), "score": round(score, 3), "reasons": reasons})
+    duplicates.sort(key=lambda d: (-d["score"], d["ids"]))
+    return duplicates
+
+
+def deduplicate_contacts(min_score: float = DUPLICATE_MIN_SCORE, dry_run: bool = False) -> dict:
+    """
+    Job batch : fusionne tous les groupes de doublons du carnet
+
+    Les paires au-dessus du seuil sont regroupées (transitivité : A~B et B~C
+    donnent un seul groupe) ; chaque groupe est fusionné dans son contact le
+    plus ancien, une transaction par groupe.
+
+    Args:
+        min_score: Score minimal d'une paire
+        dry_run: Calcule les groupes sans rien fusionner
+
+    Returns:
+        Rapport {pairs, groups: [{keep, merged}], merged, dry_run}
+    """
+    pairs = find_duplicates(min_score=min_score)
+
+    parent: dict[int, int] = {}
+
+    def root(node: int) -> int:
+        while parent.setdefault(node, node) != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for pair in pairs:
+        a, b = (root(i) for i in pair["ids"])
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    clusters: dict[int, list[int]] = {}
+    for node in list(parent):
+        clusters.setdefault(root(node), []).append(node)
+
+    groups = [
+        {"keep": keep, "merged": sorted(i for i in members if i != keep)}
+        for keep, members in sorted(clusters.items())
+    ]
+    if not dry_run:
+        for group in groups:
+            merge_contacts(group["keep"], group["merged"])
+
+    merged = sum(len(group["merged"]) for group in groups)
+    logger.info(f"Déduplication contacts: {len(groups)} groupe(s), {merged} contact(s) fusionné(s)")
+    return {"pairs": len(pairs), "groups": groups, "merged": merged, "dry_run": dry_run}
+
+
+def merge_into_existing(contact_id: int, min_score: float = DUPLICATE_MIN_SCORE) -> int:
+    """
+    Déduplication incrémentale : fusionne un contact fraîchement créé dans son doublon
+
+    Seules les paires partageant un téléphone ou un email sont fusionnées ; une
+    similarité de nom seule est laissée à find_duplicates / deduplicate_contacts.
+
+    Args:
+        contact_id: Contact à vérifier (typiquement l'ID retourné par save_contact)
+        min_score: Score minimal pour fusionner
+
+    Returns:
+        ID du contact conservé (contact_id s'il n'a pas de doublon)
+    """
+    duplicates = [
+        pair for pair in find_duplicates(contact_id, min_score=min_score)
+        if AUTO_MERGE_REASONS & set(pair["reasons"])
+    ]
+    if not duplicates:
+        return contact_id
+
+    others = {i for pair in duplicates for i in pair["ids"]} - {contact_id}
+    keep = min(others | {contact_id})
+    merge_contacts(keep, sorted((others | {contact_id}) - {keep}))
+    return keep
+
+
+def merge_contacts(keep_id: int, duplicate_ids: list[int]) -> Optional[dict]:
+    """
+    Fusionne des contacts dans keep_id puis supprime les doublons (une transaction)
+
+    Le contact conservé garde ses valeurs ; les champs vides sont complétés par
+    les doublons. Alias, téléphones, emails et notes sont unis (sans doublon
+    après normalisation) ; les autres noms affichés deviennent des alias.
+
+    Args:
+        keep_id: Contact conservé
+        duplicate_ids: Contacts absorbés puis supprimés
+
+    Returns:
+        Contact fusionné, ou None si keep_id n'existe pas
+
+    Raises:
+        ValueError: Si keep_id figure dans duplicate_ids
+    """
+    duplicate_ids = list(dict.fromkeys(duplicate_ids))
+    if keep_id in duplicate_ids:
+        raise ValueError(f"Le contact {keep_id} ne peut pas être fusionné avec lui-même")
+
+    ids = [keep_id, *duplicate_ids]
+    with transaction(memory.contacts.DB_PATH) as conn:
+        rows = {
+            row['id']: _row_to_contact_dict(row)
+            for row in conn.execute(
+                f"SELECT * FROM contacts WHERE id IN ({','.join('?' for _ in ids)})", ids
+            )
+        }
+        keep = rows.get(keep_id)
+        if keep is None:
+            return None
+        duplicates = [rows[i] for i in duplicate_ids if i in rows]
+        if not duplicates:
+            return keep
+
+        merged = _merge_records(keep, duplicates)
+        normalized = _normalize_contact(merged)
+        rel = normalized.get('relationship')
+        tags = _generate_contact_tags(normalized)
+        conn.execute("""
+            UPDATE contacts SET
+                first_name = ?, last_name = ?, display_name = ?, aliases = ?, category = ?,
+                relationship = ?, phones = ?, emails = ?, company = ?, role = ?, notes = ?,
+                whatsapp_number = ?, tags = ?, updated_at = CURRENT_TIMESTAMP, version = version + 1
+            WHERE id = ?
+        """, (
+            normalized.get('first_name'),
+            normalized.get('last_name'),
+            normalized.get('display_name'),
+            json.dumps(normalized.get('aliases', [])),
+            normalized.get('category', 'other'),
+            json.dumps(rel) if isinstance(rel, dict) else rel,
+            json.dumps(normalized.get('phones', [])),
+            json.dumps(normalized.get('emails', [])),
+            normalized.get('company'),
+            normalized.get('role'),
+            json.dumps(normalized.get('notes', [])),
+            normalized.get('whatsapp_number'),
+            json.dumps(tags),
+            keep_id,
+        ))
+        index_contact_tags(conn, [(keep_id, tags)])
+        # La suppression nettoie index de recherche, tags et téléphones / emails (triggers)
+        conn.execute(
+            f"DELETE FROM contacts WHERE id IN ({','.join('?' for _ in duplicates)})",
+            [d['id'] for d in duplicates]
+        )
+        write_contact_identifiers(
+            conn, keep_id, normalized.get('phones', []), normalized.get('emails', []),
+            normalized.get('whatsapp_number')
+        )
+
+    logger.debug(f"Contacts {[d['id'] for d in duplicates]} fusionnés dans {keep_id}")
+    return get_contact_by_id(keep_id)
+
+
+def score_pair(a: dict, b: dict) -> tuple[float, list[str]]:
+    """
+    Score de similarité de deux profils (voir _profile)
+
+    Returns:
+        (score entre 0 et 1, raisons)
+    """
+    reasons = []
+    if a['phones'] & b['phones']:
+        reasons.append("phone")
+    if a['emails'] & b['emails']:
+        reasons.append("email")
+
+    name_similarity = _trigram_similarity(a['name'], b['name']) if a['name'] and b['name'] else 0.0
+    if name_similarity >= DUPLICATE_MIN_SCORE:
+        reasons.append("name")
+
+    shared = len({"phone", "email"} & set(reasons))
+    if shared:
+        base = 1 - (1 - SHARED_IDENTIFIER_SCORE) ** shared
+        score = base + (1 - base) * name_similarity
+        if not (a['name'] and b['name']):
+            # Un seul des deux est nommé : l'identifiant partagé suffit
+            score = max(score, DUPLICATE_MIN_SCORE)
+    else:
+        conflict = (a['phones'] and b['phones']) or (a['emails'] and b['emails'])
+        score = name_similarity * (CONFLICT_PENALTY if conflict else 1.0)
+    return score, reasons
+
+
+# ============================================
+# UTILITAIRES
+# ============================================
+
+def _profile(contact: dict) -> dict:
+    """Vue réduite d'un contact pour le blocage et le score"""
+    first = _normalize_name(contact.get('first_name'))
+    last = _normalize_name(contact.get('last_name'))
+    name = _normalize_name(contact.get('display_name')) or f"{first} {last}".strip()
+    tokens = sorted(set(name.split()))
+
+    profile = {
+        'id': contact['id'],
+        'name': " ".join(tokens),
+        'phones': {phone for phone, _, _ in contact_phone_entries(contact.get('phones'), contact.get('whatsapp_number'))},
+        'emails': {email for email, _, _ in contact_email_entries(contact.get('emails'))},
+    }
+    keys = [('phone', phone) for phone in profile['phones']]
+    keys += [('email', email) for email in profile['emails']]
+    if tokens:
+        keys.append(('name', profile['name']))
+    if first and last:
+        # "P. Martin" et "Paul Martin" tombent dans le même bloc
+        keys.append(('initial', f"{last} {first[0]}"))
+    profile['keys'] = keys
+    return profile
+
+
+def _blocked_pairs(profiles) -> set[tuple]:
+    """Paires (id_a, id_b) partageant au moins une clé de blocage"""
+    blocks: dict[tuple, list[int]] = {}
+    for profile in profiles:
+        for key in profile['keys']:
+            blocks.setdefault(key, []).append(profile['id'])
+
+    pairs = set()
+    for key, ids in blocks.items():
+        if len(ids) > MAX_BLOCK_SIZE:
+            logger.debug(f"Bloc de déduplication ignoré ({len(ids)} contacts): {key}")
+            continue
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:]:
+                pairs.add((min(a, b), max(a, b)))
+    return pairs
+
+
+def _candidates_for(profile: dict) -> list[dict]:
+    """Contacts partageant une clé de blocage avec un profil (index, sans parcours complet)"""
+    candidates = {}
+    for phone in profile['phones']:
+        _add_identifier_matches(candidates, 'contact_phones', 'phone', phone)
+    for email in profile['emails']:
+        _add_identifier_matches(candidates, 'contact_emails', 'email', email)
+    if profile['name']:
+        for contact in search_contacts_ranked(profile['name'], limit=MAX_BLOCK_SIZE, fuzzy=False):
+            candidates.setdefault(contact['id'], contact)
+    candidates.pop(profile['id'], None)
+    return list(candidates.values())
+
+
+def _add_identifier_matches(candidates: dict, table: str, column: str, value: str) -> None:
+    """Ajoute les contacts indexés sous un téléphone / email"""
+    with get_connection(memory.contacts.DB_PATH) as conn:
+        rows = conn.execute(
+            f"SELECT c.* FROM {table} i JOIN contacts c ON c.id = i.contact_id WHERE i.{column} = ? LIMIT ?",
+            (value, MAX_BLOCK_SIZE)
+        ).fetchall()
+    for row in rows:
+        candidates.setdefault(row['id'], _row_to_contact_dict(row))
+
+
+def _merge_records(keep: dict, duplicates: list[dict]) -> dict:
+    """Fusionne les champs des doublons dans une copie du contact conservé"""
+    merged = dict(keep)
+    records = [keep, *duplicates]
+
+    for field in ('display_name', 'first_name', 'last_name', 'company', 'role', 'whatsapp_number', 'relationship'):
+        if not merged.get(field):
+            merged[field] = next((r[field] for r in duplicates if r.get(field)), merged.get(field))
+    if merged.get('category') in (None, '', 'other'):
+        merged['category'] = next(
+            (r['category'] for r in duplicates if r.get('category') not in (None, '', 'other')),
+            merged.get('category') or 'other'
+        )
+
+    # Les autres noms affichés deviennent des alias
+    display = merged.get('display_name') or ''
+    aliases = list(keep.get('aliases') or [])
+    for record in duplicates:
+        aliases += record.get('aliases') or []
+        if record.get('display_name'):
+            aliases.append(record['display_name'])
+    merged['aliases'] = _unique(
+        [a for a in aliases if a and _normalize_name(a) != _normalize_name(display)],
+        key=_normalize_name
+    )
+
+    merged['phones'] = _merge_entries(records, 'phones', 'number', normalize_phone)
+    merged['emails'] = _merge_entries(records, 'emails', 'address', normalize_email)
+    merged['notes'] = _unique(
+        [note for r in records for note in r.get('notes') or []],
+        key=lambda note: json.dumps(note, sort_keys=True, ensure_ascii=False)
+    )
+    return merged
+
+
+def _merge_entries(records: list[dict], field: str, value_key: str, normalize) -> list:
+    """Union des téléphones / emails, un seul principal (celui du contact conservé en priorité)"""
+    entries, seen = [], set()
+    for record in records:
+        for entry in record.get(field) or []:
+            value = entry.get(value_key) if isinstance(entry, dict) else entry
+            key = normalize(value) or value
+            if key in seen:
+                continue
+            seen.add(key)
+            entries.append(dict(entry) if isinstance(entry, dict) else entry)
+
+    has_primary = False
+    for entry in entries:
+        if isinstance(entry, dict) and entry.get('primary'):
+            if has_primary:
+                entry['primary'] = False
+            has_primary = True
+    return entries
+
+
+def _unique(values: list, key) -> list:
+    """Dédoublonne en conservant l'ordre"""
+    seen, result = set(), []
+    for value in values:
+        k = key(value)
+        if k not in seen:
+            seen.add(k)
+            result.append(value)
+    return result
+
+
+def _normalize_name(name) -> str:
+    """Nom en minuscules, sans accents ni ponctuation"""
+    if not name or not isinstance(name, str):
+        return ""
+    return " ".join(re.findall(r"[^\W_]+", strip_accents(name.lower())))
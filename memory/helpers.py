@@ -3,6 +3,7 @@
 Fonctions helper typées pour faciliter l'utilisation de la mémoire
 """
 
+from memory.connection import get_connection
 from memory.memory_core import save_item
 from memory.tagging import generate_tags
 
@@ -10,7 +11,7 @@ from memory.tagging import generate_tags
 def save_note(content: str, tags: list[str] | None = None) -> int:
     """Sauvegarde une note en mémoire (avec auto-tagging si tags=None)"""
     if tags is None:
-        tags = generate_tags(content)
+        tags = generate_tags(content, conn=get_connection())
     # S'assurer qu'on a au moins un tag
     if not tags:
         tags = ["note"]
@@ -20,7 +21,7 @@ def save_note(content: str, tags: list[str] | None = None) -> int:
 def save_process(content: str, tags: list[str] | None = None) -> int:
     """Sauvegarde un processus en mémoire (avec auto-tagging si tags=None)"""
     if tags is None:
-        tags = generate_tags(content)
+        tags = generate_tags(content, conn=get_connection())
     # S'assurer qu'on a au moins un tag
     if not tags:
         tags = ["process"]
@@ -30,7 +31,7 @@ def save_process(content: str, tags: list[str] | None = None) -> int:
 def save_protocol(content: str, tags: list[str] | None = None) -> int:
     """Sauvegarde un protocole en mémoire (avec auto-tagging si tags=None)"""
     if tags is None:
-        tags = generate_tags(content)
+        tags = generate_tags(content, conn=get_connection())
     # S'assurer qu'on a au moins un tag
     if not tags:
         tags = ["protocol"]
@@ -40,7 +41,7 @@ def save_protocol(content: str, tags: list[str] | None = None) -> int:
 def save_todo(content: str, tags: list[str] | None = None) -> int:
     """Sauvegarde un todo en mémoire (avec auto-tagging si tags=None)"""
     if tags is None:
-        tags = generate_tags(content)
+        tags = generate_tags(content, conn=get_connection())
     # S'assurer qu'on a au moins un tag
     if not tags:
         tags = ["todo"]
@@ -0,0 +1,166 @@
+# Clara - Identifiants de contact
+"""
+Normalisation des téléphones (E.164) et emails des contacts, et maintenance
+des tables de résolution contact_phones / contact_emails
+
+Les colonnes JSON phones / emails de contacts restent la source de vérité ;
+les tables annexes n'en sont qu'un index, réécrit à chaque sauvegarde.
+"""
+
+import re
+import json
+from typing import Optional
+
+# Indicatif appliqué aux numéros nationaux ("06 12 34 56 78" -> +33612345678),
+# sauf configuration (contacts.default_country_code de config/settings.yaml)
+DEFAULT_COUNTRY_CODE = "33"
+
+_default_country_code = DEFAULT_COUNTRY_CODE
+
+# Longueur maximale d'un numéro E.164 (indicatif compris, sans le "+")
+E164_MAX_DIGITS = 15
+E164_MIN_DIGITS = 8
+
+# Au-delà de cette longueur, un numéro sans "+" ni "0" est supposé international
+NATIONAL_MAX_DIGITS = 9
+
+
+def configure(default_country_code=None) -> None:
+    """
+    Choisit l'indicatif des numéros nationaux (recherche, import, tables de résolution)
+
+    Args:
+        default_country_code: Indicatif sans "+" ("972", "+972" accepté) ; None = DEFAULT_COUNTRY_CODE
+
+    Raises:
+        ValueError: Si l'indicatif n'est pas numérique
+    """
+    global _default_country_code
+    code = str(default_country_code or DEFAULT_COUNTRY_CODE).strip().lstrip("+")
+    if not code.isdigit():
+        raise ValueError(f"Indicatif pays invalide: {default_country_code}")
+    _default_country_code = code
+
+
+def get_default_country_code() -> str:
+    """Indicatif configuré des numéros nationaux"""
+    return _default_country_code
+
+
+def normalize_phone(number, default_country_code: Optional[str] = None) -> Optional[str]:
+    """
+    Normalise un numéro au format E.164
+
+    Args:
+        number: Numéro libre ("+33 (0)6 12 34 56 78", "0612345678", "0033...")
+        default_country_code: Indicatif des numéros nationaux (défaut : indicatif configuré)
+
+    Returns:
+        Numéro "+<indicatif><numéro>" ou None si le numéro est inexploitable
+    """
+    if number is None:
+        return None
+    default_country_code = default_country_code or _default_country_code
+    raw = str(number).strip().replace("(0)", "")
+    digits = re.sub(r"\D", "", raw)
+    if not digits:
+        return None
+
+    if raw.startswith("+"):
+        e164 = digits
+    elif digits.startswith("00"):
+        e164 = digits[2:]
+    elif digits.startswith("0"):
+        e164 = default_country_code + digits[1:]
+    elif len(digits) <= NATIONAL_MAX_DIGITS:
+        e164 = default_country_code + digits
+    else:
+        e164 = digits
+
+    if not E164_MIN_DIGITS <= len(e164) <= E164_MAX_DIGITS or e164.startswith("0"):
+        return None
+    return "+" + e164
+
+
+def normalize_email(address) -> Optional[str]:
+    """Adresse en minuscules, sans espaces ni préfixe mailto: (None si invalide)"""
+    if address is None:
+        return None
+    email = str(address).strip().lower()
+    if email.startswith("mailto:"):
+        email = email[len("mailto:"):]
+    local, sep, domain = email.partition("@")
+    if not sep or not local or not domain or " " in email:
+        return None
+    return email
+
+
+def contact_phone_entries(phones, whatsapp_number=None) -> list[tuple]:
+    """
+    Numéros normalisés d'un contact
+
+    Returns:
+        Liste de (phone, label, is_primary) sans doublon de numéro
+    """
+    entries: dict[str, tuple] = {}
+    for phone in _as_list(phones):
+        if isinstance(phone, dict):
+            number, label, primary = phone.get("number"), phone.get("label"), phone.get("primary")
+        else:
+            number, label, primary = phone, None, False
+        normalized = normalize_phone(number)
+        if normalized and (normalized not in entries or primary):
+            entries[normalized] = (normalized, label, 1 if primary else 0)
+
+    normalized = normalize_phone(whatsapp_number)
+    if normalized and normalized not in entries:
+        entries[normalized] = (normalized, "whatsapp", 0)
+    return list(entries.values())
+
+
+def contact_email_entries(emails) -> list[tuple]:
+    """
+    Adresses normalisées d'un contact
+
+    Returns:
+        Liste de (email, label, is_primary) sans doublon d'adresse
+    """
+    entries: dict[str, tuple] = {}
+    for email in _as_list(emails):
+        if isinstance(email, dict):
+            address, label, primary = email.get("address"), email.get("label"), email.get("primary")
+        else:
+            address, label, primary = email, None, False
+        normalized = normalize_email(address)
+        if normalized and (normalized not in entries or primary):
+            entries[normalized] = (normalized, label, 1 if primary else 0)
+    return list(entries.values())
+
+
+def write_contact_identifiers(conn, contact_id: int, phones, emails, whatsapp_number=None) -> None:
+    """
+    Réécrit les lignes contact_phones / contact_emails d'un contact
+
+    Ne commite pas : à appeler dans la transaction qui écrit le contact.
+    """
+    conn.execute("DELETE FROM contact_phones WHERE contact_id = ?", (contact_id,))
+    conn.execute("DELETE FROM contact_emails WHERE contact_id = ?", (contact_id,))
+    conn.executemany(
+        "INSERT INTO contact_phones (phone, contact_id, label, is_primary) VALUES (?, ?, ?, ?)",
+        [(phone, contact_id, label, primary) for phone, label, primary in contact_phone_entries(phones, whatsapp_number)]
+    )
+    conn.executemany(
+        "INSERT INTO contact_emails (email, contact_id, label, is_primary) VALUES (?, ?, ?, ?)",
+        [(email, contact_id, label, primary) for email, label, primary in contact_email_entries(emails)]
+    )
+
+
+def _as_list(value) -> list:
+    """Liste depuis une colonne JSON (chaîne) ou une liste Python"""
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except json.JSONDecodeError:
+            parsed = None
+        return parsed if isinstance(parsed, list) else [value]
+    return value if isinstance(value, list) else []
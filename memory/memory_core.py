@@ -4,17 +4,25 @@ API de mémoire interne pour Clara
 Stockage SQLite simple, sans logique métier
 """
 
-import sqlite3
+import os
+import re
 import json
+import shutil
+import sqlite3
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+from memory.connection import get_connection, get_db_path, close_connections, transaction
+from memory.tagging import normalize_tags, index_item_terms, index_item_tags, index_contact_tags, TERM_STATS_CHUNK
+from memory.identifiers import write_contact_identifiers, get_default_country_code
+from utils.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
 
 def init_db(
-    db_path: str = "memory/memory.sqlite",
+    db_path: Optional[str] = None,
     schema_path: str = "memory/schema.sql"
 ) -> None:
     """
@@ -22,28 +30,34 @@ def init_db(
     
     - Crée le dossier memory si nécessaire
     - Crée le fichier SQLite s'il n'existe pas
-    - Applique le schéma SQL
+    - Applique uniquement les migrations en attente (voir MIGRATIONS),
+      sans aucun travail de schéma si la base est déjà à jour
+    - Renormalise contact_phones si l'indicatif par défaut a changé
     """
     # Créer le dossier si nécessaire
-    db_file = Path(db_path)
+    db_file = Path(get_db_path(db_path))
     db_file.parent.mkdir(parents=True, exist_ok=True)
     
-    # Créer/ouvrir la base et appliquer le schéma
-    with sqlite3.connect(str(db_file)) as conn:
-        # Lire et exécuter le schéma
-        schema_file = Path(schema_path)
-        if schema_file.exists():
-            with open(schema_file, 'r', encoding='utf-8') as f:
-                schema = f.read()
-            conn.executescript(schema)
-            conn.commit()
+    conn = get_connection(str(db_file))
+    current = get_schema_version(str(db_file))
+    for version, description, migration in MIGRATIONS:
+        if version <= current:
+            continue
+        _apply_migration(conn, version, description, migration(conn, schema_path))
+    
+    _reindex_contact_phones(str(db_file))
+
+
+def get_schema_version(db_path: Optional[str] = None) -> int:
+    """Retourne la version du schéma (PRAGMA user_version, 0 = base vierge)"""
+    return get_connection(db_path).execute("PRAGMA user_version").fetchone()[0]
 
 
 def save_item(
     type: str,
     content: str,
     tags: Optional[list[str]] = None,
-    db_path: str = "memory/memory.sqlite"
+    db_path: Optional[str] = None
 ) -> int:
     """
     Sauvegarde un item en mémoire
@@ -52,7 +66,7 @@ def save_item(
         type: Type d'item (note, todo, process, protocol, etc.)
         content: Contenu textuel de l'item
         tags: Liste de tags optionnels
-        db_path: Chemin vers la base de données
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     
     Returns:
         ID de l'item créé
@@ -63,14 +77,16 @@ def save_item(
     tags_json = json.dumps(tags) if tags else None
     
     try:
-        with sqlite3.connect(db_path) as conn:
+        with get_connection(db_path) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO memory (type, content, tags) VALUES (?, ?, ?)",
                 (type, content, tags_json)
             )
-            conn.commit()
             item_id = cursor.lastrowid
+            index_item_terms(conn, [(item_id, content)])
+            index_item_tags(conn, [(item_id, tags)])
+            conn.commit()
             logger.debug(f"Item sauvegardé: type={type}, id={item_id}")
             return item_id
     except Exception as e:
@@ -82,7 +98,7 @@ def update_item(
     item_id: int,
     content: Optional[str] = None,
     tags: Optional[list[str]] = None,
-    db_path: str = "memory/memory.sqlite"
+    db_path: Optional[str] = None
 ) -> bool:
     """
     Met à jour un item existant
@@ -91,7 +107,7 @@ def update_item(
         item_id: ID de l'item à mettre à jour
         content: Nouveau contenu (si fourni)
         tags: Nouveaux tags (si fournis)
-        db_path: Chemin vers la base de données
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     
     Returns:
         True si l'item a été mis à jour, False si l'item n'existe pas
@@ -100,7 +116,7 @@ def update_item(
     if content is None and tags is None:
         return False
     
-    with sqlite3.connect(db_path) as conn:
+    with get_connection(db_path) as conn:
         cursor = conn.cursor()
         
         if content is not None and tags is not None:
@@ -127,6 +143,11 @@ def update_item(
                 (tags_json, item_id)
             )
         
+        # Statistiques de termes (TF-IDF des tags) du nouveau contenu
+        if content is not None and cursor.rowcount > 0:
+            index_item_terms(conn, [(item_id, content)])
+        if tags is not None and cursor.rowcount > 0:
+            index_item_tags(conn, [(item_id, tags)])
         conn.commit()
         
         # Retourner True si une ligne a été modifiée
@@ -137,7 +158,7 @@ def get_items(
     type: Optional[str] = None,
     limit: Optional[int] = None,
     item_ids: Optional[list[int]] = None,
-    db_path: str = "memory/memory.sqlite"
+    db_path: Optional[str] = None
 ) -> list[dict]:
     """
     Récupère des items de la mémoire
@@ -146,13 +167,12 @@ def get_items(
         type: Filtrer par type (si fourni)
         limit: Limiter le nombre de résultats (si fourni)
         item_ids: Filtrer par liste d'IDs (si fourni)
-        db_path: Chemin vers la base de données
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     
     Returns:
         Liste de dicts avec id, type, content, tags, created_at, updated_at
     """
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
+    with get_connection(db_path) as conn:
         cursor = conn.cursor()
         
         query_parts = []
@@ -168,9 +188,9 @@ def get_items(
             params.extend(item_ids)
         
         if query_parts:
-            query = "SELECT * FROM memory WHERE " + " AND ".join(query_parts) + " ORDER BY created_at DESC"
+            query = "SELECT * FROM memory WHERE " + " AND ".join(query_parts) + " ORDER BY created_at DESC, id DESC"
         else:
-            query = "SELECT * FROM memory ORDER BY created_at DESC"
+            query = "SELECT * FROM memory ORDER BY created_at DESC, id DESC"
         
         if limit is not None:
             query += " LIMIT ?"
@@ -180,90 +200,414 @@ def get_items(
         rows = cursor.fetchall()
         
         # Convertir en liste de dicts et désérialiser tags
-        results = []
-        for row in rows:
-            item = dict(row)
-            # Désérialiser tags
-            if item['tags']:
-                item['tags'] = json.loads(item['tags'])
-            else:
-                item['tags'] = []
-            results.append(item)
-        
-        return results
+        return [_row_to_item(row) for row in rows]
+
+
+def get_items_page(
+    type: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    db_path: Optional[str] = None
+) -> dict:
+    """
+    Récupère une page d'items (pagination par curseur sur created_at, id)
+    
+    Le coût d'une page ne dépend pas de sa position : pas d'OFFSET,
+    la requête reprend juste après le dernier item de la page précédente.
+    
+    Args:
+        type: Filtrer par type (si fourni)
+        limit: Taille de la page
+        cursor: Curseur retourné par la page précédente (None = première page)
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+    
+    Returns:
+        Dict {"items": [...], "next_cursor": str ou None si dernière page}
+    """
+    query = "SELECT * FROM memory"
+    query_parts = []
+    params = []
+    
+    if type is not None:
+        query_parts.append("type = ?")
+        params.append(type)
+    
+    if cursor:
+        query_parts.append("(created_at, id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+    
+    if query_parts:
+        query += " WHERE " + " AND ".join(query_parts)
+    
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+    
+    with get_connection(db_path) as conn:
+        rows = conn.execute(query, params).fetchall()
+    
+    items = [_row_to_item(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(items[-1]['created_at'], items[-1]['id'])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def iter_items(
+    type: Optional[str] = None,
+    batch_size: int = 200,
+    db_path: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Parcourt les items sans tout charger en mémoire (fetchmany par lots)
+    
+    Args:
+        type: Filtrer par type (si fourni)
+        batch_size: Nombre de lignes lues à la fois
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+    
+    Yields:
+        Dicts avec id, type, content, tags, created_at, updated_at
+    """
+    query = "SELECT * FROM memory"
+    params = []
+    if type is not None:
+        query += " WHERE type = ?"
+        params.append(type)
+    query += " ORDER BY created_at DESC, id DESC"
+    
+    # Curseur dédié : la connexion partagée reste utilisable pendant le parcours
+    db_cursor = get_connection(db_path).cursor()
+    try:
+        db_cursor.execute(query, params)
+        while True:
+            rows = db_cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield _row_to_item(row)
+    finally:
+        db_cursor.close()
+
+
+def get_items_by_tags(
+    tags: list[str],
+    match: str = "any",
+    type: Optional[str] = None,
+    limit: Optional[int] = None,
+    db_path: Optional[str] = None
+) -> list[dict]:
+    """
+    Récupère les items portant certains tags (résolu en SQL via item_tags)
+    
+    Args:
+        tags: Tags recherchés (comparaison insensible à la casse)
+        match: "any" (au moins un tag) ou "all" (tous les tags)
+        type: Filtrer par type (si fourni)
+        limit: Limiter le nombre de résultats (si fourni)
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+    
+    Returns:
+        Liste de dicts avec id, type, content, tags, created_at, updated_at
+    """
+    if match not in ("any", "all"):
+        raise ValueError(f"match doit valoir 'any' ou 'all' (reçu: {match})")
+    
+    normalized = normalize_tags(tags)
+    if not normalized:
+        return []
+    
+    placeholders = ','.join('?' for _ in normalized)
+    subquery = f"SELECT item_id FROM item_tags WHERE tag IN ({placeholders})"
+    params = list(normalized)
+    if match == "all":
+        subquery += " GROUP BY item_id HAVING COUNT(*) = ?"
+        params.append(len(normalized))
+    
+    query = f"SELECT * FROM memory WHERE id IN ({subquery})"
+    if type is not None:
+        query += " AND type = ?"
+        params.append(type)
+    query += " ORDER BY created_at DESC, id DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    
+    with get_connection(db_path) as conn:
+        rows = conn.execute(query, params).fetchall()
+        return [_row_to_item(row) for row in rows]
 
 
 def search_items(
     query: str,
     type: Optional[str] = None,
-    db_path: str = "memory/memory.sqlite"
+    limit: Optional[int] = None,
+    db_path: Optional[str] = None
 ) -> list[dict]:
     """
-    Recherche des items par contenu
+    Recherche des items par contenu (index plein texte, classement BM25)
     
     Args:
         query: Texte à rechercher dans le contenu
         type: Filtrer par type (si fourni)
-        db_path: Chemin vers la base de données
+        limit: Limiter le nombre de résultats (si fourni)
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     
     Returns:
         Liste de dicts avec id, type, content, tags, created_at, updated_at
+        (les plus pertinents en premier)
     """
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    results = search_items_ranked(query, type=type, limit=limit, db_path=db_path)
+    for item in results:
+        item.pop('score', None)
+        item.pop('snippet', None)
+    return results
+
+
+def search_items_ranked(
+    query: str,
+    type: Optional[str] = None,
+    limit: Optional[int] = 20,
+    highlight: tuple[str, str] = ("[", "]"),
+    match: str = "all",
+    db_path: Optional[str] = None
+) -> list[dict]:
+    """
+    Recherche plein texte classée par pertinence (BM25) avec extraits
+    
+    Chaque mot de la requête est cherché comme préfixe ("clar" trouve "Clara"),
+    sans tenir compte des accents. Si l'index FTS5 est absent, repli sur LIKE.
+    
+    Args:
+        query: Texte à rechercher
+        type: Filtrer par type (si fourni)
+        limit: Nombre maximum de résultats (None = tous)
+        highlight: Balises (ouvrante, fermante) autour des termes trouvés
+        match: "all" (tous les mots requis) ou "any" (au moins un mot, BM25
+               classe en premier les items qui en contiennent le plus)
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+    
+    Returns:
+        Liste de dicts item + 'score' (plus grand = plus pertinent) et 'snippet'
+    """
+    if match not in ("all", "any"):
+        raise ValueError(f"match doit valoir 'all' ou 'any' (reçu: {match})")
+    fts_query = _build_fts_query(query, match)
+    
+    with get_connection(db_path) as conn:
+        if fts_query is None or not _table_exists(conn, 'memory_fts'):
+            return _search_items_like(conn, query, type, limit)
         
-        search_pattern = f"%{query}%"
+        sql = f"""
+            SELECT m.*,
+                   -bm25(memory_fts, {FTS_WEIGHT_CONTENT}, {FTS_WEIGHT_TAGS}) AS score,
+                   snippet(memory_fts, 0, ?, ?, '…', {FTS_SNIPPET_TOKENS}) AS snippet
+            FROM memory_fts
+            JOIN memory m ON m.id = memory_fts.rowid
+            WHERE memory_fts MATCH ?
+        """
+        params = [highlight[0], highlight[1], fts_query]
         
         if type is not None:
-            cursor.execute(
-                "SELECT * FROM memory WHERE content LIKE ? AND type = ? ORDER BY created_at DESC",
-                (search_pattern, type)
-            )
-        else:
-            cursor.execute(
-                "SELECT * FROM memory WHERE content LIKE ? ORDER BY created_at DESC",
-                (search_pattern,)
-            )
+            sql += " AND m.type = ?"
+            params.append(type)
         
-        rows = cursor.fetchall()
+        sql += " ORDER BY bm25(memory_fts, ?, ?)"
+        params.extend([FTS_WEIGHT_CONTENT, FTS_WEIGHT_TAGS])
         
-        # Convertir en liste de dicts et désérialiser tags
-        results = []
-        for row in rows:
-            item = dict(row)
-            # Désérialiser tags
-            if item['tags']:
-                item['tags'] = json.loads(item['tags'])
-            else:
-                item['tags'] = []
-            results.append(item)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
         
-        return results
+        rows = conn.execute(sql, params).fetchall()
+        return [_row_to_item(row) for row in rows]
+
+
+def rebuild_search_index(db_path: Optional[str] = None) -> None:
+    """
+    Reconstruit l'index plein texte depuis la table memory
+    
+    Args:
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+    """
+    with get_connection(db_path) as conn:
+        conn.execute("INSERT INTO memory_fts(memory_fts) VALUES ('rebuild')")
+        logger.info("Index plein texte memory_fts reconstruit")
 
 
 def delete_item(
     item_id: int,
-    db_path: str = "memory/memory.sqlite"
+    db_path: Optional[str] = None
 ) -> None:
     """
     Supprime un item de la mémoire
     
     Args:
         item_id: ID de l'item à supprimer
-        db_path: Chemin vers la base de données
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     """
-    with sqlite3.connect(db_path) as conn:
+    with get_connection(db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM memory WHERE id = ?", (item_id,))
         conn.commit()
 
 
+# ============================================
+# FONCTIONS BATCH (une seule transaction)
+# ============================================
+
+def save_items(
+    items: list[dict],
+    db_path: Optional[str] = None
+) -> list[int]:
+    """
+    Sauvegarde plusieurs items en une seule transaction
+    
+    Args:
+        items: Liste de dicts {type, content, tags (optionnel)}
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+    
+    Returns:
+        Liste des IDs créés (même ordre que items)
+    """
+    if not items:
+        return []
+    
+    try:
+        with transaction(db_path) as conn:
+            # Une requête par ligne pour récupérer les IDs, mais un seul commit
+            item_ids = []
+            for item in items:
+                tags = item.get('tags')
+                cursor = conn.execute(
+                    "INSERT INTO memory (type, content, tags) VALUES (?, ?, ?)",
+                    (item['type'], item['content'], json.dumps(tags) if tags else None)
+                )
+                item_ids.append(cursor.lastrowid)
+            index_item_terms(conn, zip(item_ids, (item['content'] for item in items)))
+            index_item_tags(conn, zip(item_ids, (item.get('tags') for item in items)))
+        logger.debug(f"{len(item_ids)} item(s) sauvegardé(s) en batch")
+        return item_ids
+    except Exception as e:
+        logger.exception(f"save_items failed ({len(items)} items): {e}")
+        raise
+
+
+def update_items(
+    updates: list[dict],
+    db_path: Optional[str] = None
+) -> int:
+    """
+    Met à jour plusieurs items en une seule transaction
+    
+    Args:
+        updates: Liste de dicts {id, content (optionnel), tags (optionnel)}
+                 Les champs absents ou None ne sont pas modifiés
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+    
+    Returns:
+        Nombre d'items modifiés
+    """
+    params = [
+        (
+            update.get('content'),
+            json.dumps(update['tags']) if update.get('tags') is not None else None,
+            update['id']
+        )
+        for update in updates
+        if update.get('content') is not None or update.get('tags') is not None
+    ]
+    if not params:
+        return 0
+    
+    with transaction(db_path) as conn:
+        cursor = conn.executemany(
+            """UPDATE memory 
+               SET content = COALESCE(?, content),
+                   tags = COALESCE(?, tags),
+                   updated_at = CURRENT_TIMESTAMP
+               WHERE id = ?""",
+            params
+        )
+        updated = cursor.rowcount
+        
+        # Réindexer les termes des contenus modifiés (items existants seulement)
+        content_ids = [update['id'] for update in updates if update.get('content') is not None]
+        for start in range(0, len(content_ids), TERM_STATS_CHUNK):
+            chunk = content_ids[start:start + TERM_STATS_CHUNK]
+            placeholders = ','.join('?' for _ in chunk)
+            index_item_terms(conn, conn.execute(
+                f"SELECT id, content FROM memory WHERE id IN ({placeholders})", chunk
+            ).fetchall())
+        
+        # Réindexer les tags modifiés (items existants seulement)
+        tag_ids = [update['id'] for update in updates if update.get('tags') is not None]
+        for start in range(0, len(tag_ids), TERM_STATS_CHUNK):
+            chunk = tag_ids[start:start + TERM_STATS_CHUNK]
+            placeholders = ','.join('?' for _ in chunk)
+            index_item_tags(conn, conn.execute(
+                f"SELECT id, tags FROM memory WHERE id IN ({placeholders})", chunk
+            ).fetchall())
+        return updated
+
+
+def delete_items(
+    item_ids: Optional[list[int]] = None,
+    type: Optional[str] = None,
+    tag: Optional[str] = None,
+    db_path: Optional[str] = None
+) -> int:
+    """
+    Supprime des items en une seule requête (filtres combinés en ET)
+    
+    Args:
+        item_ids: Supprimer ces IDs (si fourni)
+        type: Supprimer les items de ce type (si fourni)
+        tag: Supprimer les items portant ce tag (si fourni)
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+    
+    Returns:
+        Nombre d'items supprimés
+    
+    Raises:
+        ValueError: Si aucun filtre n'est fourni (utiliser reset_memory pour tout vider)
+    """
+    query_parts = []
+    params = []
+    
+    if item_ids is not None:
+        if not item_ids:
+            return 0
+        placeholders = ','.join('?' for _ in item_ids)
+        query_parts.append(f"id IN ({placeholders})")
+        params.extend(item_ids)
+    
+    if type is not None:
+        query_parts.append("type = ?")
+        params.append(type)
+    
+    if tag is not None:
+        query_parts.append("id IN (SELECT item_id FROM item_tags WHERE tag = ?)")
+        params.append(tag.strip().lower())
+    
+    if not query_parts:
+        raise ValueError("delete_items requiert au moins un filtre (item_ids, type ou tag)")
+    
+    with transaction(db_path) as conn:
+        cursor = conn.execute(
+            "DELETE FROM memory WHERE " + " AND ".join(query_parts),
+            params
+        )
+        count = cursor.rowcount
+    logger.debug(f"{count} item(s) supprimé(s) en batch")
+    return count
+
+
 # ============================================
 # FONCTIONS PRÉFÉRENCES
 # ============================================
 
-def save_preference(pref: dict, db_path: str = "memory/memory.sqlite") -> bool:
+def save_preference(pref: dict, db_path: Optional[str] = None) -> bool:
     """
     Insère ou met à jour une préférence selon key+scope+agent
     
@@ -276,13 +620,13 @@ def save_preference(pref: dict, db_path: str = "memory/memory.sqlite") -> bool:
             - value: string
             - source: "user" | "inferred"
             - confidence: float (0.0-1.0)
-        db_path: Chemin vers la base de données
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     
     Returns:
         True si succès, False sinon
     """
     try:
-        with sqlite3.connect(db_path) as conn:
+        with get_connection(db_path) as conn:
             cursor = conn.cursor()
             
             # Vérifier si une préférence existe déjà avec cette key
@@ -321,61 +665,77 @@ def save_preference(pref: dict, db_path: str = "memory/memory.sqlite") -> bool:
                 ))
             
             conn.commit()
-            return True
+        _invalidate_preference_cache(get_db_path(db_path))
+        return True
     except Exception:
         return False
 
 
-def get_preference_by_key(key: str, db_path: str = "memory/memory.sqlite") -> Optional[dict]:
+def get_preference_by_key(key: str, db_path: Optional[str] = None) -> Optional[dict]:
     """
     Retourne la préférence correspondant à key
     
     Args:
         key: Clé de la préférence
-        db_path: Chemin vers la base de données
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     
     Returns:
         Dict avec la préférence ou None
     """
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
+    cache_key = (_cache_db_key(db_path), 'key', key)
+    cached = _preference_cache.get(cache_key, _CACHE_MISS)
+    if cached is not _CACHE_MISS:
+        return dict(cached) if cached else None
+    
+    generation = _preference_cache_generation
+    with get_connection(db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM preferences WHERE key = ?", (key,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        pref = dict(row) if row else None
+    
+    _store_preference_cache(cache_key, pref, generation)
+    return dict(pref) if pref else None
 
 
-def list_preferences(db_path: str = "memory/memory.sqlite") -> list[dict]:
+def list_preferences(db_path: Optional[str] = None) -> list[dict]:
     """
     Liste toutes les préférences stockées
     
     Args:
-        db_path: Chemin vers la base de données
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     
     Returns:
         Liste de dicts avec toutes les préférences
     """
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
+    cache_key = (_cache_db_key(db_path), 'list')
+    cached = _preference_cache.get(cache_key, _CACHE_MISS)
+    if cached is not _CACHE_MISS:
+        return [dict(pref) for pref in cached]
+    
+    generation = _preference_cache_generation
+    with get_connection(db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM preferences ORDER BY created_at DESC")
         rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        prefs = [dict(row) for row in rows]
+    
+    _store_preference_cache(cache_key, prefs, generation)
+    return [dict(pref) for pref in prefs]
 
 
-def search_preferences(query: str, db_path: str = "memory/memory.sqlite") -> list[dict]:
+def search_preferences(query: str, db_path: Optional[str] = None) -> list[dict]:
     """
     Recherche textuelle dans key/value/domain
     
     Args:
         query: Texte à rechercher
-        db_path: Chemin vers la base de données
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     
     Returns:
         Liste de dicts avec les préférences trouvées
     """
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
+    with get_connection(db_path) as conn:
         cursor = conn.cursor()
         search_pattern = f"%{query}%"
         cursor.execute("""
@@ -387,36 +747,799 @@ def search_preferences(query: str, db_path: str = "memory/memory.sqlite") -> lis
         return [dict(row) for row in rows]
 
 
+# ============================================
+# CACHE DES PRÉFÉRENCES
+# ============================================
+
+# Lecture des préférences via un cache LRU + TTL (elles changent rarement
+# mais sont lues à chaque tour). Invalidé par save_preference et reset_memory.
+PREFERENCE_CACHE_MAX_SIZE = 256
+PREFERENCE_CACHE_TTL = 300.0  # secondes
+
+_CACHE_MISS = object()
+_preference_cache = LRUCache(max_size=PREFERENCE_CACHE_MAX_SIZE, ttl=PREFERENCE_CACHE_TTL)
+# Incrémenté à chaque invalidation : une lecture commencée avant une écriture
+# ne doit pas remettre en cache une valeur périmée
+_preference_cache_generation = 0
+
+
+def configure_preference_cache(
+    max_size: int = PREFERENCE_CACHE_MAX_SIZE,
+    ttl: Optional[float] = PREFERENCE_CACHE_TTL
+) -> None:
+    """
+    Reconfigure le cache des préférences (vidé au passage)
+    
+    Args:
+        max_size: Nombre maximum d'entrées
+        ttl: Durée de vie d'une entrée en secondes (None = pas d'expiration)
+    """
+    global _preference_cache
+    _invalidate_preference_cache()
+    _preference_cache = LRUCache(max_size=max_size, ttl=ttl)
+
+
+def get_preference_cache_stats() -> dict:
+    """Retourne les compteurs du cache des préférences (hits, misses, size...)"""
+    return _preference_cache.stats()
+
+
+def _cache_db_key(db_path: Optional[str]) -> str:
+    """Clé de base pour le cache (chemin absolu)"""
+    return os.path.abspath(get_db_path(db_path))
+
+
+def _store_preference_cache(cache_key: tuple, value, generation: int) -> None:
+    """Met en cache si aucune invalidation n'a eu lieu pendant la lecture"""
+    if generation == _preference_cache_generation:
+        _preference_cache.set(cache_key, value)
+
+
+def _invalidate_preference_cache(db_path: Optional[str] = None) -> None:
+    """Invalide les préférences en cache d'une base (toutes si db_path est None)"""
+    global _preference_cache_generation
+    _preference_cache_generation += 1
+    if db_path is None:
+        _preference_cache.clear()
+    else:
+        db_key = _cache_db_key(db_path)
+        _preference_cache.invalidate_where(lambda key: key[0] == db_key)
+
+
 # ============================================
 # FONCTION RESET MÉMOIRE
 # ============================================
 
-def reset_memory(hard: bool = False, db_path: str = "memory/memory.sqlite") -> None:
+def reset_memory(hard: bool = False, db_path: Optional[str] = None) -> None:
     """
     Réinitialise la mémoire de Clara
     
     Args:
-        hard: Si True, supprime aussi le fichier SQLite (réinitialisation complète)
-        db_path: Chemin vers la base de données
+        hard: Si True, supprime aussi le fichier SQLite et l'index vectoriel (réinitialisation complète)
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
     """
-    import os
+    db_path = get_db_path(db_path)
+    _invalidate_preference_cache(db_path)
     
     if hard:
+        # Fermer les connexions partagées avant de supprimer le fichier
+        close_connections(db_path)
         if os.path.exists(db_path):
             os.remove(db_path)
             logger.info(f"Fichier DB supprimé: {db_path}")
+        # Fichiers annexes du mode WAL
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        # Index vectoriel de la base (memory/vector/semantic.py : <db>.vectors/)
+        shutil.rmtree(os.path.abspath(db_path) + ".vectors", ignore_errors=True)
         return
     
     # Soft reset : vider les tables
     try:
-        with sqlite3.connect(db_path) as conn:
+        with get_connection(db_path) as conn:
             cursor = conn.cursor()
             # Vider toutes les tables
             cursor.execute("DELETE FROM memory;")
             cursor.execute("DELETE FROM preferences;")
             cursor.execute("DELETE FROM contacts;")
             conn.commit()
-            logger.info("Mémoire réinitialisée (soft reset)")
+        _invalidate_preference_cache(db_path)
+        logger.info("Mémoire réinitialisée (soft reset)")
     except Exception as e:
         logger.exception(f"reset_memory failed: {e}")
         raise
+
+
+# ============================================
+# INDEX PLEIN TEXTE (FTS5)
+# ============================================
+
+# Poids BM25 des colonnes (content, tags) et taille des extraits
+FTS_WEIGHT_CONTENT = 1.0
+FTS_WEIGHT_TAGS = 0.5
+FTS_SNIPPET_TOKENS = 12
+
+# Table FTS5 "external content" synchronisée par triggers avec memory
+MEMORY_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+    content,
+    tags,
+    content='memory',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS memory_fts_ai AFTER INSERT ON memory BEGIN
+    INSERT INTO memory_fts(rowid, content, tags) VALUES (new.id, new.content, new.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS memory_fts_ad AFTER DELETE ON memory BEGIN
+    INSERT INTO memory_fts(memory_fts, rowid, content, tags)
+    VALUES ('delete', old.id, old.content, old.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS memory_fts_au AFTER UPDATE OF content, tags ON memory BEGIN
+    INSERT INTO memory_fts(memory_fts, rowid, content, tags)
+    VALUES ('delete', old.id, old.content, old.tags);
+    INSERT INTO memory_fts(rowid, content, tags) VALUES (new.id, new.content, new.tags);
+END;
+"""
+
+
+def _migration_memory_fts(conn, schema_path: str) -> str:
+    """
+    Migration : index FTS5 de la table memory, rempli avec les lignes existantes
+    
+    Vide si l'index existe déjà ou si SQLite n'a pas FTS5 (repli LIKE).
+    """
+    if not _table_exists(conn, 'memory') or _table_exists(conn, 'memory_fts'):
+        return ""
+    if not _fts5_available(conn):
+        logger.warning("FTS5 indisponible, recherche par LIKE")
+        return ""
+    return MEMORY_FTS_SCHEMA + "INSERT INTO memory_fts(memory_fts) VALUES ('rebuild');"
+
+
+def _fts5_available(conn, tokenize: str = 'unicode61') -> bool:
+    """Vérifie que SQLite est compilé avec FTS5 (et le tokenizer demandé)"""
+    try:
+        conn.execute(f"CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='{tokenize}')")
+        conn.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _build_fts_query(query: str, match: str = "all") -> Optional[str]:
+    """
+    Convertit une requête libre en requête FTS5 sûre
+    
+    Chaque mot devient un préfixe entre guillemets ("mot"*), combinés en ET
+    (match="all") ou en OU (match="any").
+    Retourne None si la requête ne contient aucun mot.
+    """
+    words = re.findall(r'\w+', query or '')
+    if not words:
+        return None
+    separator = ' OR ' if match == "any" else ' '
+    return separator.join(f'"{word}"*' for word in words)
+
+
+def _search_items_like(conn, query: str, type: Optional[str], limit: Optional[int]) -> list[dict]:
+    """Recherche par sous-chaîne (repli sans index FTS5)"""
+    sql = "SELECT * FROM memory WHERE content LIKE ?"
+    params = [f"%{query}%"]
+    
+    if type is not None:
+        sql += " AND type = ?"
+        params.append(type)
+    
+    sql += " ORDER BY created_at DESC"
+    
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    
+    rows = conn.execute(sql, params).fetchall()
+    return [_row_to_item(row) for row in rows]
+
+
+# ============================================
+# INDEX DES TAGS (item_tags / contact_tags)
+# ============================================
+
+# Tags normalisés (minuscules, sans espaces autour) des colonnes JSON memory.tags
+# et contacts.tags. Depuis la migration 13, seule la suppression passe par
+# trigger : les lignes sont écrites en Python (tagging.index_item_tags /
+# index_contact_tags) car lower() de SQLite ne traite que l'ASCII.
+ITEM_TAGS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS item_tags (
+    item_id INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, item_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_item_tags_item ON item_tags(item_id);
+
+CREATE TRIGGER IF NOT EXISTS memory_tags_ai AFTER INSERT ON memory BEGIN
+    INSERT OR IGNORE INTO item_tags (item_id, tag)
+    SELECT new.id, lower(trim(value)) FROM json_each(new.tags)
+    WHERE json_valid(new.tags) AND trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS memory_tags_au AFTER UPDATE OF tags ON memory BEGIN
+    DELETE FROM item_tags WHERE item_id = old.id;
+    INSERT OR IGNORE INTO item_tags (item_id, tag)
+    SELECT new.id, lower(trim(value)) FROM json_each(new.tags)
+    WHERE json_valid(new.tags) AND trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS memory_tags_ad AFTER DELETE ON memory BEGIN
+    DELETE FROM item_tags WHERE item_id = old.id;
+END;
+
+INSERT OR IGNORE INTO item_tags (item_id, tag)
+SELECT m.id, lower(trim(t.value)) FROM memory m, json_each(m.tags) t
+WHERE json_valid(m.tags) AND trim(t.value) <> '';
+"""
+
+CONTACT_TAGS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contact_tags (
+    contact_id INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, contact_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_contact_tags_contact ON contact_tags(contact_id);
+
+CREATE TRIGGER IF NOT EXISTS contacts_tags_ai AFTER INSERT ON contacts BEGIN
+    INSERT OR IGNORE INTO contact_tags (contact_id, tag)
+    SELECT new.id, lower(trim(value)) FROM json_each(new.tags)
+    WHERE json_valid(new.tags) AND trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS contacts_tags_au AFTER UPDATE OF tags ON contacts BEGIN
+    DELETE FROM contact_tags WHERE contact_id = old.id;
+    INSERT OR IGNORE INTO contact_tags (contact_id, tag)
+    SELECT new.id, lower(trim(value)) FROM json_each(new.tags)
+    WHERE json_valid(new.tags) AND trim(value) <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS contacts_tags_ad AFTER DELETE ON contacts BEGIN
+    DELETE FROM contact_tags WHERE contact_id = old.id;
+END;
+
+INSERT OR IGNORE INTO contact_tags (contact_id, tag)
+SELECT c.id, lower(trim(t.value)) FROM contacts c, json_each(c.tags) t
+WHERE json_valid(c.tags) AND trim(t.value) <> '';
+"""
+
+
+def _migration_tag_index(conn, schema_path: str) -> str:
+    """
+    Migration : tables de tags normalisées, remplies depuis les colonnes JSON
+    
+    contact_tags n'est créée que si la table contacts existe.
+    """
+    script = ""
+    if _table_exists(conn, 'memory') and not _table_exists(conn, 'item_tags'):
+        script += ITEM_TAGS_SCHEMA
+    if _table_exists(conn, 'contacts') and not _table_exists(conn, 'contact_tags'):
+        script += CONTACT_TAGS_SCHEMA
+    return script
+
+
+# Triggers de la migration 3 remplacés par l'écriture en Python des tags
+TAG_WRITE_TRIGGERS = ("memory_tags_ai", "memory_tags_au", "contacts_tags_ai", "contacts_tags_au")
+
+
+def _migration_tag_normalization(conn, schema_path: str):
+    """
+    Migration : tags indexés normalisés comme les requêtes (str.lower, Unicode)
+    
+    Migration Python (callable) : supprime les triggers d'écriture (lower() ASCII)
+    et recalcule item_tags / contact_tags depuis les colonnes JSON.
+    """
+    def migrate(conn) -> None:
+        for trigger in TAG_WRITE_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        if _table_exists(conn, 'item_tags'):
+            conn.execute("DELETE FROM item_tags")
+            index_item_tags(conn, conn.execute("SELECT id, tags FROM memory").fetchall())
+        if _table_exists(conn, 'contact_tags'):
+            conn.execute("DELETE FROM contact_tags")
+            index_contact_tags(conn, conn.execute("SELECT id, tags FROM contacts").fetchall())
+    
+    return migrate
+
+
+# ============================================
+# INDEX DE RECHERCHE DES CONTACTS
+# ============================================
+
+# Numéro / adresse d'un élément JSON (objet {"number"/"address": ...} ou chaîne)
+_CONTACT_PHONE = "CASE WHEN p.type = 'object' THEN json_extract(p.value, '$.number') ELSE p.value END"
+_CONTACT_EMAIL = "CASE WHEN e.type = 'object' THEN json_extract(e.value, '$.address') ELSE e.value END"
+
+
+def _digits_only(expr: str) -> str:
+    """Expression SQL retirant la ponctuation usuelle d'un numéro"""
+    for char in (' ', '-', '.', '(', ')', '+'):
+        expr = f"replace({expr}, '{char}', '')"
+    return expr
+
+
+# Champs des contacts aplatis (JSON -> texte) pour l'indexation
+CONTACTS_SEARCH_VIEW = f"""
+CREATE VIEW IF NOT EXISTS contacts_search_v AS
+SELECT
+    c.id,
+    trim(coalesce(c.first_name, '') || ' ' || coalesce(c.last_name, '') || ' ' || coalesce(c.display_name, '')) AS name,
+    coalesce((SELECT group_concat(a.value, ' ')
+              FROM json_each(CASE WHEN json_valid(c.aliases) THEN c.aliases ELSE '[]' END) a), '') AS aliases,
+    trim(coalesce(c.company, '') || ' ' || coalesce(c.role, '')) AS company,
+    coalesce((SELECT group_concat({_CONTACT_EMAIL}, ' ')
+              FROM json_each(CASE WHEN json_valid(c.emails) THEN c.emails ELSE '[]' END) e), '') AS emails,
+    trim(coalesce((SELECT group_concat({_CONTACT_PHONE} || ' ' || {_digits_only(_CONTACT_PHONE)}, ' ')
+                   FROM json_each(CASE WHEN json_valid(c.phones) THEN c.phones ELSE '[]' END) p), '')
+         || ' ' || coalesce(c.whatsapp_number, '')) AS phones
+FROM contacts c;
+"""
+
+# Recherche par mots (préfixes, sans accents), classée BM25
+CONTACTS_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+    name, aliases, company, emails, phones,
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS contacts_fts_ai AFTER INSERT ON contacts BEGIN
+    INSERT INTO contacts_fts(rowid, name, aliases, company, emails, phones)
+    SELECT id, name, aliases, company, emails, phones FROM contacts_search_v WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS contacts_fts_au AFTER UPDATE ON contacts BEGIN
+    DELETE FROM contacts_fts WHERE rowid = old.id;
+    INSERT INTO contacts_fts(rowid, name, aliases, company, emails, phones)
+    SELECT id, name, aliases, company, emails, phones FROM contacts_search_v WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS contacts_fts_ad AFTER DELETE ON contacts BEGIN
+    DELETE FROM contacts_fts WHERE rowid = old.id;
+END;
+
+INSERT INTO contacts_fts(rowid, name, aliases, company, emails, phones)
+SELECT id, name, aliases, company, emails, phones FROM contacts_search_v;
+"""
+
+# Trigrammes : sous-chaînes (comme LIKE '%q%', mais indexé) et recherche floue
+CONTACTS_TRIGRAM_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_trigram USING fts5(
+    text,
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS contacts_trigram_ai AFTER INSERT ON contacts BEGIN
+    INSERT INTO contacts_trigram(rowid, text)
+    SELECT id, name || ' ' || aliases || ' ' || company || ' ' || emails || ' ' || phones
+    FROM contacts_search_v WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS contacts_trigram_au AFTER UPDATE ON contacts BEGIN
+    DELETE FROM contacts_trigram WHERE rowid = old.id;
+    INSERT INTO contacts_trigram(rowid, text)
+    SELECT id, name || ' ' || aliases || ' ' || company || ' ' || emails || ' ' || phones
+    FROM contacts_search_v WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS contacts_trigram_ad AFTER DELETE ON contacts BEGIN
+    DELETE FROM contacts_trigram WHERE rowid = old.id;
+END;
+
+INSERT INTO contacts_trigram(rowid, text)
+SELECT id, name || ' ' || aliases || ' ' || company || ' ' || emails || ' ' || phones
+FROM contacts_search_v;
+"""
+
+
+def _migration_contacts_search(conn, schema_path: str) -> str:
+    """
+    Migration : index de recherche des contacts (mots FTS5 + trigrammes), remplis
+    
+    Vide si la table contacts est absente ou si SQLite n'a pas FTS5 (repli LIKE).
+    L'index trigramme n'est créé que si le tokenizer est disponible (SQLite >= 3.34).
+    """
+    if not _table_exists(conn, 'contacts') or _table_exists(conn, 'contacts_fts'):
+        return ""
+    if not _fts5_available(conn):
+        logger.warning("FTS5 indisponible, recherche de contacts par LIKE")
+        return ""
+    
+    script = CONTACTS_SEARCH_VIEW + CONTACTS_FTS_SCHEMA
+    if _fts5_available(conn, tokenize='trigram'):
+        script += CONTACTS_TRIGRAM_SCHEMA
+    else:
+        logger.warning("Tokenizer trigram indisponible, pas de recherche floue des contacts")
+    return script
+
+
+# ============================================
+# RÉSOLUTION DES CONTACTS PAR TÉLÉPHONE / EMAIL
+# ============================================
+
+# Instructions exécutées une à une (migration Python, dans la transaction de migration).
+# Les lignes sont écrites par save_contact / update_contact (normalisation E.164 en Python),
+# seule la suppression est propagée par trigger.
+CONTACT_IDENTIFIERS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS contact_phones (
+        phone TEXT NOT NULL,              -- E.164 : +33612345678
+        contact_id INTEGER NOT NULL,
+        label TEXT,
+        is_primary INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (phone, contact_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_contact_phones_contact ON contact_phones(contact_id)",
+    """
+    CREATE TABLE IF NOT EXISTS contact_emails (
+        email TEXT NOT NULL,              -- minuscules
+        contact_id INTEGER NOT NULL,
+        label TEXT,
+        is_primary INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (email, contact_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_contact_emails_contact ON contact_emails(contact_id)",
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_identifiers_ad AFTER DELETE ON contacts BEGIN
+        DELETE FROM contact_phones WHERE contact_id = old.id;
+        DELETE FROM contact_emails WHERE contact_id = old.id;
+    END
+    """,
+]
+
+
+def _migration_contact_identifiers(conn, schema_path: str):
+    """
+    Migration : tables contact_phones / contact_emails, remplies depuis les colonnes JSON
+
+    Migration Python (callable) : la normalisation E.164 n'est pas exprimable en SQL.
+    """
+    if not _table_exists(conn, 'contacts') or _table_exists(conn, 'contact_phones'):
+        return ""
+
+    def migrate(conn) -> None:
+        for statement in CONTACT_IDENTIFIERS_SCHEMA:
+            conn.execute(statement)
+        rows = conn.execute("SELECT id, phones, emails, whatsapp_number FROM contacts").fetchall()
+        for contact_id, phones, emails, whatsapp_number in rows:
+            write_contact_identifiers(conn, contact_id, phones, emails, whatsapp_number)
+
+    return migrate
+
+
+# ============================================
+# STATISTIQUES DE TERMES (TF-IDF DES TAGS)
+# ============================================
+
+# item_terms : radicaux de chaque item (+ terme '' marquant le document) ;
+# term_stats : fréquence documentaire par radical, tenue à jour par triggers.
+# Les radicaux sont calculés en Python (tagging.extract_terms) : migration Python.
+TERM_STATS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS item_terms (
+        item_id INTEGER NOT NULL,
+        term TEXT NOT NULL,
+        PRIMARY KEY (item_id, term)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS term_stats (
+        term TEXT PRIMARY KEY,
+        df INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS item_terms_ai AFTER INSERT ON item_terms BEGIN
+        INSERT INTO term_stats (term, df) VALUES (new.term, 1)
+        ON CONFLICT(term) DO UPDATE SET df = df + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS item_terms_ad AFTER DELETE ON item_terms BEGIN
+        UPDATE term_stats SET df = df - 1 WHERE term = old.term;
+        DELETE FROM term_stats WHERE term = old.term AND df <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS memory_terms_ad AFTER DELETE ON memory BEGIN
+        DELETE FROM item_terms WHERE item_id = old.id;
+    END
+    """,
+]
+
+
+def _migration_term_stats(conn, schema_path: str):
+    """Migration : statistiques de termes item_terms / term_stats, remplies depuis memory"""
+    if not _table_exists(conn, 'memory') or _table_exists(conn, 'item_terms'):
+        return ""
+
+    def migrate(conn) -> None:
+        for statement in TERM_STATS_SCHEMA:
+            conn.execute(statement)
+        cursor = conn.execute("SELECT id, content FROM memory")
+        while True:
+            rows = cursor.fetchmany(TERM_STATS_CHUNK)
+            if not rows:
+                break
+            index_item_terms(conn, rows)
+
+    return migrate
+
+
+# ============================================
+# VERSION DES CONTACTS (VERROUILLAGE OPTIMISTE)
+# ============================================
+
+CONTACT_VERSION_SCHEMA = """
+ALTER TABLE contacts ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+"""
+
+
+def _migration_contact_version(conn, schema_path: str) -> str:
+    """Migration : colonne contacts.version, incrémentée à chaque mise à jour"""
+    if not _table_exists(conn, 'contacts'):
+        return ""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(contacts)")}
+    return "" if 'version' in columns else CONTACT_VERSION_SCHEMA
+
+
+# ============================================
+# POINTS DE REPRISE DES JOBS
+# ============================================
+
+JOB_CHECKPOINTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_checkpoints (
+    name TEXT PRIMARY KEY,          -- nom du job (ex: "retag")
+    last_id INTEGER NOT NULL,       -- dernier id traité et écrit
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def _migration_job_checkpoints(conn, schema_path: str) -> str:
+    """Migration : table job_checkpoints (reprise des jobs batch, ex: memory/retag.py)"""
+    return JOB_CHECKPOINTS_SCHEMA
+
+
+# ============================================
+# HISTORIQUE DES SESSIONS
+# ============================================
+
+SESSION_MESSAGES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,             -- "user" | "assistant"
+    content TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Réhydratation : derniers messages d'une session
+CREATE INDEX IF NOT EXISTS idx_session_messages_session_id ON session_messages(session_id, id);
+"""
+
+
+def _migration_session_messages(conn, schema_path: str) -> str:
+    """Migration : table session_messages (historique persistant des sessions, agents/sessions.py)"""
+    return SESSION_MESSAGES_SCHEMA
+
+
+SESSION_SUMMARIES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_summaries (
+    session_id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,                      -- résumé glissant des messages sortis de l'historique
+    messages_summarized INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def _migration_session_summaries(conn, schema_path: str) -> str:
+    """Migration : table session_summaries (résumé glissant des sessions, agents/summarizer.py)"""
+    return SESSION_SUMMARIES_SCHEMA
+
+
+# ============================================
+# JOURNAL DES CHANGEMENTS (INDEX VECTORIEL)
+# ============================================
+
+# Chaque écriture sur memory, quel que soit le chemin (save_items, update_items,
+# delete_items, SQL direct), note l'id de l'item : memory/vector/semantic.py
+# n'applique à l'index que les lignes de seq supérieur au dernier appliqué.
+# AUTOINCREMENT : un seq n'est jamais réutilisé, même après purge.
+VECTOR_CHANGES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vector_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS memory_vector_ai AFTER INSERT ON memory BEGIN
+    INSERT INTO vector_changes (item_id) VALUES (new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS memory_vector_au AFTER UPDATE OF type, content, tags ON memory BEGIN
+    INSERT INTO vector_changes (item_id) VALUES (new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS memory_vector_ad AFTER DELETE ON memory BEGIN
+    INSERT INTO vector_changes (item_id) VALUES (old.id);
+END;
+"""
+
+
+def _migration_vector_changes(conn, schema_path: str) -> str:
+    """Migration : journal vector_changes (mise à jour incrémentale de l'index vectoriel)"""
+    return VECTOR_CHANGES_SCHEMA
+
+
+# ============================================
+# IDENTITÉ DE LA BASE
+# ============================================
+
+# Jeton aléatoire tiré à la création (ou migration) de la base : les données
+# dérivées stockées hors de la base (index vectoriel) le comparent pour
+# détecter une base recréée, dont les ids et seq repartent de zéro.
+DB_META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS db_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+INSERT OR IGNORE INTO db_meta (key, value) VALUES ('db_id', lower(hex(randomblob(16))));
+"""
+
+
+def _migration_db_meta(conn, schema_path: str) -> str:
+    """Migration : table db_meta (identité de la base)"""
+    return DB_META_SCHEMA
+
+
+def _reindex_contact_phones(db_path: str) -> None:
+    """
+    Réécrit contact_phones / contact_emails si l'indicatif des numéros nationaux
+    a changé depuis la dernière indexation (mémorisé dans db_meta)
+    """
+    conn = get_connection(db_path)
+    if not _table_exists(conn, 'db_meta') or not _table_exists(conn, 'contact_phones'):
+        return
+    code = get_default_country_code()
+    row = conn.execute("SELECT value FROM db_meta WHERE key = 'phone_country_code'").fetchone()
+    if row and row[0] == code:
+        return
+    
+    with transaction(db_path) as tx:
+        rows = tx.execute("SELECT id, phones, emails, whatsapp_number FROM contacts").fetchall()
+        for contact_id, phones, emails, whatsapp_number in rows:
+            write_contact_identifiers(tx, contact_id, phones, emails, whatsapp_number)
+        tx.execute(
+            "INSERT OR REPLACE INTO db_meta (key, value) VALUES ('phone_country_code', ?)", (code,)
+        )
+    if row:
+        logger.info(f"Téléphones des contacts renormalisés (indicatif +{row[0]} -> +{code})")
+
+
+def get_db_id(db_path: Optional[str] = None) -> Optional[str]:
+    """
+    Identité de la base (jeton aléatoire tiré à sa création)
+
+    Returns:
+        Jeton, ou None si la base n'est pas encore migrée
+    """
+    conn = get_connection(db_path)
+    if not _table_exists(conn, 'db_meta'):
+        return None
+    row = conn.execute("SELECT value FROM db_meta WHERE key = 'db_id'").fetchone()
+    return row[0] if row else None
+
+
+# ============================================
+# MIGRATIONS DE SCHÉMA (PRAGMA user_version)
+# ============================================
+
+def _migration_base_schema(conn, schema_path: str) -> str:
+    """Migration : schéma de base (memory/schema.sql, idempotent)"""
+    schema_file = Path(schema_path)
+    if not schema_file.exists():
+        logger.warning(f"Schéma introuvable: {schema_path}")
+        return ""
+    with open(schema_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+# Migrations ordonnées (version, description, fonction(conn, schema_path) -> script SQL
+# ou callable(conn) pour une migration Python). Ne jamais modifier une migration publiée : ajouter une nouvelle version à la fin.
+MIGRATIONS = [
+    (1, "schéma de base", _migration_base_schema),
+    (2, "index plein texte memory_fts", _migration_memory_fts),
+    (3, "index des tags item_tags / contact_tags", _migration_tag_index),
+    (4, "index de recherche des contacts", _migration_contacts_search),
+    (5, "tables de résolution contact_phones / contact_emails", _migration_contact_identifiers),
+    (6, "version des contacts (verrouillage optimiste)", _migration_contact_version),
+    (7, "statistiques de termes item_terms / term_stats", _migration_term_stats),
+    (8, "points de reprise des jobs job_checkpoints", _migration_job_checkpoints),
+    (9, "historique des sessions session_messages", _migration_session_messages),
+    (10, "résumés des sessions session_summaries", _migration_session_summaries),
+    (11, "journal des changements vector_changes", _migration_vector_changes),
+    (12, "identité de la base db_meta", _migration_db_meta),
+    (13, "tags indexés normalisés en Python", _migration_tag_normalization),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _apply_migration(conn, version: int, description: str, step) -> None:
+    """
+    Applique une migration et met à jour user_version dans la même transaction
+    
+    step est un script SQL ou un callable(conn) (migration Python).
+    En cas d'erreur, rien n'est appliqué et la version reste inchangée.
+    """
+    try:
+        if callable(step):
+            conn.execute("BEGIN IMMEDIATE")
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        else:
+            conn.executescript(
+                "BEGIN IMMEDIATE;\n"
+                + step
+                + f"\nPRAGMA user_version = {int(version)};\n"
+                + "COMMIT;"
+            )
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.rollback()
+        logger.error(f"Migration {version} ({description}) échouée: {e}")
+        raise
+    logger.info(f"Migration {version} appliquée: {description}")
+
+
+# ============================================
+# UTILITAIRES
+# ============================================
+
+def _table_exists(conn, name: str) -> bool:
+    """Vérifie l'existence d'une table (ou table virtuelle)"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def encode_cursor(created_at: str, row_id: int) -> str:
+    """Encode un curseur de pagination (created_at, id) en chaîne opaque"""
+    return f"{created_at}|{row_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """
+    Décode un curseur de pagination
+    
+    Raises:
+        ValueError: Si le curseur est mal formé
+    """
+    created_at, sep, row_id = cursor.rpartition('|')
+    if not sep or not row_id.isdigit():
+        raise ValueError(f"Curseur de pagination invalide: {cursor}")
+    return created_at, int(row_id)
+
+
+def _row_to_item(row) -> dict:
+    """Convertit une row memory en dict (tags désérialisés)"""
+    item = dict(row)
+    item['tags'] = json.loads(item['tags']) if item.get('tags') else []
+    return item
@@ -0,0 +1,188 @@
+# Clara - Re-tagging
+"""
+Job de re-tagging de la mémoire existante
+
+Les items sont lus par tranches (pagination sur id, jamais toute la table),
+leurs termes extraits dans un pool de processus, puis les tags TF-IDF sont
+réécrits par lots : une transaction par tranche, qui enregistre aussi le
+point de reprise. Un job interrompu reprend après le dernier lot écrit.
+"""
+
+import os
+import json
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from memory.connection import get_connection, transaction
+from memory.tagging import extract_terms, load_term_stats, rank_terms, index_item_tags
+
+logger = logging.getLogger(__name__)
+
+RETAG_CHUNK_SIZE = 500
+RETAG_CHECKPOINT = "retag"
+
+# Tranches soumises au pool en avance (par worker) : borne la mémoire
+MAX_PENDING_CHUNKS_PER_WORKER = 2
+
+
+def retag_items(
+    type: Optional[str] = None,
+    max_tags: int = 5,
+    chunk_size: int = RETAG_CHUNK_SIZE,
+    workers: Optional[int] = None,
+    checkpoint: Optional[str] = RETAG_CHECKPOINT,
+    resume: bool = True,
+    dry_run: bool = False,
+    progress: Optional[Callable[[dict], None]] = None,
+    db_path: Optional[str] = None
+) -> dict:
+    """
+    Recalcule les tags automatiques des items existants
+
+    Les tags existants sont remplacés (un item sans terme significatif reçoit
+    son type comme tag, comme à la création).
+
+    Args:
+        type: Ne re-tagger que ce type d'item (si fourni)
+        max_tags: Nombre maximum de tags par item
+        chunk_size: Items par tranche (lecture, calcul et transaction d'écriture)
+        workers: Processus d'extraction (None = nombre de CPU, 0 ou 1 = dans ce processus)
+        checkpoint: Nom du job pour la reprise (None = pas de reprise) ; le point de
+            reprise est propre au filtre de type (checkpoint_key)
+        resume: Reprend après le point de reprise enregistré
+        dry_run: Calcule sans rien écrire (ni tags, ni point de reprise)
+        progress: Appelé après chaque tranche avec une copie du rapport
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+
+    Returns:
+        Rapport {processed, updated, last_id, dry_run}
+
+    Raises:
+        ValueError: Si chunk_size <= 0
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size doit être > 0")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Un run filtré ne reprend pas le curseur d'un run sur un autre filtre
+    checkpoint = checkpoint_key(checkpoint, type) if checkpoint else None
+    start_id = get_checkpoint(checkpoint, db_path=db_path) if checkpoint and resume else 0
+    report = {"processed": 0, "updated": 0, "last_id": start_id, "dry_run": dry_run}
+    chunks = _iter_chunks(start_id, type, chunk_size, db_path)
+
+    if workers <= 1:
+        for rows in chunks:
+            _write_chunk(rows, _extract_chunk(rows), report, max_tags, checkpoint, db_path, progress)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for rows in chunks:
+                pending.append((rows, pool.submit(_extract_chunk, rows)))
+                if len(pending) >= workers * MAX_PENDING_CHUNKS_PER_WORKER:
+                    done_rows, future = pending.popleft()
+                    _write_chunk(done_rows, future.result(), report, max_tags, checkpoint, db_path, progress)
+            while pending:
+                done_rows, future = pending.popleft()
+                _write_chunk(done_rows, future.result(), report, max_tags, checkpoint, db_path, progress)
+
+    # Job terminé : le prochain repart du début
+    if checkpoint and not dry_run:
+        clear_checkpoint(checkpoint, db_path=db_path)
+
+    logger.info(f"Re-tagging: {report['processed']} item(s) traité(s), {report['updated']} modifié(s)")
+    return report
+
+
+def checkpoint_key(name: str, type: Optional[str] = None) -> str:
+    """Clé du point de reprise d'un job pour un filtre de type ("retag:note", "retag:*")"""
+    return f"{name}:{type or '*'}"
+
+
+def get_checkpoint(name: str, db_path: Optional[str] = None) -> int:
+    """Dernier id traité par un job (0 si aucun point de reprise)"""
+    row = get_connection(db_path).execute(
+        "SELECT last_id FROM job_checkpoints WHERE name = ?", (name,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def clear_checkpoint(name: str, db_path: Optional[str] = None) -> None:
+    """Supprime le point de reprise d'un job"""
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM job_checkpoints WHERE name = ?", (name,))
+
+
+# ============================================
+# UTILITAIRES
+# ============================================
+
+def _iter_chunks(start_id: int, type: Optional[str], chunk_size: int, db_path: Optional[str]):
+    """Tranches de (id, type, content, tags) par id croissant, après start_id"""
+    query = "SELECT id, type, content, tags FROM memory WHERE id > ?"
+    if type is not None:
+        query += " AND type = ?"
+    query += " ORDER BY id LIMIT ?"
+
+    last_id = start_id
+    while True:
+        params = [last_id] + ([type] if type is not None else []) + [chunk_size]
+        rows = [tuple(row) for row in get_connection(db_path).execute(query, params).fetchall()]
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _extract_chunk(rows: list[tuple]) -> list[dict]:
+    """Extraction des termes d'une tranche (exécutée dans un worker : picklable)"""
+    return [extract_terms(content) for _, _, content, _ in rows]
+
+
+def _write_chunk(
+    rows: list[tuple],
+    terms_list: list[dict],
+    report: dict,
+    max_tags: int,
+    checkpoint: Optional[str],
+    db_path: Optional[str],
+    progress: Optional[Callable[[dict], None]]
+) -> None:
+    """Classe les termes d'une tranche et écrit tags + point de reprise en une transaction"""
+    df, documents = load_term_stats(set().union(*terms_list), get_connection(db_path))
+
+    changes = []
+    for (item_id, item_type, _, old_tags), terms in zip(rows, terms_list):
+        tags = rank_terms(terms, df, documents, max_tags) or [item_type]
+        if _decode_tags(old_tags) != tags:
+            changes.append((json.dumps(tags), item_id))
+
+    last_id = rows[-1][0]
+    if not report["dry_run"]:
+        with transaction(db_path) as conn:
+            # updated_at inchangé : maintenance, pas une modification de l'utilisateur
+            conn.executemany("UPDATE memory SET tags = ? WHERE id = ?", changes)
+            index_item_tags(conn, ((item_id, tags) for tags, item_id in changes))
+            if checkpoint:
+                conn.execute(
+                    """INSERT INTO job_checkpoints (name, last_id) VALUES (?, ?)
+                       ON CONFLICT(name) DO UPDATE SET last_id = excluded.last_id,
+                                                       updated_at = CURRENT_TIMESTAMP""",
+                    (checkpoint, last_id)
+                )
+
+    report["processed"] += len(rows)
+    report["updated"] += len(changes)
+    report["last_id"] = last_id
+    if progress:
+        progress(dict(report))
+
+
+def _decode_tags(tags_json: Optional[str]) -> list:
+    """Tags JSON d'une ligne memory ([] si vide ou invalide)"""
+    try:
+        return json.loads(tags_json) if tags_json else []
+    except (json.JSONDecodeError, TypeError):
+        return []
@@ -0,0 +1,248 @@
+# Clara - Récupération de contexte
+"""
+Sélection du contexte mémoire injecté dans le prompt
+
+Les items, préférences et contacts candidats sont classés deux fois :
+- lexicalement (BM25 : index FTS5 pour les items, calculé sur les candidats
+  pour les préférences et les contacts)
+- sémantiquement (similarité vectorielle, memory/vector)
+
+Les deux rangs sont fusionnés (Reciprocal Rank Fusion), puis le bloc de
+contexte est rempli dans l'ordre jusqu'au top-k et au budget de tokens.
+"""
+
+import math
+import sqlite3
+import logging
+from typing import Optional
+
+import numpy as np
+
+from memory.memory_core import search_items_ranked, list_preferences
+from memory.contacts import find_contacts
+from memory.vector.embedders import tokenize
+from memory.vector.semantic import search_semantic, current_embedder
+from utils.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 8
+DEFAULT_TOKEN_BUDGET = 600
+CANDIDATES_PER_SOURCE = 20
+MAX_LINE_CHARS = 200
+MAX_CONTACT_TERMS = 5
+
+RRF_K = 60               # constante de Reciprocal Rank Fusion
+MIN_SIMILARITY = 0.15    # en dessous, similarité vectorielle considérée comme du bruit
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SOURCES = ("items", "preferences", "contacts")
+
+
+def retrieve_context(
+    query: str,
+    top_k: int = DEFAULT_TOP_K,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    types: Optional[list[str]] = None,
+    sources: tuple = SOURCES,
+    db_path: Optional[str] = None
+) -> dict:
+    """
+    Sélectionne les éléments mémoire les plus pertinents pour une requête
+
+    Args:
+        query: Texte libre (message utilisateur nettoyé)
+        top_k: Nombre maximum d'éléments retenus
+        token_budget: Budget de tokens du bloc de contexte
+        types: Types d'items autorisés (None = tous)
+        sources: Sources interrogées parmi "items", "preferences", "contacts"
+        db_path: Base des items et préférences (les contacts utilisent contacts.DB_PATH)
+
+    Returns:
+        Dict avec:
+            - context: bloc texte (une ligne par élément, "" si rien)
+            - entries: éléments retenus {source, id, line, score}
+            - tokens: tokens estimés du bloc
+    """
+    empty = {"context": "", "entries": [], "tokens": 0}
+    if not tokenize(query):
+        return empty
+
+    candidates: dict[tuple, dict] = {}
+    collectors = {
+        "items": lambda: _collect_items(candidates, query, types, db_path),
+        "preferences": lambda: _collect_preferences(candidates, query, db_path),
+        "contacts": lambda: _collect_contacts(candidates, query),
+    }
+    for source in sources:
+        try:
+            collectors[source]()
+        except sqlite3.Error as e:
+            # Une source indisponible (table absente...) ne bloque pas les autres
+            logger.warning(f"Source {source} ignorée pour le contexte: {e}")
+
+    ranked = sorted(candidates.values(), key=lambda c: c["score"], reverse=True)
+
+    entries, lines, tokens = [], [], 0
+    for candidate in ranked:
+        if len(entries) >= top_k:
+            break
+        cost = estimate_tokens(candidate["line"]) + 1
+        if tokens + cost > token_budget:
+            continue  # un élément plus court peut encore tenir
+        entries.append(candidate)
+        lines.append(candidate["line"])
+        tokens += cost
+
+    if not entries:
+        return empty
+    return {"context": "\n".join(lines), "entries": entries, "tokens": tokens}
+
+
+# ============================================
+# SOURCES
+# ============================================
+
+def _collect_items(candidates: dict, query: str, types: Optional[list[str]], db_path: Optional[str]) -> None:
+    """Items memory : BM25 (FTS5) + recherche sémantique"""
+    type_filter = types[0] if types and len(types) == 1 else None
+
+    lexical = search_items_ranked(
+        query, type=type_filter, limit=CANDIDATES_PER_SOURCE, match="any", db_path=db_path
+    )
+    semantic = [
+        item for item in search_semantic(query, k=CANDIDATES_PER_SOURCE, type=type_filter, db_path=db_path)
+        if item["score"] >= MIN_SIMILARITY
+    ]
+
+    for ranking in (lexical, semantic):
+        rank = 0
+        for item in ranking:
+            if types and item["type"] not in types:
+                continue
+            rank += 1
+            line = f"- [{item['type']} #{item['id']}] {_truncate(item['content'])}"
+            _add(candidates, ("items", item["id"]), line, rank)
+
+
+def _collect_preferences(candidates: dict, query: str, db_path: Optional[str]) -> None:
+    """Préférences (liste en cache) classées sur clé + valeur"""
+    prefs = list_preferences(db_path=db_path)
+    texts = [f"{pref.get('key') or ''} {pref.get('value') or ''}" for pref in prefs]
+    lines = [f"- [préférence] {pref.get('key')} = {_truncate(str(pref.get('value')))}" for pref in prefs]
+    _rank_texts(candidates, "preferences", [pref["id"] for pref in prefs], texts, lines, query)
+
+
+def _collect_contacts(candidates: dict, query: str) -> None:
+    """Contacts trouvés par les termes de la requête, puis classés"""
+    contacts: dict[int, dict] = {}
+    for term in tokenize(query)[:MAX_CONTACT_TERMS]:
+        if len(term) < 3:
+            continue
+        for contact in find_contacts(term, limit=CANDIDATES_PER_SOURCE):
+            contacts.setdefault(contact["id"], contact)
+
+    contacts_list = list(contacts.values())
+    texts = [_contact_text(contact) for contact in contacts_list]
+    lines = [format_contact_line(contact) for contact in contacts_list]
+    _rank_texts(candidates, "contacts", list(contacts), texts, lines, query)
+
+
+def _rank_texts(candidates: dict, source: str, ids: list, texts: list[str], lines: list[str], query: str) -> None:
+    """Classe une petite collection par BM25 et par similarité vectorielle"""
+    if not texts:
+        return
+
+    bm25 = bm25_scores(tokenize(query), [tokenize(text) for text in texts])
+    embedder = current_embedder()
+    similarity = embedder.embed(texts) @ embedder.embed([query])[0]
+
+    for scores, threshold in ((bm25, 0.0), (similarity, MIN_SIMILARITY)):
+        order = [i for i in np.argsort(-np.asarray(scores), kind="stable") if scores[i] > threshold]
+        for rank, i in enumerate(order[:CANDIDATES_PER_SOURCE], start=1):
+            _add(candidates, (source, ids[i]), lines[i], rank)
+
+
+def _add(candidates: dict, key: tuple, line: str, rank: int) -> None:
+    """Ajoute la contribution RRF d'un rang au score fusionné"""
+    candidate = candidates.get(key)
+    if candidate is None:
+        candidate = candidates[key] = {"source": key[0], "id": key[1], "line": line, "score": 0.0}
+    candidate["score"] += 1.0 / (RRF_K + rank)
+
+
+# ============================================
+# UTILITAIRES
+# ============================================
+
+def bm25_scores(query_terms: list[str], documents: list[list[str]]) -> list[float]:
+    """
+    Scores BM25 d'une requête sur une petite collection de documents tokenisés
+
+    Args:
+        query_terms: Termes de la requête
+        documents: Documents (listes de termes)
+
+    Returns:
+        Un score par document (0 si aucun terme commun)
+    """
+    if not documents:
+        return []
+
+    n = len(documents)
+    avg_len = sum(len(doc) for doc in documents) / n or 1.0
+    doc_freq = {term: sum(1 for doc in documents if term in doc) for term in set(query_terms)}
+
+    scores = []
+    for doc in documents:
+        counts: dict[str, int] = {}
+        for term in doc:
+            counts[term] = counts.get(term, 0) + 1
+
+        score = 0.0
+        for term in set(query_terms):
+            tf = counts.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_len)
+            score += idf * tf * (BM25_K1 + 1) / norm
+        scores.append(score)
+    return scores
+
+
+def format_contact_line(contact: dict) -> str:
+    """Ligne de contexte d'un contact (nom, téléphone et email principaux)"""
+    name = contact.get('display_name') or f"{contact.get('first_name') or ''} {contact.get('last_name') or ''}".strip()
+    line = f"- [contact #{contact.get('id')}] {name or 'Sans nom'}"
+
+    phones = contact.get('phones') or []
+    emails = contact.get('emails') or []
+    if phones:
+        primary_phone = next((p for p in phones if p.get('primary')), phones[0])
+        line += f" | Tél: {primary_phone.get('number', 'N/A')}"
+    if emails:
+        primary_email = next((e for e in emails if e.get('primary')), emails[0])
+        line += f" | Email: {primary_email.get('address', 'N/A')}"
+    return line
+
+
+def _contact_text(contact: dict) -> str:
+    """Texte indexé d'un contact"""
+    parts = [
+        contact.get('first_name'), contact.get('last_name'), contact.get('display_name'),
+        contact.get('company'), contact.get('role'), contact.get('category'),
+    ]
+    parts += contact.get('aliases') or []
+    parts += contact.get('tags') or []
+    parts += [email.get('address') for email in contact.get('emails') or [] if isinstance(email, dict)]
+    return " ".join(str(part) for part in parts if part)
+
+
+def _truncate(text: str) -> str:
+    """Coupe un texte trop long pour le contexte"""
+    text = " ".join((text or "").split())
+    if len(text) <= MAX_LINE_CHARS:
+        return text
+    return text[:MAX_LINE_CHARS - 1] + "…"
@@ -13,6 +13,11 @@ CREATE TABLE IF NOT EXISTS memory (
 -- Index pour améliorer les performances de recherche
 CREATE INDEX IF NOT EXISTS idx_memory_type ON memory(type);
 CREATE INDEX IF NOT EXISTS idx_memory_created_at ON memory(created_at DESC);
+-- Pagination par curseur (created_at, id), globale et par type
+CREATE INDEX IF NOT EXISTS idx_memory_created_id ON memory(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_memory_type_created_id ON memory(type, created_at, id);
+
+-- Migration 1 de memory_core.MIGRATIONS (liste des migrations suivantes : voir MIGRATIONS)
 
 -- ============================================
 -- TABLE PREFERENCES
@@ -61,6 +66,7 @@ CREATE INDEX IF NOT EXISTS idx_contacts_first_name ON contacts(first_name);
 CREATE INDEX IF NOT EXISTS idx_contacts_last_name ON contacts(last_name);
 CREATE INDEX IF NOT EXISTS idx_contacts_category ON contacts(category);
 CREATE INDEX IF NOT EXISTS idx_contacts_created_at ON contacts(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_contacts_created_id ON contacts(created_at, id);
 
 -- ============================================
 -- FORMAT POUR type = 'contact' (OBSOLÈTE - utiliser table contacts)
@@ -4,6 +4,14 @@ Génération automatique de tags à partir du contenu
 """
 
 import re
+import json
+import math
+import sqlite3
+import logging
+import unicodedata
+from typing import Optional
+
+logger = logging.getLogger(__name__)
 
 
 # Stopwords français basiques
@@ -18,47 +26,252 @@ STOPWORDS = {
     'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had'
 }
 
+# Règles de racinisation légère (premier suffixe trouvé), sur mots sans accents
+STEM_RULES = [
+    ('eaux', 'eau'), ('aux', 'al'),                 # bateaux, chevaux
+    ('ies', 'y'), ('sses', 'ss'),                   # companies, classes
+    ('ings', ''), ('ing', ''), ('ed', ''),          # meetings, planned
+    ('ss', 'ss'), ('us', 'us'), ('is', 'is'),       # invariables (business, virus, avis)
+    ('s', ''), ('x', ''),                           # pluriels
+]
+MIN_STEM_LENGTH = 3
+
+# Terme réservé de term_stats : son df est le nombre de documents indexés
+DOCUMENT_COUNT_TERM = ''
+
+# Taille des lots de termes par requête (limite de paramètres SQLite)
+TERM_STATS_CHUNK = 500
 
-def generate_tags(content: str, max_tags: int = 5) -> list[str]:
+
+def generate_tags(content: str, max_tags: int = 5, conn: Optional[sqlite3.Connection] = None) -> list[str]:
     """
     Génère automatiquement des tags depuis le contenu
     
+    Avec conn, les termes sont classés par TF-IDF : la fréquence dans le texte
+    est pondérée par la rareté du terme dans la mémoire (statistiques
+    term_stats), les mots présents partout ne dominent donc plus les tags.
+    Sans conn, classement par fréquence seule (aucun accès à la base).
+    
     Args:
         content: Texte du contenu
         max_tags: Nombre maximum de tags à générer
+        conn: Connexion à la base des statistiques (fournie par le chemin d'écriture)
     
     Returns:
         Liste de tags (lowercase, sans stopwords)
         Toujours retourne au moins un tag si content n'est pas vide
     """
-    if not content:
-        return []
+    return generate_tags_batch([content], max_tags=max_tags, conn=conn)[0]
+
+
+def generate_tags_batch(
+    contents: list[str],
+    max_tags: int = 5,
+    conn: Optional[sqlite3.Connection] = None
+) -> list[list[str]]:
+    """
+    Génère les tags de plusieurs contenus (une seule lecture des statistiques)
     
-    # Nettoyer et tokenizer
-    # Garder seulement les mots (enlever ponctuation)
-    words = re.findall(r'\b[a-zàâäéèêëïîôùûüç]+\b', content.lower())
+    Args:
+        contents: Textes à tagger
+        max_tags: Nombre maximum de tags par texte
+        conn: Connexion à la base des statistiques (None = fréquence seule)
     
-    # Filtrer les stopwords et les mots trop courts
-    meaningful_words = [
-        word for word in words 
+    Returns:
+        Une liste de tags par contenu (même ordre)
+    """
+    extracted = [extract_terms(content) for content in contents]
+    df, documents = {}, 0
+    if conn is not None:
+        df, documents = load_term_stats(set().union(*extracted) if extracted else set(), conn)
+    return [rank_terms(terms, df, documents, max_tags) for terms in extracted]
+
+
+def rank_terms(terms: dict[str, tuple[int, str]], df: dict[str, int], documents: int, max_tags: int = 5) -> list[str]:
+    """
+    Classe les termes d'un texte par TF-IDF
+    
+    Args:
+        terms: Résultat de extract_terms
+        df: Fréquences documentaires (load_term_stats)
+        documents: Nombre de documents du corpus
+        max_tags: Nombre maximum de tags
+    
+    Returns:
+        Formes affichées des meilleurs termes
+    """
+    scored = []
+    for term, (tf, surface) in terms.items():
+        idf = math.log((documents + 1) / (df.get(term, 0) + 1)) + 1.0
+        scored.append(((1.0 + math.log(tf)) * idf, surface))
+    # Score décroissant, puis forme affichée pour un ordre stable
+    scored.sort(key=lambda x: (-x[0], x[1]))
+    return [surface for _, surface in scored[:max_tags]]
+
+
+def extract_terms(content: str) -> dict[str, tuple[int, str]]:
+    """
+    Termes significatifs d'un texte, regroupés par radical
+    
+    Args:
+        content: Texte brut
+    
+    Returns:
+        Dict radical -> (occurrences, forme affichée la plus fréquente)
+    """
+    if not content:
+        return {}
+    
+    # Garder seulement les mots (enlever ponctuation), sans stopwords ni mots trop courts
+    words = [
+        word for word in re.findall(r'\b[a-zàâäéèêëïîôùûüç]+\b', content.lower())
         if word not in STOPWORDS and len(word) >= 3
     ]
     
-    # Compter les occurrences
-    word_counts = {}
-    for word in meaningful_words:
-        word_counts[word] = word_counts.get(word, 0) + 1
+    forms: dict[str, dict[str, int]] = {}
+    for word in words:
+        variants = forms.setdefault(stem(word), {})
+        variants[word] = variants.get(word, 0) + 1
+    
+    return {
+        term: (sum(variants.values()), min(variants, key=lambda w: (-variants[w], len(w), w)))
+        for term, variants in forms.items()
+    }
+
+
+def stem(word: str) -> str:
+    """
+    Racinisation légère français / anglais (flexions seulement)
+    
+    "réunions" -> "reunion", "chevaux" -> "cheval", "meetings" -> "meet",
+    "grande" -> "grand" : regroupe pluriels et féminins sans dériver le sens.
+    """
+    word = strip_accents(word.lower())
+    for suffix, replacement in STEM_RULES:
+        if word.endswith(suffix) and len(word) - len(suffix) + len(replacement) >= MIN_STEM_LENGTH:
+            word = word[:len(word) - len(suffix)] + replacement
+            break
+    # Féminin / e muet final ("grande", "tache")
+    if word.endswith('e') and not word.endswith('ee') and len(word) > MIN_STEM_LENGTH:
+        word = word[:-1]
+    return word
+
+
+# ============================================
+# STATISTIQUES DE CORPUS (term_stats)
+# ============================================
+
+def load_term_stats(terms, conn: sqlite3.Connection) -> tuple[dict[str, int], int]:
+    """
+    Lit les fréquences documentaires de termes
+    
+    Args:
+        terms: Radicaux recherchés
+        conn: Connexion à la base des statistiques
     
-    # Trier par fréquence et prendre les N premiers
-    sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
-    tags = [word for word, count in sorted_words[:max_tags]]
+    Returns:
+        (dict radical -> nombre de documents le contenant, nombre total de documents)
+        ({}, 0) si les statistiques sont indisponibles
+    """
+    terms = [term for term in terms if term]
+    try:
+        row = conn.execute(
+            "SELECT df FROM term_stats WHERE term = ?", (DOCUMENT_COUNT_TERM,)
+        ).fetchone()
+        documents = row[0] if row else 0
+        df = {}
+        for start in range(0, len(terms), TERM_STATS_CHUNK):
+            chunk = terms[start:start + TERM_STATS_CHUNK]
+            placeholders = ','.join('?' for _ in chunk)
+            df.update(conn.execute(
+                f"SELECT term, df FROM term_stats WHERE term IN ({placeholders})", chunk
+            ).fetchall())
+        return df, documents
+    except sqlite3.Error as e:
+        # Base sans statistiques : classement par fréquence seule
+        logger.debug(f"Statistiques de termes indisponibles: {e}")
+        return {}, 0
+
+
+def index_item_terms(conn, items) -> None:
+    """
+    Met à jour les termes indexés d'items (item_terms, term_stats suit par triggers)
     
-    # S'assurer qu'on a au moins un tag si le contenu n'est pas vide
-    # Prendre le premier mot significatif même s'il n'apparaît qu'une fois
-    if not tags and meaningful_words:
-        tags = [meaningful_words[0]]
+    Ne commite pas : à appeler dans la transaction qui écrit les items.
     
-    return tags
+    Args:
+        conn: Connexion en cours de transaction
+        items: Itérable de (item_id, content)
+    """
+    rows = []
+    ids = []
+    for item_id, content in items:
+        ids.append((item_id,))
+        rows.append((item_id, DOCUMENT_COUNT_TERM))
+        rows.extend((item_id, term) for term in extract_terms(content))
+    conn.executemany("DELETE FROM item_terms WHERE item_id = ?", ids)
+    conn.executemany("INSERT OR IGNORE INTO item_terms (item_id, term) VALUES (?, ?)", rows)
+
+
+def index_item_tags(conn, items) -> None:
+    """
+    Met à jour les tags indexés d'items (item_tags)
+    
+    Normalisés par normalize_tags, comme les requêtes par tag (lower() de
+    SQLite ne met en minuscules que l'ASCII). Ne commite pas : à appeler dans
+    la transaction qui écrit les items.
+    
+    Args:
+        conn: Connexion en cours de transaction
+        items: Itérable de (item_id, tags) ; tags en liste ou en JSON
+    """
+    _write_tag_rows(conn, "item_tags", "item_id", items)
+
+
+def index_contact_tags(conn, contacts) -> None:
+    """
+    Met à jour les tags indexés de contacts (contact_tags), comme index_item_tags
+    
+    Args:
+        conn: Connexion en cours de transaction
+        contacts: Itérable de (contact_id, tags) ; tags en liste ou en JSON
+    """
+    _write_tag_rows(conn, "contact_tags", "contact_id", contacts)
+
+
+def _write_tag_rows(conn, table: str, column: str, rows) -> None:
+    """Remplace les lignes de tags (table de jointure) des éléments donnés"""
+    ids = []
+    tag_rows = []
+    for owner_id, tags in rows:
+        if isinstance(tags, str):
+            try:
+                tags = json.loads(tags)
+            except ValueError:
+                tags = []
+        ids.append((owner_id,))
+        if isinstance(tags, list):
+            tag_rows.extend((owner_id, tag) for tag in normalize_tags(tags))
+    conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", ids)
+    conn.executemany(f"INSERT OR IGNORE INTO {table} ({column}, tag) VALUES (?, ?)", tag_rows)
+
+
+def normalize_tags(tags: list[str] | None) -> list[str]:
+    """
+    Normalise une liste de tags comme dans les tables item_tags / contact_tags
+    
+    Args:
+        tags: Liste de tags bruts
+    
+    Returns:
+        Tags en minuscules, sans espaces autour, vides retirés, dédupliqués (ordre conservé)
+    """
+    normalized = []
+    for tag in tags or []:
+        tag = str(tag).strip().lower()
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
 
 
 def auto_tags_for_contact(contact_dict: dict) -> list[str]:
@@ -95,3 +308,10 @@ def auto_tags_for_contact(contact_dict: dict) -> list[str]:
     # Dédupliquer et retourner
     return list(set(tags))
 
+
+
+def strip_accents(text: str) -> str:
+    """Retire les accents ("réunion" -> "reunion")"""
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)
+    )
@@ -0,0 +1,180 @@
+# Clara - Embedders
+"""
+Embedders interchangeables pour la mémoire vectorielle
+
+- HashingEmbedder : hors ligne, sans modèle (feature hashing TF sous-linéaire
+  sur mots, bigrammes et trigrammes de caractères)
+- OpenAIEmbedder : API embeddings OpenAI (réseau requis)
+
+Tous retournent des vecteurs float32 normalisés (norme L2 = 1), la similarité
+cosinus est donc un simple produit scalaire.
+"""
+
+import os
+import re
+import math
+import zlib
+from typing import Callable, Optional
+
+import numpy as np
+
+from memory.tagging import STOPWORDS, strip_accents
+
+# Poids des familles de features : mots, bigrammes de mots, n-grammes de caractères
+FEATURE_WEIGHTS = {"w": 1.0, "b": 0.5, "c": 0.25}
+
+
+class Embedder:
+    """Interface commune des embedders"""
+
+    # Identifiant stable : un index construit avec une autre signature est reconstruit
+    name = "base"
+    dim = 0
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}-{self.dim}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Calcule les vecteurs d'une liste de textes
+
+        Returns:
+            Matrice float32 (len(texts), dim), lignes normalisées
+        """
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """Embedder hors ligne par feature hashing (aucun vocabulaire à stocker)"""
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 512, word_bigrams: bool = True, char_ngrams: int = 3):
+        """
+        Args:
+            dim: Dimension des vecteurs
+            word_bigrams: Ajoute les paires de mots consécutifs
+            char_ngrams: Taille des n-grammes de caractères (0 = désactivés),
+                         rend la recherche tolérante aux pluriels et fautes légères
+        """
+        if dim <= 0:
+            raise ValueError("dim doit être > 0")
+        self.dim = dim
+        self.word_bigrams = word_bigrams
+        self.char_ngrams = char_ngrams
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}-{self.dim}-b{int(self.word_bigrams)}-c{self.char_ngrams}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text).items():
+                h = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if zlib.crc32(b"#" + feature.encode("utf-8")) & 1 else -1.0
+                matrix[row, h % self.dim] += sign * weight
+        return _normalize_rows(matrix)
+
+    def _features(self, text: str) -> dict[str, float]:
+        """Features pondérées (TF sous-linéaire : poids * (1 + log tf)) d'un texte"""
+        words = tokenize(text)
+
+        features = ["w:" + word for word in words]
+        if self.word_bigrams:
+            features += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+        if self.char_ngrams:
+            n = self.char_ngrams
+            for word in words:
+                padded = f"<{word}>"
+                features += ["c:" + padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+        counts: dict[str, int] = {}
+        for feature in features:
+            counts[feature] = counts.get(feature, 0) + 1
+        return {
+            feature: FEATURE_WEIGHTS[feature[0]] * (1.0 + math.log(tf))
+            for feature, tf in counts.items()
+        }
+
+
+class OpenAIEmbedder(Embedder):
+    """Embedder via l'API OpenAI (text-embedding-3-*)"""
+
+    name = "openai"
+
+    def __init__(self, model: str = "text-embedding-3-small", dim: int = 1536, batch_size: int = 128):
+        """
+        Args:
+            model: Modèle d'embedding
+            dim: Dimension demandée à l'API
+            batch_size: Nombre de textes par requête
+        """
+        from openai import OpenAI
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY manquant dans l'environnement")
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+        self.dim = dim
+        self.batch_size = batch_size
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}-{self.model}-{self.dim}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            batch = [text or " " for text in texts[start:start + self.batch_size]]
+            resp = self.client.embeddings.create(model=self.model, input=batch, dimensions=self.dim)
+            for offset, data in enumerate(resp.data):
+                matrix[start + offset] = data.embedding
+        return _normalize_rows(matrix)
+
+
+# ============================================
+# REGISTRE
+# ============================================
+
+_EMBEDDERS: dict[str, Callable[..., Embedder]] = {
+    "hashing": HashingEmbedder,
+    "openai": OpenAIEmbedder,
+}
+
+
+def register_embedder(name: str, factory: Callable[..., Embedder]) -> None:
+    """Enregistre un embedder (nom -> fabrique) utilisable par get_embedder"""
+    _EMBEDDERS[name] = factory
+
+
+def get_embedder(name: str = "hashing", **kwargs) -> Embedder:
+    """
+    Instancie un embedder enregistré
+
+    Raises:
+        ValueError: Si le nom est inconnu
+    """
+    factory: Optional[Callable[..., Embedder]] = _EMBEDDERS.get(name)
+    if factory is None:
+        raise ValueError(f"Embedder inconnu: {name} (disponibles: {sorted(_EMBEDDERS)})")
+    return factory(**kwargs)
+
+
+def tokenize(text: str) -> list[str]:
+    """Mots en minuscules, sans accents ni stopwords ("Les réunions" -> ["reunions"])"""
+    # [^\W_] : les clés comme "format_budget" donnent deux mots
+    return [
+        strip_accents(word)
+        for word in re.findall(r"[^\W_]+", (text or "").lower())
+        if word not in STOPWORDS
+    ]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Normalise chaque ligne (les lignes nulles restent nulles)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
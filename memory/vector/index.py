@@ -0,0 +1,333 @@
+# Clara - Index vectoriel
+"""
+Index vectoriel embarqué (NumPy)
+
+- Vecteurs float32 dans un fichier memory-mappé (vectors.f32), jamais chargés
+  entièrement en RAM
+- Index IVF (k-means sphérique) : la recherche ne parcourt que les listes des
+  nprobe centroïdes les plus proches ; recherche exacte tant que l'index est petit
+- Ids, empreintes de contenu et listes IVF dans des .npy, métadonnées dans meta.json
+
+Les vecteurs sont supposés normalisés (score = produit scalaire = cosinus).
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INITIAL_CAPACITY = 1024
+DEFAULT_NPROBE = 8
+IVF_MIN_ROWS = 4096      # en dessous, recherche exacte (plus rapide qu'un IVF)
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+
+
+class VectorIndex:
+    """Index vectoriel persistant : upsert / remove / search par id entier"""
+
+    def __init__(
+        self,
+        directory: str,
+        dim: int,
+        signature: str = "",
+        nprobe: int = DEFAULT_NPROBE,
+        ivf_min_rows: int = IVF_MIN_ROWS
+    ):
+        """
+        Args:
+            directory: Dossier des fichiers de l'index (créé si absent)
+            dim: Dimension des vecteurs
+            signature: Signature de l'embedder ; l'index est vidé si elle change
+            nprobe: Nombre de listes IVF parcourues par recherche
+            ivf_min_rows: Taille à partir de laquelle l'index IVF est entraîné
+        """
+        self.directory = directory
+        self.dim = dim
+        self.signature = signature
+        self.nprobe = nprobe
+        self.ivf_min_rows = ivf_min_rows
+        self.state: dict = {}  # état libre persisté (ex. empreinte de la source)
+        self.lock = threading.RLock()  # réentrant : à prendre pour un lot d'opérations
+
+        os.makedirs(directory, exist_ok=True)
+        meta = self._read_meta()
+        if meta and meta.get("dim") == dim and meta.get("signature") == signature:
+            try:
+                self._load(meta)
+                return
+            except (OSError, ValueError) as e:
+                logger.warning(f"Index vectoriel {directory} illisible, reconstruction: {e}")
+        elif meta:
+            logger.info(f"Index vectoriel {directory} incompatible, reconstruction")
+        self._reset()
+
+    # ============================================
+    # ÉCRITURE
+    # ============================================
+
+    def upsert(self, ids: Iterable[int], vectors: np.ndarray, hashes: Optional[Iterable[int]] = None) -> None:
+        """
+        Ajoute ou remplace des vecteurs
+
+        Args:
+            ids: Ids des éléments
+            vectors: Matrice (len(ids), dim)
+            hashes: Empreintes du contenu source (pour la synchronisation incrémentale)
+        """
+        ids = [int(i) for i in ids]
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        hashes = [int(h) for h in hashes] if hashes is not None else [0] * len(ids)
+
+        with self.lock:
+            rows = np.array([self._row_for(item_id) for item_id in ids], dtype=np.int64)
+            if len(rows) == 0:
+                return
+            self._vectors[rows] = vectors
+            self._ids[rows] = ids
+            self._hashes[rows] = hashes
+            if self._centroids is not None:
+                self._lists[rows] = np.argmax(vectors @ self._centroids.T, axis=1)
+
+            if len(self) >= self.ivf_min_rows and (
+                self._centroids is None or len(self) >= 2 * self._trained_count
+            ):
+                self.train()
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Retire des vecteurs (les lignes libérées sont réutilisées), retourne leur nombre"""
+        removed = 0
+        with self.lock:
+            for item_id in ids:
+                row = self._row_of.pop(int(item_id), None)
+                if row is None:
+                    continue
+                self._ids[row] = -1
+                self._lists[row] = -1
+                self._vectors[row] = 0.0
+                self._free.append(row)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Vide l'index"""
+        with self.lock:
+            self._reset()
+
+    def train(self, nlist: Optional[int] = None) -> None:
+        """
+        Entraîne l'index IVF (k-means sphérique sur un échantillon) et réassigne les lignes
+
+        Args:
+            nlist: Nombre de listes (défaut : racine du nombre de vecteurs)
+        """
+        with self.lock:
+            rows = np.flatnonzero(self._ids[:self._count] >= 0)
+            if len(rows) < 2:
+                self._centroids = None
+                return
+
+            nlist = nlist or int(np.clip(np.sqrt(len(rows)), 8, 1024))
+            nlist = min(nlist, len(rows))
+            rng = np.random.default_rng(0)
+            sample_size = min(len(rows), nlist * KMEANS_SAMPLE_PER_LIST)
+            sample = np.asarray(self._vectors[np.sort(rng.choice(rows, sample_size, replace=False))])
+
+            centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+            for _ in range(KMEANS_ITERATIONS):
+                assign = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, sample)
+                norms = np.linalg.norm(sums, axis=1)
+                filled = norms > 0  # listes vides : centroïde conservé
+                centroids[filled] = sums[filled] / norms[filled, None]
+
+            self._centroids = centroids.astype(np.float32)
+            for start in range(0, len(rows), 8192):
+                chunk = rows[start:start + 8192]
+                self._lists[chunk] = np.argmax(self._vectors[chunk] @ self._centroids.T, axis=1)
+            self._trained_count = len(rows)
+            logger.info(f"Index IVF entraîné: {len(rows)} vecteurs, {nlist} listes")
+
+    def save(self) -> None:
+        """Écrit les vecteurs sur disque et les métadonnées (meta.json en dernier)"""
+        with self.lock:
+            self._vectors.flush()
+            np.save(self._path("ids.npy"), self._ids[:self._count])
+            np.save(self._path("hashes.npy"), self._hashes[:self._count])
+            np.save(self._path("lists.npy"), self._lists[:self._count])
+            if self._centroids is not None:
+                np.save(self._path("centroids.npy"), self._centroids)
+            elif os.path.exists(self._path("centroids.npy")):
+                os.remove(self._path("centroids.npy"))
+
+            meta = {
+                "dim": self.dim,
+                "signature": self.signature,
+                "count": self._count,
+                "capacity": self._capacity,
+                "trained_count": self._trained_count,
+                "state": self.state,
+            }
+            tmp = self._path("meta.json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, self._path("meta.json"))
+
+    # ============================================
+    # LECTURE
+    # ============================================
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        allowed_ids: Optional[Iterable[int]] = None
+    ) -> list[tuple[int, float]]:
+        """
+        Recherche les k vecteurs les plus proches (produit scalaire)
+
+        Args:
+            query: Vecteur requête (dim,)
+            k: Nombre de résultats
+            allowed_ids: Restreint la recherche à ces ids (filtre par type, etc.)
+
+        Returns:
+            Liste de (id, score) par score décroissant
+        """
+        if k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        with self.lock:
+            ids = self._ids[:self._count]
+            mask = ids >= 0
+            if allowed_ids is not None:
+                mask &= np.isin(ids, np.fromiter(allowed_ids, dtype=np.int64))
+
+            candidates = mask
+            if self._centroids is not None:
+                nprobe = min(self.nprobe, len(self._centroids))
+                probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                candidates = mask & np.isin(self._lists[:self._count], probe)
+                if np.count_nonzero(candidates) < k:
+                    candidates = mask  # listes trop pauvres (filtre sélectif) : recherche exacte
+
+            rows = np.flatnonzero(candidates)
+            if len(rows) == 0:
+                return []
+            scores = self._vectors[rows] @ query
+            if len(rows) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(len(rows))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(int(ids[rows[i]]), float(scores[i])) for i in top]
+
+    def hashes(self) -> dict[int, int]:
+        """Empreintes des éléments indexés {id: hash}"""
+        with self.lock:
+            return {item_id: int(self._hashes[row]) for item_id, row in self._row_of.items()}
+
+    def __contains__(self, item_id: int) -> bool:
+        return int(item_id) in self._row_of
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    # ============================================
+    # STOCKAGE
+    # ============================================
+
+    def _row_for(self, item_id: int) -> int:
+        """Ligne existante de l'id, ou ligne libre / nouvelle ligne"""
+        row = self._row_of.get(item_id)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self._count >= self._capacity:
+                self._grow(self._capacity * 2)
+            row = self._count
+            self._count += 1
+        self._row_of[item_id] = row
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        """Agrandit le fichier de vecteurs (copie puis remplacement atomique)"""
+        tmp = self._path("vectors.f32.tmp")
+        grown = np.memmap(tmp, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        grown[:self._count] = self._vectors[:self._count]
+        grown.flush()
+        del grown
+        self._vectors.flush()
+        del self._vectors
+        os.replace(tmp, self._path("vectors.f32"))
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r+",
+                                  shape=(capacity, self.dim))
+
+        self._ids = _pad(self._ids, capacity, -1)
+        self._hashes = _pad(self._hashes, capacity, 0)
+        self._lists = _pad(self._lists, capacity, -1)
+        self._capacity = capacity
+
+    def _reset(self) -> None:
+        """Crée un index vide (fichiers existants remplacés)"""
+        for name in ("meta.json", "ids.npy", "hashes.npy", "lists.npy", "centroids.npy"):
+            if os.path.exists(self._path(name)):
+                os.remove(self._path(name))
+
+        os.makedirs(self.directory, exist_ok=True)  # dossier supprimé entre-temps (reset)
+        self._capacity = INITIAL_CAPACITY
+        self._count = 0
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="w+",
+                                  shape=(self._capacity, self.dim))
+        self._ids = np.full(self._capacity, -1, dtype=np.int64)
+        self._hashes = np.zeros(self._capacity, dtype=np.int64)
+        self._lists = np.full(self._capacity, -1, dtype=np.int32)
+        self._centroids: Optional[np.ndarray] = None
+        self._trained_count = 0
+        self._row_of: dict[int, int] = {}
+        self._free: list[int] = []
+        self.state = {}
+
+    def _load(self, meta: dict) -> None:
+        """Ouvre un index existant"""
+        self._capacity = meta["capacity"]
+        self._count = meta["count"]
+        self._trained_count = meta.get("trained_count", 0)
+        self.state = meta.get("state", {})
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r+",
+                                  shape=(self._capacity, self.dim))
+        self._ids = _pad(np.load(self._path("ids.npy")), self._capacity, -1)
+        self._hashes = _pad(np.load(self._path("hashes.npy")), self._capacity, 0)
+        self._lists = _pad(np.load(self._path("lists.npy")).astype(np.int32), self._capacity, -1)
+        centroids = self._path("centroids.npy")
+        self._centroids = np.load(centroids) if os.path.exists(centroids) else None
+
+        self._row_of = {int(item_id): row for row, item_id in enumerate(self._ids[:self._count]) if item_id >= 0}
+        self._free = [row for row in range(self._count) if self._ids[row] < 0]
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+
+def _pad(array: np.ndarray, size: int, fill) -> np.ndarray:
+    """Étend un tableau 1D jusqu'à size avec fill"""
+    if len(array) >= size:
+        return array[:size].copy()
+    padded = np.full(size, fill, dtype=array.dtype)
+    padded[:len(array)] = array
+    return padded
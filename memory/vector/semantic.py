@@ -0,0 +1,288 @@
+# Clara - Recherche sémantique
+"""
+Recherche sémantique sur la table memory
+
+L'index vectoriel d'une base est stocké à côté d'elle (<db>.vectors/). Il est
+tenu à jour de façon incrémentale grâce au journal vector_changes (alimenté
+par triggers sur memory) : avant chaque recherche, seuls les items écrits
+depuis la dernière synchronisation sont ré-encodés ou retirés. La
+reconstruction complète (sync_vector_index(force=True)) n'a lieu qu'au premier
+usage d'un index, ou explicitement (démarrage, changement d'embedder). Un index
+construit pour une autre base (base recréée : ids et seq repartent de zéro,
+détecté par l'identité db_meta) est vidé puis reconstruit.
+
+    from memory.vector.semantic import search_semantic
+    results = search_semantic("réunion budget", k=5, type="note")
+"""
+
+import os
+import json
+import zlib
+import logging
+import threading
+from typing import Optional, Union
+
+from memory.connection import get_connection, get_db_path, transaction
+from memory.memory_core import iter_items, get_db_id, _row_to_item, _table_exists
+from memory.vector.embedders import Embedder, get_embedder
+from memory.vector.index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDER = "hashing"
+SYNC_BATCH_SIZE = 256
+# Changements appliqués en mémoire avant d'écrire l'index sur disque (et de purger le journal)
+SAVE_EVERY_CHANGES = 256
+
+_embedder: Optional[Embedder] = None
+_indexes: dict[str, VectorIndex] = {}
+_unsaved: dict[str, int] = {}  # par dossier d'index : changements appliqués non écrits
+_db_paths: dict[str, Optional[str]] = {}
+_lock = threading.Lock()
+
+
+def configure(embedder: Union[str, Embedder, None] = None, **kwargs) -> None:
+    """
+    Choisit l'embedder utilisé par la recherche sémantique
+
+    Args:
+        embedder: Nom enregistré ("hashing", "openai", ...) ou instance d'Embedder
+        **kwargs: Paramètres de l'embedder (si embedder est un nom)
+    """
+    global _embedder
+    with _lock:
+        if embedder is None or isinstance(embedder, Embedder):
+            _embedder = embedder
+        else:
+            _embedder = get_embedder(embedder, **kwargs)
+        # Les index ouverts avec l'ancien embedder seront rouverts (et reconstruits)
+        _indexes.clear()
+
+
+def current_embedder() -> Embedder:
+    """Embedder configuré (HashingEmbedder hors ligne par défaut)"""
+    global _embedder
+    with _lock:
+        if _embedder is None:
+            _embedder = get_embedder(DEFAULT_EMBEDDER)
+        return _embedder
+
+
+def index_dir_for(db_path: Optional[str] = None) -> str:
+    """Dossier de l'index vectoriel d'une base"""
+    return os.path.abspath(get_db_path(db_path)) + ".vectors"
+
+
+def get_vector_index(db_path: Optional[str] = None) -> VectorIndex:
+    """Index vectoriel de la base (ouvert une fois puis réutilisé)"""
+    embedder = current_embedder()
+    directory = index_dir_for(db_path)
+    with _lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = _indexes[directory] = VectorIndex(directory, embedder.dim, embedder.signature)
+        return index
+
+
+def sync_vector_index(
+    db_path: Optional[str] = None,
+    force: bool = False,
+    batch_size: int = SYNC_BATCH_SIZE
+) -> dict:
+    """
+    Met l'index vectoriel à jour depuis la table memory
+
+    Hors force, seuls les items du journal vector_changes postérieurs à la
+    dernière synchronisation sont relus ; un index jamais synchronisé, ou
+    synchronisé avec une autre base (identité db_meta différente), est
+    reconstruit en entier.
+
+    Args:
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+        force: Compare tous les items de la table (reconstruction explicite)
+        batch_size: Nombre d'items encodés à la fois
+
+    Returns:
+        Dict {"embedded": n, "removed": n}
+    """
+    index = get_vector_index(db_path)
+    conn = get_connection(db_path)
+    if not _table_exists(conn, "vector_changes"):
+        # Base pas encore migrée : pas de journal, comparaison complète
+        force = True
+
+    db_id = get_db_id(db_path)
+    with index.lock:
+        if index.state.get("db_id") != db_id:
+            # Vecteurs et change_seq d'une autre base : inutilisables
+            if index.state:
+                logger.info(f"Index vectoriel {index.directory} construit pour une autre base, reconstruction")
+            index.clear()
+            index.state["db_id"] = db_id
+            force = True
+        if force or "change_seq" not in index.state:
+            stats = _rebuild(index, db_path, batch_size)
+        else:
+            stats = _apply_changes(index, db_path, batch_size)
+
+    if stats["embedded"] or stats["removed"]:
+        logger.info(f"Index vectoriel synchronisé: {stats}")
+    return stats
+
+
+def save_vector_indexes() -> None:
+    """Écrit sur disque les index ouverts et purge leur journal (hook de shutdown)"""
+    with _lock:
+        indexes = list(_indexes.items())
+    for directory, index in indexes:
+        with index.lock:
+            if not _unsaved.get(directory):
+                continue
+            db_path = _db_paths[directory]
+            if not os.path.exists(get_db_path(db_path)) or get_db_id(db_path) != index.state.get("db_id"):
+                # Base supprimée ou recréée depuis : index périmé, le journal de la nouvelle base est intact
+                _unsaved[directory] = 0
+                continue
+            _persist(index, db_path)
+
+
+def search_semantic(
+    query: str,
+    k: int = 5,
+    type: Optional[str] = None,
+    db_path: Optional[str] = None
+) -> list[dict]:
+    """
+    Recherche les items les plus proches du sens de la requête
+
+    Args:
+        query: Texte libre
+        k: Nombre maximum de résultats
+        type: Filtrer par type (si fourni)
+        db_path: Chemin vers la base de données (défaut : memory_db_path configuré)
+
+    Returns:
+        Items (comme get_items) avec un champ score (cosinus, plus grand = plus proche)
+    """
+    if not query or not query.strip():
+        return []
+
+    sync_vector_index(db_path)
+    index = get_vector_index(db_path)
+    query_vector = current_embedder().embed([query])[0]
+
+    conn = get_connection(db_path)
+    allowed = None
+    if type is not None:
+        allowed = [row[0] for row in conn.execute("SELECT id FROM memory WHERE type = ?", (type,))]
+
+    hits = [(item_id, score) for item_id, score in index.search(query_vector, k, allowed) if score > 0]
+    if not hits:
+        return []
+
+    placeholders = ",".join("?" * len(hits))
+    rows = conn.execute(
+        f"SELECT * FROM memory WHERE id IN ({placeholders})", [item_id for item_id, _ in hits]
+    ).fetchall()
+    items = {row["id"]: _row_to_item(row) for row in rows}
+
+    results = []
+    for item_id, score in hits:
+        item = items.get(item_id)
+        if item is not None:
+            item["score"] = score
+            results.append(item)
+    return results
+
+
+def _rebuild(index: VectorIndex, db_path: Optional[str], batch_size: int) -> dict:
+    """Compare toute la table à l'index (seuls les items modifiés sont ré-encodés)"""
+    conn = get_connection(db_path)
+    # Journal lu avant le parcours : une écriture pendant celui-ci sera réappliquée
+    change_seq = 0
+    if _table_exists(conn, "vector_changes"):
+        change_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM vector_changes").fetchone()[0]
+
+    known = index.hashes()
+    seen = set()
+    stats = {"embedded": 0, "removed": 0}
+    pending: list[dict] = []
+    for item in iter_items(batch_size=batch_size, db_path=db_path):
+        seen.add(item["id"])
+        pending.append(item)
+        if len(pending) >= batch_size:
+            stats["embedded"] += _embed_changed(index, pending, known)
+            pending.clear()
+    stats["embedded"] += _embed_changed(index, pending, known)
+    stats["removed"] = index.remove(set(known) - seen)
+
+    index.state.pop("fingerprint", None)  # ancien mode de détection des changements
+    index.state["change_seq"] = change_seq
+    _persist(index, db_path)
+    return stats
+
+
+def _apply_changes(index: VectorIndex, db_path: Optional[str], batch_size: int) -> dict:
+    """Applique à l'index les items du journal postérieurs à index.state["change_seq"]"""
+    conn = get_connection(db_path)
+    stats = {"embedded": 0, "removed": 0}
+    rows = conn.execute(
+        "SELECT seq, item_id FROM vector_changes WHERE seq > ? ORDER BY seq", (index.state["change_seq"],)
+    ).fetchall()
+    if not rows:
+        return stats
+
+    changed = list(dict.fromkeys(row[1] for row in rows))
+    known = index.hashes()
+    for start in range(0, len(changed), batch_size):
+        chunk = changed[start:start + batch_size]
+        placeholders = ",".join("?" * len(chunk))
+        items = [
+            _row_to_item(row)
+            for row in conn.execute(f"SELECT * FROM memory WHERE id IN ({placeholders})", chunk)
+        ]
+        stats["embedded"] += _embed_changed(index, items, known)
+        present = {item["id"] for item in items}
+        stats["removed"] += index.remove(item_id for item_id in chunk if item_id not in present)
+
+    index.state["change_seq"] = rows[-1][0]
+    directory = index.directory
+    _db_paths[directory] = db_path
+    _unsaved[directory] = _unsaved.get(directory, 0) + len(changed)
+    if _unsaved[directory] >= SAVE_EVERY_CHANGES:
+        _persist(index, db_path)
+    return stats
+
+
+def _embed_changed(index: VectorIndex, items: list[dict], known: dict[int, int]) -> int:
+    """Encode et indexe les items dont l'empreinte a changé, retourne leur nombre"""
+    changed = [(item, _item_hash(item)) for item in items]
+    changed = [(item, content_hash) for item, content_hash in changed if known.get(item["id"]) != content_hash]
+    if changed:
+        index.upsert(
+            [item["id"] for item, _ in changed],
+            current_embedder().embed([_item_text(item) for item, _ in changed]),
+            [content_hash for _, content_hash in changed],
+        )
+    return len(changed)
+
+
+def _persist(index: VectorIndex, db_path: Optional[str]) -> None:
+    """Écrit l'index, puis purge le journal jusqu'à l'état écrit (à appeler sous index.lock)"""
+    index.save()
+    _unsaved[index.directory] = 0
+    conn = get_connection(db_path)
+    if _table_exists(conn, "vector_changes"):
+        with transaction(db_path) as tx:
+            tx.execute("DELETE FROM vector_changes WHERE seq <= ?", (index.state["change_seq"],))
+
+
+def _item_text(item: dict) -> str:
+    """Texte encodé pour un item (contenu + tags)"""
+    return " ".join([item["content"] or ""] + list(item.get("tags") or []))
+
+
+def _item_hash(item: dict) -> int:
+    """Empreinte du contenu indexé d'un item"""
+    payload = json.dumps([item["type"], item["content"], item.get("tags") or []], ensure_ascii=False)
+    return zlib.crc32(payload.encode("utf-8"))
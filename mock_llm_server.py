@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# Clara - Serveur LLM simulé
+"""
+Serveur local compatible OpenAI (chat.completions) pour les tests de charge hors ligne
+
+Remplace l'API OpenAI sans clé ni réseau : réponses scriptées (blocs JSON
+memory_action / filesystem au format attendu par l'orchestrateur, appels de
+fonctions pour Autogen), streaming SSE, latences tirées selon une loi
+configurable et injection d'erreurs (pour exercer reprises et disjoncteur).
+
+Configuration : section mock_llm de config/settings.yaml. Avec enabled: true,
+LLMDriver, AsyncLLMDriver et build_llm_config visent base_url.
+
+Lancement :
+    python mock_llm_server.py [--config config/settings.yaml] [--port 8100]
+"""
+
+import sys
+import json
+import time
+import math
+import uuid
+import random
+import asyncio
+import argparse
+import re
+from pathlib import Path
+from string import Template
+from typing import Optional
+from urllib.parse import urlparse
+
+import yaml
+
+# Ajouter le répertoire courant au path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from utils.tokens import estimate_tokens, estimate_message_tokens
+
+DEFAULT_BASE_URL = "http://127.0.0.1:8100/v1"
+
+# Réponses scriptées : la première règle dont match (regex) trouve le dernier
+# message utilisateur s'applique. $message = ce message (échappé pour du JSON).
+# tool_call n'est utilisé que si la requête propose un outil de ce nom.
+DEFAULT_SCRIPTS = [
+    {
+        "match": r"(?i)\b(liste|montre|affiche)\b.*\b(todos?|tâches)\b",
+        "response": "Voici tes todos :\n```json\n{\"memory_action\": \"list_todos\"}\n```",
+        "tool_call": {"name": "list_todos", "arguments": {}},
+    },
+    {
+        "match": r"(?i)\b(todo|tâche|à faire)\b",
+        "response": "C'est ajouté à ta liste !\n```json\n"
+                    "{\"memory_action\": \"save_todo\", \"content\": \"$message\", \"tags\": [\"mock\"]}\n```",
+        "tool_call": {"name": "save_todo_tool", "arguments": {"content": "$message"}},
+    },
+    {
+        "match": r"(?i)\b(note|retiens|souviens)\b",
+        "response": "C'est noté !\n```json\n"
+                    "{\"memory_action\": \"save_note\", \"content\": \"$message\", \"tags\": [\"mock\"]}\n```",
+        "tool_call": {"name": "save_note_tool", "arguments": {"content": "$message"}},
+    },
+    {
+        "match": r"(?i)\b(cherche|recherche)\b",
+        "response": "Je cherche dans tes notes.\n```json\n"
+                    "{\"memory_action\": \"search_notes\", \"query\": \"$message\"}\n```",
+        "tool_call": {"name": "search_memory", "arguments": {"query": "$message"}},
+    },
+    {
+        "match": r"(?i)\b(fichiers?|dossiers?|répertoire)\b",
+        "response": "Je regarde le dossier.\n```json\n"
+                    "{\n  \"intent\": \"filesystem\",\n  \"action\": \"list_dir\",\n  \"params\": { \"path\": \".\" }\n}\n```",
+        "tool_call": {"name": "list_dir", "arguments": {"path": "."}},
+    },
+]
+
+# Réponse par défaut : prose de default_words mots
+FILLER_WORDS = (
+    "Bien sûr, je m'en occupe. Voici ce que je te propose pour avancer sereinement sur ce sujet, "
+    "étape par étape, en gardant l'essentiel en tête et sans rien oublier d'important."
+).split()
+
+
+def sample_latency(spec: Optional[dict], rng: random.Random) -> float:
+    """
+    Tire une latence (secondes) selon spec
+
+    spec : {distribution: constant|uniform|normal|lognormal, mean_ms, stddev_ms,
+    min_ms, max_ms}. uniform tire entre min_ms et max_ms ; le résultat est
+    borné par min_ms / max_ms et jamais négatif.
+    """
+    spec = spec or {}
+    distribution = spec.get("distribution", "constant")
+    mean = float(spec.get("mean_ms", 0))
+    stddev = float(spec.get("stddev_ms", 0))
+    low = float(spec.get("min_ms", 0))
+    high = spec.get("max_ms")
+
+    if distribution == "constant":
+        value = mean
+    elif distribution == "uniform":
+        value = rng.uniform(low, float(high if high is not None else mean * 2))
+    elif distribution == "normal":
+        value = rng.gauss(mean, stddev)
+    elif distribution == "lognormal":
+        if mean <= 0:
+            value = 0.0
+        else:
+            # Paramètres de la loi normale sous-jacente pour obtenir mean / stddev
+            sigma2 = math.log(1 + (stddev / mean) ** 2)
+            value = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+    else:
+        raise ValueError(f"Distribution de latence inconnue: {distribution}")
+
+    value = max(value, low)
+    if high is not None:
+        value = min(value, float(high))
+    return value / 1000
+
+
+def _message_text(message: dict) -> str:
+    """Contenu texte d'un message (chaîne ou liste de parties)"""
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def _split_chunks(text: str) -> list[str]:
+    """Découpe une réponse en fragments de streaming (un mot et ses espaces)"""
+    return re.findall(r"\s*\S+\s*", text) or [text]
+
+
+class MockLLM:
+    """Moteur du serveur : choix de la réponse scriptée, latences, erreurs injectées"""
+
+    def __init__(self, settings: Optional[dict] = None):
+        """
+        Args:
+            settings: Section mock_llm de settings.yaml
+        """
+        settings = settings or {}
+        self.scripts = [
+            dict(script, pattern=re.compile(script["match"]))
+            for script in (settings.get("scripts") or DEFAULT_SCRIPTS)
+        ]
+        self.default_words = settings.get("default_words", 40)
+        latency = settings.get("latency") or {}
+        self.first_token_latency = latency.get("first_token")
+        self.inter_token_latency = latency.get("inter_token")
+        self.error_rate = float(settings.get("error_rate", 0.0))
+        self.error_status = int(settings.get("error_status", 503))
+        self.retry_after = settings.get("retry_after_seconds")
+        self.rng = random.Random(settings.get("seed"))
+        self.requests = 0
+
+    def reply(self, body: dict) -> dict:
+        """
+        Réponse à une requête chat.completions
+
+        Returns:
+            {content, tool_calls, function_call, finish_reason}
+        """
+        messages = body.get("messages") or []
+        last = messages[-1] if messages else {}
+        user_text = next((_message_text(m) for m in reversed(messages) if m.get("role") == "user"), "")
+        tools = {t.get("function", {}).get("name") for t in body.get("tools") or []}
+        functions = {f.get("name") for f in body.get("functions") or []}
+        reply = {"content": None, "tool_calls": None, "function_call": None, "finish_reason": "stop"}
+
+        # Après l'exécution d'un outil : on conclut en texte
+        if last.get("role") in ("tool", "function"):
+            reply["content"] = f"C'est fait. Résultat : {_message_text(last)[:200]}"
+            return reply
+
+        script = next((s for s in self.scripts if s["pattern"].search(user_text)), None)
+        escaped = json.dumps(user_text, ensure_ascii=False)[1:-1]
+        call = script.get("tool_call") if script else None
+        if call and call["name"] in tools | functions:
+            arguments = Template(json.dumps(call.get("arguments") or {}, ensure_ascii=False))
+            function = {"name": call["name"], "arguments": arguments.safe_substitute(message=escaped)}
+            if call["name"] in tools:
+                reply["tool_calls"] = [{"id": f"call_{uuid.uuid4().hex[:24]}", "type": "function", "function": function}]
+                reply["finish_reason"] = "tool_calls"
+            else:
+                reply["function_call"] = function
+                reply["finish_reason"] = "function_call"
+            return reply
+
+        if script:
+            reply["content"] = Template(script["response"]).safe_substitute(message=escaped)
+        else:
+            reply["content"] = " ".join(
+                FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(self.default_words)
+            )
+        return reply
+
+    def should_fail(self) -> bool:
+        """Tire l'injection d'une erreur pour cette requête"""
+        return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+    def first_token_delay(self) -> float:
+        return sample_latency(self.first_token_latency, self.rng)
+
+    def inter_token_delay(self) -> float:
+        return sample_latency(self.inter_token_latency, self.rng)
+
+
+def _usage(body: dict, reply: dict) -> dict:
+    prompt_tokens = sum(estimate_message_tokens(m) for m in body.get("messages") or [])
+    completion_tokens = estimate_tokens(reply["content"] or "") + sum(
+        estimate_tokens(c["function"]["arguments"]) for c in reply["tool_calls"] or []
+    ) + estimate_tokens((reply["function_call"] or {}).get("arguments", ""))
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _sse(data) -> str:
+    return f"data: {data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def create_app(settings: Optional[dict] = None, config_path: str = "config/settings.yaml") -> FastAPI:
+    """
+    Application FastAPI du serveur simulé
+
+    Args:
+        settings: Section mock_llm (défaut : lue dans config_path)
+        config_path: settings.yaml
+    """
+    if settings is None:
+        with open(config_path, "r", encoding="utf-8") as f:
+            settings = (yaml.safe_load(f) or {}).get("mock_llm") or {}
+    engine = MockLLM(settings)
+    app = FastAPI(title="Clara Mock LLM")
+    app.state.engine = engine
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "clara"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        engine.requests += 1
+
+        if engine.should_fail():
+            headers = {"retry-after": str(engine.retry_after)} if engine.retry_after is not None else None
+            return JSONResponse(
+                {"error": {"message": "Erreur simulée", "type": "server_error", "code": None}},
+                status_code=engine.error_status,
+                headers=headers,
+            )
+
+        reply = engine.reply(body)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "mock")
+        usage = _usage(body, reply)
+
+        await asyncio.sleep(engine.first_token_delay())
+
+        if not body.get("stream"):
+            chunks = _split_chunks(reply["content"]) if reply["content"] else []
+            await asyncio.sleep(sum(engine.inter_token_delay() for _ in chunks[1:]))
+            message = {"role": "assistant", "content": reply["content"]}
+            if reply["tool_calls"]:
+                message["tool_calls"] = reply["tool_calls"]
+            if reply["function_call"]:
+                message["function_call"] = reply["function_call"]
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": reply["finish_reason"]}],
+                "usage": usage,
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def chunk(delta: dict, finish_reason=None) -> dict:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        async def events():
+            yield _sse(chunk({"role": "assistant", "content": ""}))
+            if reply["tool_calls"]:
+                for index, call in enumerate(reply["tool_calls"]):
+                    yield _sse(chunk({"tool_calls": [dict(call, index=index)]}))
+            elif reply["function_call"]:
+                yield _sse(chunk({"function_call": reply["function_call"]}))
+            else:
+                for position, text in enumerate(_split_chunks(reply["content"])):
+                    if position:
+                        await asyncio.sleep(engine.inter_token_delay())
+                    yield _sse(chunk({"content": text}))
+            yield _sse(chunk({}, reply["finish_reason"]))
+            if include_usage:
+                yield _sse({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                })
+            yield _sse("[DONE]")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur LLM simulé (compatible OpenAI)")
+    parser.add_argument("--config", default="config/settings.yaml", help="settings.yaml (section mock_llm)")
+    parser.add_argument("--host", default=None, help="Hôte (défaut : celui de mock_llm.base_url)")
+    parser.add_argument("--port", type=int, default=None, help="Port (défaut : celui de mock_llm.base_url)")
+    args = parser.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        settings = (yaml.safe_load(f) or {}).get("mock_llm") or {}
+    url = urlparse(settings.get("base_url", DEFAULT_BASE_URL))
+
+    import uvicorn
+    uvicorn.run(create_app(settings), host=args.host or url.hostname, port=args.port or url.port or 8100)
+
+
+if __name__ == "__main__":
+    main()
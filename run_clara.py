@@ -29,6 +29,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 from agents.orchestrator import Orchestrator
 from utils.logger import SessionLogger, DebugLogger
 from memory.memory_core import init_db
+from memory.connection import configure_from_settings, close_all_connections
+from memory.vector.semantic import sync_vector_index, save_vector_indexes
 from drivers.fs_driver import FSDriver
 
 
@@ -47,7 +49,9 @@ def main():
     try:
         # Initialiser la base de données mémoire
         print("Initialisation de la mémoire...")
+        configure_from_settings()
         init_db()
+        sync_vector_index()
         print("✓ Mémoire initialisée")
         
         # Générer un ID de session
@@ -111,6 +115,11 @@ def main():
                 print(f"\nErreur: {str(e)}\n")
                 continue
         
+        # Terminer les résumés en cours et écrire l'index vectoriel avant de fermer la base
+        orchestrator.sessions.shutdown()
+        save_vector_indexes()
+        close_all_connections()
+        
         print(f"\nSession terminée: {session_id}")
         print(f"Logs sauvegardés dans logs/sessions/{session_id}.txt")
         print(f"Debug sauvegardé dans logs/debug/{session_id}.json")
@@ -0,0 +1,52 @@
+# Tests pour le cache LRU
+"""
+Tests unitaires pour utils/cache.py
+"""
+
+import unittest
+import time
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    """Tests du cache LRU"""
+
+    def test_lru_eviction(self):
+        """L'entrée la moins récemment utilisée est évincée"""
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiration(self):
+        """Une entrée expirée compte comme un miss"""
+        cache = LRUCache(max_size=10, ttl=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_counters_and_invalidation(self):
+        """Compteurs hits/misses et invalidation par prédicat"""
+        cache = LRUCache(max_size=10)
+        cache.set(('db1', 'x'), 1)
+        cache.set(('db2', 'x'), 2)
+        self.assertEqual(cache.get(('db1', 'x')), 1)
+        self.assertIsNone(cache.get('absent'))
+        self.assertEqual(cache.invalidate_where(lambda k: k[0] == 'db1'), 1)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
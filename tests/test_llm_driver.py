@@ -1,3 +1,305 @@
 # Tests pour le driver LLM
-# TODO: À implémenter
+"""
+Tests unitaires pour drivers/llm_driver.py
+(driver asynchrone, façade synchrone, annulation, cache de réponses,
+reprises, limitation de débit et disjoncteur)
+"""
 
+import unittest
+import asyncio
+import os
+import time
+import shutil
+import tempfile
+import httpx
+import openai
+from types import SimpleNamespace
+from unittest import mock
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.connection import close_connections
+from drivers.llm_driver import (
+    LLMDriver, AsyncLLMDriver, LLMLoopBridge, LLMResponseCache, CancelToken, LLMCancelledError,
+    LLMResilience, CircuitBreaker, TokenBucket, LLMUnavailableError
+)
+
+CONFIG_PATH = str(Path(__file__).parent.parent / "config" / "settings.yaml")
+
+
+class FakeCompletions:
+    """chat.completions asynchrone : répond après delay en comptant les appels simultanés"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    async def create(self, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if kwargs.get("stream"):
+            return FakeStream(["Bon", "jour"])
+        message = SimpleNamespace(content=f"écho: {kwargs['messages'][-1]['content']}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def api_error(status, headers=None):
+    """Erreur openai telle que levée par le client pour une réponse HTTP status"""
+    response = httpx.Response(status, headers=headers, request=httpx.Request("POST", "http://llm.test"))
+    error_class = {429: openai.RateLimitError, 400: openai.BadRequestError}.get(status, openai.InternalServerError)
+    return error_class(f"HTTP {status}", response=response, body=None)
+
+
+class FakeStream:
+    def __init__(self, parts):
+        self.parts = parts
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for part in self.parts:
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+
+    async def close(self):
+        self.closed = True
+
+
+class TestAsyncLLMDriver(unittest.TestCase):
+    """Tests du driver LLM asynchrone"""
+
+    def make_driver(self, **kwargs):
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test"}):
+            driver = AsyncLLMDriver(CONFIG_PATH, **kwargs)
+        completions = FakeCompletions()
+        driver.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return driver, completions
+
+    def test_concurrency_limit(self):
+        """Le sémaphore borne le nombre d'appels simultanés"""
+        driver, completions = self.make_driver(max_concurrency=2)
+
+        async def run():
+            results = await asyncio.gather(*[
+                driver.generate([{"role": "user", "content": str(i)}]) for i in range(6)
+            ])
+            await driver.aclose()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual([r["text"] for r in results], [f"écho: {i}" for i in range(6)])
+        self.assertEqual(completions.max_active, 2)
+        self.assertEqual(driver.in_flight, 0)
+
+    def test_timeout(self):
+        """Un appel trop long lève TimeoutError et libère sa place"""
+        driver, completions = self.make_driver(max_concurrency=1)
+        completions.delay = 1
+
+        async def run():
+            with self.assertRaises(asyncio.TimeoutError):
+                await driver.generate([{"role": "user", "content": "x"}], timeout=0.05)
+            completions.delay = 0
+            result = await driver.generate([{"role": "user", "content": "y"}])
+            await driver.aclose()
+            return result
+
+        self.assertEqual(asyncio.run(run())["text"], "écho: y")
+
+    def test_bridge_stream_and_cancel(self):
+        """La façade synchrone streame depuis un thread et s'annule via CancelToken"""
+        driver, completions = self.make_driver()
+
+        async def run():
+            bridge = LLMLoopBridge(driver, asyncio.get_running_loop())
+            events = await asyncio.to_thread(lambda: list(bridge.generate_stream([])))
+
+            completions.delay = 5
+            token = CancelToken()
+            asyncio.get_running_loop().call_later(0.05, token.cancel)
+            with self.assertRaises(LLMCancelledError):
+                await asyncio.to_thread(bridge.generate, [{"role": "user", "content": "x"}], token)
+            await asyncio.sleep(0)
+            await driver.aclose()
+            return events
+
+        events = asyncio.run(run())
+        self.assertEqual([e["type"] for e in events], ["delta", "delta", "done"])
+        self.assertEqual(events[-1]["text"], "Bonjour")
+        self.assertEqual(completions.active, 0)
+        self.assertEqual(driver.in_flight, 0)
+
+
+class TestCancelToken(unittest.TestCase):
+    """Tests du jeton d'annulation"""
+
+    def test_callbacks(self):
+        """Les callbacks sont appelés une fois, immédiatement s'ils arrivent après l'annulation"""
+        calls = []
+        token = CancelToken()
+        token.add_callback(lambda: calls.append("a"))
+        removed = lambda: calls.append("b")
+        token.add_callback(removed)
+        token.remove_callback(removed)
+        token.cancel()
+        token.cancel()
+        token.add_callback(lambda: calls.append("c"))
+        self.assertEqual(calls, ["a", "c"])
+        with self.assertRaises(LLMCancelledError):
+            token.raise_if_cancelled()
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    """Tests du cache de réponses"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "llm_cache.sqlite")
+
+    def tearDown(self):
+        close_connections(self.path)
+        shutil.rmtree(self.temp_dir)
+
+    def test_key_normalization(self):
+        """Les espaces ne changent pas la clé ; endpoint, modèle, température et contenu oui"""
+        key = LLMResponseCache.make_key("http://a/v1", "m", 0.0, 100, [{"role": "user", "content": "liste  mes\nnotes "}])
+        self.assertEqual(key, LLMResponseCache.make_key("http://a/v1", "m", 0.0, 100, [{"role": "user", "content": "liste mes notes"}]))
+        self.assertNotEqual(key, LLMResponseCache.make_key("http://a/v1", "m", 0.2, 100, [{"role": "user", "content": "liste mes notes"}]))
+        self.assertNotEqual(key, LLMResponseCache.make_key("http://a/v1", "m", 0.0, 100, [{"role": "user", "content": "liste mes todos"}]))
+        self.assertNotEqual(key, LLMResponseCache.make_key("http://b/v1", "m", 0.0, 100, [{"role": "user", "content": "liste mes notes"}]))
+
+    def test_ttl_and_eviction(self):
+        """Les réponses expirent après ttl ; au-delà de max_entries, la moins récemment utilisée part"""
+        cache = LLMResponseCache(self.path, ttl=60, max_entries=2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        self.assertEqual(cache.get("a"), "A")
+        cache.set("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), ("A", "C"))
+
+        with mock.patch("drivers.llm_driver.time.time", return_value=time.time() + 61):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["hits"], 3)
+
+    def test_driver_uses_cache_when_deterministic(self):
+        """Le driver ne rappelle pas le LLM pour un prompt identique à température 0 ; au-delà, pas de cache"""
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test"}):
+            driver = LLMDriver(CONFIG_PATH)
+        driver.cache = LLMResponseCache(self.path, max_temperature=0.0)
+        calls = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            message = SimpleNamespace(content="Bonjour !")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+        driver.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        messages = [{"role": "user", "content": "salut"}]
+
+        driver.temperature = 0.0
+        self.assertNotIn("cached", driver.generate(messages))
+        self.assertEqual(driver.generate(messages), {"text": "Bonjour !", "usage": None, "cached": True})
+        self.assertEqual([e["type"] for e in driver.generate_stream(messages)], ["delta", "done"])
+        self.assertEqual(len(calls), 1)
+
+        # Autre endpoint (serveur simulé) : pas de réponse partagée
+        api_url, driver.base_url = driver.base_url, "http://127.0.0.1:8100/v1/"
+        self.assertNotIn("cached", driver.generate(messages))
+        driver.base_url = api_url
+        self.assertEqual(len(calls), 2)
+
+        driver.temperature = 0.7
+        driver.generate(messages)
+        driver.generate(messages)
+        self.assertEqual(len(calls), 4)
+
+
+class TestLLMResilience(unittest.TestCase):
+    """Tests des reprises, du limiteur de débit et du disjoncteur"""
+
+    def run_calls(self, resilience, outcomes):
+        """Appelle resilience.call sur une requête qui lève / retourne outcomes dans l'ordre"""
+        outcomes = list(outcomes)
+
+        def request():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with mock.patch("drivers.llm_driver.time.sleep") as sleep:
+            try:
+                return resilience.call(request, [], 0), [c.args[0] for c in sleep.call_args_list]
+            finally:
+                self.remaining = outcomes
+
+    def test_retry_honors_retry_after(self):
+        """Un 429 est repris après le Retry-After ; un 5xx après un backoff borné"""
+        resilience = LLMResilience(max_retries=3, backoff_base=0.5, backoff_max=20)
+        result, sleeps = self.run_calls(resilience, [api_error(429, {"retry-after": "2"}), api_error(503), "ok"])
+        self.assertEqual(result, "ok")
+        self.assertEqual(sleeps[0], 2.0)
+        self.assertTrue(0 <= sleeps[1] <= 1.0)
+        self.assertEqual(resilience.retries, 2)
+
+    def test_no_retry_for_client_errors(self):
+        """Un 400, un quota épuisé ou un Retry-After trop long ne sont pas repris"""
+        resilience = LLMResilience(max_retries=3, backoff_max=20)
+        with self.assertRaises(openai.BadRequestError):
+            self.run_calls(resilience, [api_error(400), "ok"])
+        with self.assertRaises(openai.RateLimitError):
+            self.run_calls(resilience, [api_error(429, {"retry-after": "120"}), "ok"])
+        self.assertEqual(self.remaining, ["ok"])
+        self.assertEqual(resilience.retries, 0)
+
+    def test_circuit_breaker(self):
+        """Après N échecs le circuit s'ouvre (échec immédiat), un essai réussi le referme"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        resilience = LLMResilience(max_retries=1, backoff_base=0, circuit_breaker=breaker)
+        with self.assertRaises(openai.InternalServerError):
+            self.run_calls(resilience, [api_error(500), api_error(502)])
+        self.assertEqual(breaker.state, "open")
+        with self.assertRaises(LLMUnavailableError):
+            self.run_calls(resilience, ["ok"])
+        self.assertEqual(self.remaining, ["ok"])
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, "half_open")
+        self.assertEqual(self.run_calls(resilience, ["ok"])[0], "ok")
+        self.assertEqual(breaker.state, "closed")
+
+    def test_token_bucket(self):
+        """Le seau autorise une rafale de capacity puis impose l'attente du débit"""
+        bucket = TokenBucket(per_minute=60, capacity=2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 1.0, places=1)
+        self.assertAlmostEqual(bucket.reserve(), 2.0, places=1)
+
+    def test_cancel_during_backoff(self):
+        """L'annulation interrompt l'attente avant reprise"""
+        resilience = LLMResilience(max_retries=3)
+        token = CancelToken()
+
+        def request():
+            token.cancel()
+            raise api_error(429, {"retry-after": "10"})
+
+        start = time.monotonic()
+        with self.assertRaises(LLMCancelledError):
+            resilience.call(request, [], 0, token)
+        self.assertLess(time.monotonic() - start, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
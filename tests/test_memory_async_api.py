@@ -0,0 +1,96 @@
+# Tests pour la façade async de la mémoire
+"""
+Tests unitaires pour memory/async_api.py
+"""
+
+import unittest
+import asyncio
+import tempfile
+import threading
+import os
+import shutil
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory import async_api as async_memory
+from memory.connection import close_connections
+from memory.memory_core import init_db, get_items
+
+
+class TestAsyncMemoryAPI(unittest.TestCase):
+    """Tests de la façade async"""
+
+    def setUp(self):
+        """Prépare une base temporaire avec le schéma réel"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "memory.sqlite")
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+
+    def tearDown(self):
+        """Arrête le pool et nettoie"""
+        async_memory.configure()
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+
+    def test_same_results_as_sync(self):
+        """Les fonctions async retournent les mêmes résultats que les sync"""
+        async def scenario():
+            item_id = await async_memory.save_item(
+                type="todo", content="Acheter du pain", db_path=self.db_path
+            )
+            items = await async_memory.get_items(type="todo", db_path=self.db_path)
+            page = await async_memory.get_items_page(type="todo", limit=10, db_path=self.db_path)
+            return item_id, items, page
+
+        item_id, items, page = asyncio.run(scenario())
+        self.assertEqual(items, get_items(type="todo", db_path=self.db_path))
+        self.assertEqual(items[0]["id"], item_id)
+        self.assertEqual(page["items"], items)
+
+    def test_runs_outside_event_loop_thread(self):
+        """Les appels SQLite s'exécutent dans le pool dédié"""
+        def current_thread_name():
+            return threading.current_thread().name
+
+        name = asyncio.run(async_memory.run_in_memory_executor(current_thread_name))
+        self.assertTrue(name.startswith("clara-memory"))
+
+    def test_bounded_pending_calls(self):
+        """Au plus max_pending appels sont soumis en même temps au pool"""
+        async_memory.configure(max_workers=2, max_pending=2)
+        lock = threading.Lock()
+        state = {"current": 0, "peak": 0}
+
+        def slow_call():
+            with lock:
+                state["current"] += 1
+                state["peak"] = max(state["peak"], state["current"])
+            threading.Event().wait(0.02)
+            with lock:
+                state["current"] -= 1
+
+        async def scenario():
+            await asyncio.gather(*(
+                async_memory.run_in_memory_executor(slow_call) for _ in range(8)
+            ))
+
+        asyncio.run(scenario())
+        self.assertLessEqual(state["peak"], 2)
+
+    def test_errors_propagate(self):
+        """Les exceptions des fonctions sync remontent à l'appelant"""
+        with self.assertRaises(ValueError):
+            asyncio.run(async_memory.get_items_page(cursor="invalide", db_path=self.db_path))
+
+    def test_invalid_configuration(self):
+        """max_pending doit couvrir le nombre de workers"""
+        with self.assertRaises(ValueError):
+            async_memory.configure(max_workers=4, max_pending=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
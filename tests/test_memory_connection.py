@@ -0,0 +1,92 @@
+# Tests pour le gestionnaire de connexions SQLite
+"""
+Tests unitaires pour memory/connection.py
+"""
+
+import unittest
+import tempfile
+import threading
+import os
+import shutil
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.connection import (
+    get_connection, transaction, close_connections, close_all_connections
+)
+from memory.memory_core import init_db, save_item, get_items, reset_memory
+
+
+class TestConnectionManager(unittest.TestCase):
+    """Tests du gestionnaire de connexions"""
+
+    def setUp(self):
+        """Prépare une base temporaire avec le schéma réel"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "memory.sqlite")
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+
+    def tearDown(self):
+        """Ferme les connexions et nettoie"""
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+
+    def test_connection_reused(self):
+        """La même connexion est réutilisée dans un thread"""
+        conn1 = get_connection(self.db_path)
+        conn2 = get_connection(self.db_path)
+        self.assertIs(conn1, conn2)
+
+    def test_connection_per_thread(self):
+        """Chaque thread a sa propre connexion"""
+        main_conn = get_connection(self.db_path)
+        other = {}
+
+        def worker():
+            other['conn'] = get_connection(self.db_path)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertIsNot(main_conn, other['conn'])
+
+    def test_pragmas_applied(self):
+        """Le mode WAL est activé à l'ouverture"""
+        conn = get_connection(self.db_path)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_transaction_rollback(self):
+        """Une exception annule toute la transaction"""
+        with self.assertRaises(RuntimeError):
+            with transaction(self.db_path) as conn:
+                conn.execute("INSERT INTO memory (type, content) VALUES ('note', 'a')")
+                raise RuntimeError("boom")
+        self.assertEqual(get_items(db_path=self.db_path), [])
+
+    def test_close_and_reopen(self):
+        """Une connexion fermée est rouverte à la demande"""
+        conn1 = get_connection(self.db_path)
+        close_all_connections()
+        conn2 = get_connection(self.db_path)
+        self.assertIsNot(conn1, conn2)
+        save_item(type="note", content="après fermeture", db_path=self.db_path)
+        self.assertEqual(len(get_items(db_path=self.db_path)), 1)
+
+    def test_hard_reset_reopens(self):
+        """Après suppression du fichier, une nouvelle base est ouverte"""
+        save_item(type="note", content="avant reset", db_path=self.db_path)
+        reset_memory(hard=True, db_path=self.db_path)
+        self.assertFalse(os.path.exists(self.db_path))
+
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+        self.assertEqual(get_items(db_path=self.db_path), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
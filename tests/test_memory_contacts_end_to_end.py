@@ -9,6 +9,7 @@ import sqlite3
 import json
 import os
 import tempfile
+import io
 from pathlib import Path
 
 # Ajouter le répertoire parent au path
@@ -17,9 +18,17 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from memory.memory_core import (
     init_db, save_item, get_items, search_items, update_item, delete_item,
-    save_preference, get_preference_by_key, list_preferences, search_preferences
+    save_preference, get_preference_by_key, list_preferences, search_preferences,
+    get_schema_version, SCHEMA_VERSION
 )
-from memory.contacts import save_contact, update_contact, get_contact_by_id, find_contacts, get_all_contacts
+from memory.contacts import (
+    save_contact, update_contact, get_contact_by_id, find_contacts, get_all_contacts,
+    get_contacts_by_tags, get_contacts_page, iter_contacts, search_contacts_ranked,
+    get_contact_by_phone, get_contact_by_email, import_contacts,
+    update_contacts, ContactConflictError
+)
+from memory.connection import get_connection
+from memory import identifiers
 
 
 class TestMemoryEndToEnd(unittest.TestCase):
@@ -217,6 +226,198 @@ class TestContactsEndToEnd(unittest.TestCase):
         results = find_contacts('aurelie@example.com')  # Par email
         self.assertEqual(len(results), 1)
     
+    def test_contacts_by_tags(self):
+        """Test requêtes contacts par tags via contact_tags"""
+        id_family = save_contact({'first_name': 'Léa', 'category': 'family', 'aliases': ['ma soeur']})
+        save_contact({'first_name': 'Paul', 'category': 'client', 'company': 'Acme'})
+        
+        results = get_contacts_by_tags(['family'])
+        self.assertEqual([c['id'] for c in results], [id_family])
+        self.assertEqual(len(get_contacts_by_tags(['contact'])), 2)
+        self.assertEqual(len(get_contacts_by_tags(['client', 'acme'], match='all')), 1)
+        
+        update_contact(id_family, {'category': 'friend'})
+        self.assertEqual(get_contacts_by_tags(['family']), [])
+        
+        id_editor = save_contact({'first_name': 'Zoé', 'relationship': {'role': 'Éditrice'}})
+        self.assertEqual([c['id'] for c in get_contacts_by_tags(['ÉDITRICE'])], [id_editor])
+    
+    def test_contacts_pagination(self):
+        """Test pagination par curseur et parcours des contacts"""
+        ids = [save_contact({'first_name': f'Contact {i}'}) for i in range(5)]
+        
+        page1 = get_contacts_page(limit=3)
+        self.assertEqual([c['id'] for c in page1['contacts']], list(reversed(ids))[:3])
+        page2 = get_contacts_page(limit=3, cursor=page1['next_cursor'])
+        self.assertEqual([c['id'] for c in page2['contacts']], list(reversed(ids))[3:])
+        self.assertIsNone(page2['next_cursor'])
+        
+        self.assertEqual(len(list(iter_contacts(batch_size=2))), 5)
+    
+    def test_contacts_search_index(self):
+        """Test recherche indexée : mots, sous-chaînes, téléphones, fautes de frappe"""
+        id_michael = save_contact({
+            'first_name': 'Michael', 'last_name': 'Durand', 'company': 'Acme',
+            'phones': [{'number': '+33 6 12-34-56-78', 'primary': True}],
+            'emails': [{'address': 'm.durand@acme.fr', 'primary': True}]
+        })
+        id_marie = save_contact({'first_name': 'Marie', 'last_name': 'Dupont', 'aliases': ['ma soeur']})
+        
+        results = search_contacts_ranked('durand')
+        self.assertEqual([(c['id'], c['match']) for c in results], [(id_michael, 'word')])
+        self.assertEqual([c['id'] for c in find_contacts('ma soeur')], [id_marie])
+        self.assertEqual([c['id'] for c in find_contacts('acme.fr')], [id_michael])
+        
+        # Sous-chaîne au milieu d'un mot / d'un numéro (sans ponctuation)
+        self.assertEqual([c['id'] for c in find_contacts('upon')], [id_marie])
+        self.assertEqual([c['id'] for c in find_contacts('612345')], [id_michael])
+        
+        # Faute de frappe
+        results = search_contacts_ranked('Mikael')
+        self.assertEqual([(c['id'], c['match']) for c in results], [(id_michael, 'fuzzy')])
+        self.assertEqual(find_contacts('Mikael', fuzzy=False), [])
+        
+        # L'index suit les mises à jour
+        update_contact(id_marie, {'aliases': ['ma cousine']})
+        self.assertEqual(find_contacts('soeur', fuzzy=False), [])
+        self.assertEqual([c['id'] for c in find_contacts('cousine')], [id_marie])
+    
+    def test_contact_lookup_by_phone_and_email(self):
+        """Test résolution par téléphone (E.164) et email (casse ignorée)"""
+        contact_id = save_contact({
+            'first_name': 'Paul', 'last_name': 'Martin',
+            'phones': [{'number': '06 12 34 56 78', 'label': 'mobile', 'primary': True}],
+            'emails': [{'address': 'Paul.Martin@Example.com', 'primary': True}],
+            'whatsapp_number': '+972 52 123 4567'
+        })
+        
+        for number in ('0612345678', '+33 (0)6 12 34 56 78', '0033612345678', '+33612345678'):
+            self.assertEqual(get_contact_by_phone(number)['id'], contact_id)
+        self.assertEqual(get_contact_by_phone('+972521234567')['id'], contact_id)
+        self.assertEqual(get_contact_by_email(' paul.martin@example.COM ')['id'], contact_id)
+        self.assertIsNone(get_contact_by_phone('0699999999'))
+        self.assertIsNone(get_contact_by_email('pas-un-email'))
+        
+        # Les tables suivent update_contact
+        update_contact(contact_id, {'emails': [{'address': 'paul@nouveau.fr'}]})
+        self.assertIsNone(get_contact_by_email('paul.martin@example.com'))
+        self.assertEqual(get_contact_by_email('PAUL@nouveau.fr')['id'], contact_id)
+        self.assertEqual(get_contact_by_phone('0612345678')['id'], contact_id)
+    
+    def test_default_country_code(self):
+        """L'indicatif configuré s'applique aux numéros nationaux ; le changer renormalise les tables"""
+        self.addCleanup(identifiers.configure, None)
+        contact_id = save_contact({'first_name': 'Noa', 'phones': [{'number': '054-123-4567'}]})
+        self.assertIsNone(get_contact_by_phone('+972 54 123 4567'))
+        
+        identifiers.configure("+972")
+        init_db(db_path=self.db_path)
+        self.assertEqual(get_contact_by_phone('+972 54 123 4567')['id'], contact_id)
+        self.assertEqual(get_contact_by_phone('054 123 4567')['id'], contact_id)
+        
+        with self.assertRaises(ValueError):
+            identifiers.configure("FR")
+    
+    def test_contact_identifiers_backfill(self):
+        """La migration Python remplit contact_phones / contact_emails (E.164, minuscules)"""
+        conn = get_connection(self.db_path)
+        conn.executescript("""
+            DROP TRIGGER contacts_identifiers_ad;
+            DROP TABLE contact_phones;
+            DROP TABLE contact_emails;
+            PRAGMA user_version = 4;
+        """)
+        conn.execute(
+            "INSERT INTO contacts (first_name, phones, emails) VALUES (?, ?, ?)",
+            ("Léa", '[{"number": "06 11 22 33 44"}]', '["Lea@Example.fr"]')
+        )
+        conn.commit()
+    
+        init_db(db_path=self.db_path)
+        self.assertEqual(get_schema_version(self.db_path), SCHEMA_VERSION)
+        self.assertEqual(conn.execute("SELECT phone FROM contact_phones").fetchall()[0][0], "+33611223344")
+        self.assertEqual(conn.execute("SELECT email FROM contact_emails").fetchall()[0][0], "lea@example.fr")
+    
+    def test_import_contacts_formats(self):
+        """Test import vCard / CSV / JSONL par lots"""
+        vcard = io.StringIO(
+            "BEGIN:VCARD\r\nVERSION:3.0\r\nN:Martin;Paul;;;\r\nFN:Paul Martin\r\n"
+            "NICKNAME:Polo\r\nORG:Cabinet\\, comptable;Paris\r\n"
+            "TEL;TYPE=CELL,PREF:06 12 34 56 78\r\nEMAIL;TYPE=WORK:paul@cabinet.fr\r\n"
+            "NOTE:Ligne 1\\nsuite re\r\n pliée\r\nEND:VCARD\r\n"
+            "BEGIN:VCARD\r\nVERSION:2.1\r\nFN:Léa Petit\r\nTEL;HOME:01 40 00 00 00\r\nEND:VCARD\r\n"
+        )
+        report = import_contacts(vcard, format="vcard")
+        self.assertEqual((report["parsed"], report["imported"], report["skipped"]), (2, 2, 0))
+        paul = get_contact_by_phone("+33612345678")
+        self.assertEqual((paul["first_name"], paul["last_name"], paul["company"]), ("Paul", "Martin", "Cabinet, comptable"))
+        self.assertEqual(paul["aliases"], ["Polo"])
+        self.assertEqual(paul["phones"][0]["label"], "mobile")
+        self.assertEqual(paul["notes"], ["Ligne 1\nsuite repliée"])
+        self.assertEqual(get_contact_by_phone("0140000000")["display_name"], "Léa Petit")
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, "export.csv")
+            with open(csv_path, "w", encoding="utf-8-sig") as f:
+                f.write("Prénom,Nom,Société,Mobile Phone,E-mail 1 - Type,E-mail 1 - Value\n")
+                f.write("Marie,Dupont,Acme,07 00 00 00 01,Work,marie@acme.fr ::: m.dupont@perso.fr\n")
+            report = import_contacts(csv_path)
+        self.assertEqual(report["imported"], 1)
+        marie = get_contact_by_email("M.Dupont@perso.fr")
+        self.assertEqual((marie["display_name"], marie["company"]), ("Marie Dupont", "Acme"))
+        self.assertEqual(get_contact_by_phone("0700000001")["id"], marie["id"])
+        
+        jsonl = ['{"first_name": "Jean", "category": "friend"}\n', '\n', '{"first_name": "Zoé"}\n']
+        progress = []
+        report = import_contacts(jsonl, format="jsonl", batch_size=1, progress=progress.append)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual([p["imported"] for p in progress], [1, 2])
+        self.assertEqual(len(get_all_contacts()), 5)
+    
+    def test_import_contacts_dry_run_and_errors(self):
+        """Test dry-run (aucune écriture) et enregistrements invalides signalés"""
+        jsonl = ['{"first_name": "Jean"}', '{pas du json', '[1, 2]', '{"category": "work"}']
+        report = import_contacts(jsonl, format="jsonl", dry_run=True)
+        self.assertEqual((report["parsed"], report["imported"], report["skipped"]), (4, 1, 3))
+        self.assertEqual([e["position"] for e in report["errors"]], [2, 3, 4])
+        self.assertTrue(report["dry_run"])
+        self.assertEqual(get_all_contacts(), [])
+        
+        with self.assertRaises(ValueError):
+            import_contacts(jsonl)  # format non déductible d'un flux
+        with self.assertRaises(ValueError):
+            import_contacts("carnet.txt")
+    
+    def test_update_contact_versions(self):
+        """Test verrouillage optimiste et mise à jour en lot"""
+        paul = save_contact({'first_name': 'Paul', 'phones': [{'number': '0612345678'}]})
+        marie = save_contact({'first_name': 'Marie'})
+        self.assertEqual(get_contact_by_id(paul)['version'], 1)
+        
+        self.assertEqual(update_contact(paul, {'company': 'Acme'}, expected_version=1), 2)
+        with self.assertRaises(ContactConflictError):
+            update_contact(paul, {'company': 'Autre'}, expected_version=1)
+        self.assertEqual(get_contact_by_id(paul)['company'], 'Acme')
+        
+        # Un conflit annule tout le lot
+        with self.assertRaises(ContactConflictError):
+            update_contacts([
+                {'id': marie, 'role': 'Comptable'},
+                {'id': paul, 'expected_version': 1, 'role': 'Directeur'},
+            ])
+        self.assertIsNone(get_contact_by_id(marie)['role'])
+        
+        count = update_contacts([
+            {'id': marie, 'role': 'Comptable'},
+            {'id': paul, 'expected_version': 2, 'phones': [{'number': '0700000000'}]},
+            {'id': 9999, 'role': 'Fantôme'},
+        ])
+        self.assertEqual(count, 2)
+        self.assertEqual(get_contact_by_id(marie)['role'], 'Comptable')
+        self.assertEqual(get_contact_by_phone('0700000000')['id'], paul)
+        self.assertIsNone(get_contact_by_phone('0612345678'))
+        self.assertEqual(get_contact_by_id(paul)['version'], 3)
+    
     def test_contact_minimal(self):
         """Test création contact minimal"""
         contact = {
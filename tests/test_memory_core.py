@@ -5,6 +5,7 @@ Tests unitaires pour l'API mémoire
 
 import unittest
 import tempfile
+import sqlite3
 import os
 from pathlib import Path
 import sys
@@ -14,8 +15,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from memory.memory_core import (
     init_db, save_item, get_items, search_items, delete_item, update_item,
-    save_preference, get_preference_by_key, list_preferences, search_preferences
+    save_preference, get_preference_by_key, list_preferences, search_preferences,
+    search_items_ranked, save_items, update_items, delete_items, get_items_by_tags,
+    get_items_page, iter_items, get_preference_cache_stats, reset_memory,
+    get_schema_version, SCHEMA_VERSION, _apply_migration, _table_exists
 )
+from memory.connection import get_connection
 
 
 class TestMemoryCore(unittest.TestCase):
@@ -93,6 +98,101 @@ CREATE TABLE IF NOT EXISTS preferences (
         results = search_items(query="Python", type="note", db_path=self.db_path)
         self.assertEqual(len(results), 2)
     
+    def test_preference_cache(self):
+        """Test cache des préférences (hits et invalidation à l'écriture)"""
+        pref = {'scope': 'global', 'domain': 'ui', 'key': 'theme', 'value': 'dark'}
+        save_preference(pref, db_path=self.db_path)
+        
+        before = get_preference_cache_stats()
+        self.assertEqual(get_preference_by_key('theme', db_path=self.db_path)['value'], 'dark')
+        self.assertEqual(get_preference_by_key('theme', db_path=self.db_path)['value'], 'dark')
+        after = get_preference_cache_stats()
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        
+        # Modifier la valeur retournée ne corrompt pas le cache
+        get_preference_by_key('theme', db_path=self.db_path)['value'] = 'corrompu'
+        self.assertEqual(get_preference_by_key('theme', db_path=self.db_path)['value'], 'dark')
+        
+        # save_preference invalide le cache
+        pref['value'] = 'light'
+        save_preference(pref, db_path=self.db_path)
+        self.assertEqual(get_preference_by_key('theme', db_path=self.db_path)['value'], 'light')
+        self.assertEqual(len(list_preferences(db_path=self.db_path)), 1)
+        
+        # reset_memory aussi
+        conn = get_connection(self.db_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS contacts (id INTEGER PRIMARY KEY)")
+        reset_memory(db_path=self.db_path)
+        self.assertIsNone(get_preference_by_key('theme', db_path=self.db_path))
+        self.assertEqual(list_preferences(db_path=self.db_path), [])
+    
+    def test_search_items_ranked(self):
+        """Test recherche plein texte classée avec extraits"""
+        save_item(type="note", content="Réunion Clara lundi", db_path=self.db_path)
+        save_item(type="note", content="Clara, Clara et encore Clara", db_path=self.db_path)
+        save_item(type="note", content="Courses du samedi", db_path=self.db_path)
+        
+        results = search_items_ranked("clara", db_path=self.db_path)
+        self.assertEqual(len(results), 2)
+        # Le plus pertinent en premier
+        self.assertEqual(results[0]['content'], "Clara, Clara et encore Clara")
+        self.assertGreaterEqual(results[0]['score'], results[1]['score'])
+        self.assertIn("[Clara]", results[0]['snippet'])
+        
+        # Préfixe et accents ignorés
+        self.assertEqual(len(search_items("reunion", db_path=self.db_path)), 1)
+        self.assertEqual(len(search_items("cour", db_path=self.db_path)), 1)
+    
+    def test_search_index_follows_updates(self):
+        """Test synchronisation de l'index avec update/delete"""
+        item_id = save_item(type="note", content="Ancien texte", db_path=self.db_path)
+        update_item(item_id=item_id, content="Nouveau texte", db_path=self.db_path)
+        self.assertEqual(search_items("ancien", db_path=self.db_path), [])
+        self.assertEqual(len(search_items("nouveau", db_path=self.db_path)), 1)
+        
+        delete_item(item_id=item_id, db_path=self.db_path)
+        self.assertEqual(search_items("nouveau", db_path=self.db_path), [])
+    
+    def test_search_index_backfill(self):
+        """Test backfill de l'index pour les lignes existantes (migration en attente)"""
+        save_item(type="note", content="Note existante", db_path=self.db_path)
+        conn = get_connection(self.db_path)
+        conn.executescript("""
+            DROP TRIGGER memory_fts_ai;
+            DROP TRIGGER memory_fts_ad;
+            DROP TRIGGER memory_fts_au;
+            DROP TABLE memory_fts;
+            PRAGMA user_version = 1;
+        """)
+        
+        init_db(db_path=self.db_path)
+        self.assertEqual(get_schema_version(self.db_path), SCHEMA_VERSION)
+        self.assertEqual(len(search_items("existante", db_path=self.db_path)), 1)
+    
+    def test_schema_version_current(self):
+        """Une base à jour ne rejoue aucune migration"""
+        self.assertEqual(get_schema_version(self.db_path), SCHEMA_VERSION)
+        conn = get_connection(self.db_path)
+        conn.execute("DROP TRIGGER memory_tags_ad")
+        conn.commit()
+        
+        init_db(db_path=self.db_path)
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='memory_tags_ad'"
+        ).fetchone()
+        self.assertIsNone(row)
+    
+    def test_failed_migration_rolled_back(self):
+        """Une migration en échec n'est pas appliquée et la version ne bouge pas"""
+        conn = get_connection(self.db_path)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+        with self.assertRaises(sqlite3.Error):
+            _apply_migration(conn, SCHEMA_VERSION, "test",
+                             "CREATE TABLE tmp_migration (x); SELECT * FROM table_absente;")
+        self.assertEqual(get_schema_version(self.db_path), SCHEMA_VERSION - 1)
+        self.assertFalse(_table_exists(conn, 'tmp_migration'))
+    
     def test_delete_item(self):
         """Test suppression d'item"""
         # Sauvegarder
@@ -109,6 +209,103 @@ CREATE TABLE IF NOT EXISTS preferences (
         items = get_items(db_path=self.db_path)
         self.assertEqual(len(items), 0)
     
+    def test_batch_save_update_delete(self):
+        """Test API batch (save_items / update_items / delete_items)"""
+        ids = save_items([
+            {'type': 'note', 'content': 'Note A', 'tags': ['a']},
+            {'type': 'note', 'content': 'Note B', 'tags': ['b', 'commun']},
+            {'type': 'todo', 'content': 'Todo C', 'tags': ['commun']},
+        ], db_path=self.db_path)
+        self.assertEqual(len(ids), 3)
+        
+        count = update_items([
+            {'id': ids[0], 'content': 'Note A modifiée'},
+            {'id': ids[1], 'tags': ['b']},
+        ], db_path=self.db_path)
+        self.assertEqual(count, 2)
+        items = {item['id']: item for item in get_items(db_path=self.db_path)}
+        self.assertEqual(items[ids[0]]['content'], 'Note A modifiée')
+        self.assertEqual(items[ids[0]]['tags'], ['a'])
+        self.assertEqual(items[ids[1]]['tags'], ['b'])
+        
+        self.assertEqual(delete_items(tag='commun', db_path=self.db_path), 1)
+        self.assertEqual(delete_items(type='note', db_path=self.db_path), 2)
+        self.assertEqual(get_items(db_path=self.db_path), [])
+        
+        with self.assertRaises(ValueError):
+            delete_items(db_path=self.db_path)
+    
+    def test_get_items_by_tags(self):
+        """Test requêtes par tags (any / all) via item_tags"""
+        id_a = save_item(type="note", content="A", tags=["Projet", "urgent"], db_path=self.db_path)
+        id_b = save_item(type="note", content="B", tags=["projet"], db_path=self.db_path)
+        save_item(type="todo", content="C", tags=["perso"], db_path=self.db_path)
+        
+        any_ids = {i['id'] for i in get_items_by_tags(["projet", "perso"], db_path=self.db_path)}
+        self.assertEqual(len(any_ids), 3)
+        
+        all_items = get_items_by_tags(["projet", "URGENT"], match="all", db_path=self.db_path)
+        self.assertEqual([i['id'] for i in all_items], [id_a])
+        
+        # Synchronisation avec update / delete
+        update_item(item_id=id_b, tags=["archive"], db_path=self.db_path)
+        self.assertEqual(len(get_items_by_tags(["projet"], db_path=self.db_path)), 1)
+        delete_item(item_id=id_a, db_path=self.db_path)
+        self.assertEqual(get_items_by_tags(["projet"], db_path=self.db_path), [])
+        self.assertEqual(len(get_items_by_tags(["archive"], type="note", db_path=self.db_path)), 1)
+    
+    def test_accented_tags(self):
+        """Les tags non ASCII sont normalisés comme les requêtes (ex: É -> é)"""
+        item_id = save_item(type="note", content="Vacances", tags=["Été"], db_path=self.db_path)
+        self.assertEqual([i['id'] for i in get_items_by_tags(["Été"], db_path=self.db_path)], [item_id])
+        self.assertEqual([i['id'] for i in get_items_by_tags(["été"], db_path=self.db_path)], [item_id])
+        
+        update_items([{'id': item_id, 'tags': ["Éclair"]}], db_path=self.db_path)
+        self.assertEqual(get_items_by_tags(["été"], db_path=self.db_path), [])
+        self.assertEqual(delete_items(tag="ÉCLAIR", db_path=self.db_path), 1)
+    
+    def test_tag_normalization_backfill(self):
+        """La migration recalcule les tags indexés par l'ancien trigger (lower() ASCII)"""
+        item_id = save_item(type="note", content="Vacances", tags=["Été"], db_path=self.db_path)
+        conn = get_connection(self.db_path)
+        conn.execute("UPDATE item_tags SET tag = 'Été' WHERE item_id = ?", (item_id,))
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+        conn.commit()
+        
+        init_db(db_path=self.db_path)
+        self.assertEqual(get_schema_version(self.db_path), SCHEMA_VERSION)
+        self.assertEqual([i['id'] for i in get_items_by_tags(["ÉTÉ"], db_path=self.db_path)], [item_id])
+    
+    def test_get_items_page(self):
+        """Test pagination par curseur (created_at, id)"""
+        ids = save_items(
+            [{'type': 'todo', 'content': f'Todo {i}'} for i in range(5)],
+            db_path=self.db_path
+        )
+        save_item(type="note", content="Hors filtre", db_path=self.db_path)
+        
+        seen = []
+        cursor = None
+        while True:
+            page = get_items_page(type='todo', limit=2, cursor=cursor, db_path=self.db_path)
+            seen.extend(item['id'] for item in page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        # Plus récent en premier, sans doublon ni oubli
+        self.assertEqual(seen, list(reversed(ids)))
+        
+        with self.assertRaises(ValueError):
+            get_items_page(cursor="invalide", db_path=self.db_path)
+    
+    def test_iter_items(self):
+        """Test parcours paresseux par lots"""
+        save_items([{'type': 'note', 'content': f'Note {i}'} for i in range(7)], db_path=self.db_path)
+        iterator = iter_items(type='note', batch_size=3, db_path=self.db_path)
+        first = next(iterator)
+        self.assertEqual(first['content'], 'Note 6')
+        self.assertEqual(len(list(iterator)), 6)
+    
     def test_update_item(self):
         """Test mise à jour d'item"""
         # Sauvegarder
@@ -0,0 +1,106 @@
+# Tests pour la déduplication des contacts
+"""
+Tests unitaires pour memory/dedup.py (blocage, score, fusion batch et incrémentale)
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import memory.contacts
+from memory.memory_core import init_db
+from memory.contacts import save_contact, get_contact_by_id, get_contact_by_phone, get_contact_by_email, find_contacts
+from memory.connection import close_connections
+from memory.dedup import find_duplicates, deduplicate_contacts, merge_into_existing, merge_contacts
+
+
+class TestContactDedup(unittest.TestCase):
+    """Tests du moteur de déduplication"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "memory.sqlite")
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+        self.original_contacts_db = memory.contacts.DB_PATH
+        memory.contacts.DB_PATH = self.db_path
+
+    def tearDown(self):
+        memory.contacts.DB_PATH = self.original_contacts_db
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+
+    def test_batch_deduplication(self):
+        """Les doublons (téléphone, email, nom) sont regroupés et fusionnés dans le plus ancien"""
+        paul = save_contact({
+            'first_name': 'Paul', 'last_name': 'Martin', 'company': 'Cabinet',
+            'phones': [{'number': '06 12 34 56 78', 'primary': True}], 'emails': ['paul@cabinet.fr'],
+        })
+        paul_bis = save_contact({
+            'display_name': 'Polo', 'phones': [{'number': '+33612345678'}],
+            'emails': [{'address': 'paul@cabinet.fr', 'primary': True}], 'notes': ['Aime le vélo'],
+        })
+        paul_ter = save_contact({'first_name': 'paul', 'last_name': 'MARTIN', 'emails': ['Paul@Cabinet.fr'], 'role': 'Comptable'})
+        homonyme = save_contact({'first_name': 'Paul', 'last_name': 'Martin', 'phones': [{'number': '0700000000'}],
+                                 'emails': [{'address': 'autre@ailleurs.fr'}]})
+        marie = save_contact({'first_name': 'Marie', 'last_name': 'Dupont'})
+
+        report = deduplicate_contacts(dry_run=True)
+        self.assertEqual(report['groups'], [{'keep': paul, 'merged': [paul_bis, paul_ter]}])
+        self.assertIsNotNone(get_contact_by_id(paul_bis))
+
+        report = deduplicate_contacts()
+        self.assertEqual(report['merged'], 2)
+        self.assertIsNone(get_contact_by_id(paul_bis))
+        self.assertIsNone(get_contact_by_id(paul_ter))
+        self.assertIsNotNone(get_contact_by_id(homonyme))
+        self.assertIsNotNone(get_contact_by_id(marie))
+
+        merged = get_contact_by_id(paul)
+        self.assertEqual(merged['display_name'], 'Paul Martin')
+        self.assertEqual((merged['company'], merged['role']), ('Cabinet', 'Comptable'))
+        self.assertEqual(merged['aliases'], ['Polo'])
+        self.assertEqual(len(merged['phones']), 1)
+        self.assertEqual(len(merged['emails']), 1)
+        self.assertEqual(merged['notes'], ['Aime le vélo'])
+        self.assertEqual(get_contact_by_email('paul@cabinet.fr')['id'], paul)
+        self.assertEqual([c['id'] for c in find_contacts('Polo')], [paul])
+
+    def test_incremental_merge(self):
+        """Un contact créé en double (identifiant partagé) est fusionné à l'insertion"""
+        paul = save_contact({'first_name': 'Paul', 'last_name': 'Martin', 'emails': [{'address': 'paul@cabinet.fr'}]})
+        duplicate = save_contact({
+            'first_name': 'Paul', 'last_name': 'Martin',
+            'emails': [{'address': 'Paul@Cabinet.fr'}], 'phones': [{'number': '0612345678'}]
+        })
+        other = save_contact({'first_name': 'Marie', 'last_name': 'Dupont'})
+
+        self.assertEqual(find_duplicates(duplicate)[0]['ids'], (paul, duplicate))
+        self.assertEqual(merge_into_existing(duplicate), paul)
+        self.assertEqual(merge_into_existing(other), other)
+        self.assertEqual(get_contact_by_phone('0612345678')['id'], paul)
+
+    def test_incremental_merge_requires_identifier(self):
+        """Deux homonymes sans téléphone ni email ne sont pas fusionnés à l'insertion"""
+        david = save_contact({'first_name': 'David'})
+        other_david = save_contact({'first_name': 'David'})
+
+        self.assertEqual(find_duplicates(other_david)[0]['ids'], (david, other_david))
+        self.assertEqual(merge_into_existing(other_david), other_david)
+        self.assertIsNotNone(get_contact_by_id(david))
+
+    def test_merge_self_refused(self):
+        """Un contact ne peut pas être fusionné avec lui-même"""
+        paul = save_contact({'first_name': 'Paul'})
+        with self.assertRaises(ValueError):
+            merge_contacts(paul, [paul])
+
+
+if __name__ == '__main__':
+    unittest.main()
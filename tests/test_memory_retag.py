@@ -0,0 +1,102 @@
+# Tests pour le job de re-tagging
+"""
+Tests unitaires pour memory/retag.py (tranches, pool de processus, reprise)
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.memory_core import init_db, save_items, get_items
+from memory.connection import close_connections
+from memory.retag import retag_items, get_checkpoint, checkpoint_key
+
+
+class TestRetag(unittest.TestCase):
+    """Tests de retag_items"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "memory.sqlite")
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+        save_items(
+            [{"type": "note", "content": f"Projet jardin numéro {i}", "tags": ["ancien"]} for i in range(10)]
+            + [{"type": "todo", "content": "Appeler le plombier", "tags": ["ancien"]}, {"type": "todo", "content": "ok"}],
+            db_path=self.db_path
+        )
+
+    def tearDown(self):
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+
+    def tags_by_content(self):
+        return {item["content"]: item["tags"] for item in get_items(db_path=self.db_path)}
+
+    def test_retag_in_process(self):
+        """Les tags sont recalculés par tranches, updated_at n'est pas modifié"""
+        before = {item["id"]: item["updated_at"] for item in get_items(db_path=self.db_path)}
+        report = retag_items(chunk_size=5, workers=1, db_path=self.db_path)
+        self.assertEqual((report["processed"], report["updated"]), (12, 12))
+
+        tags = self.tags_by_content()
+        self.assertEqual(tags["Appeler le plombier"][:2], ["appeler", "plombier"])
+        self.assertEqual(tags["ok"], ["todo"])
+        self.assertNotIn("ancien", tags["Projet jardin numéro 3"])
+        self.assertEqual({item["id"]: item["updated_at"] for item in get_items(db_path=self.db_path)}, before)
+
+        # Deuxième passe : rien ne change
+        self.assertEqual(retag_items(workers=1, db_path=self.db_path)["updated"], 0)
+
+    def test_dry_run_and_type_filter(self):
+        """dry_run n'écrit rien ; le filtre de type restreint les items"""
+        report = retag_items(type="todo", workers=1, dry_run=True, db_path=self.db_path)
+        self.assertEqual(report["processed"], 2)
+        self.assertEqual(self.tags_by_content()["Appeler le plombier"], ["ancien"])
+
+    def test_resume_after_interruption(self):
+        """Un job interrompu reprend après la dernière tranche écrite"""
+        def interrupt(report):
+            if report["processed"] >= 5:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            retag_items(chunk_size=5, workers=1, progress=interrupt, db_path=self.db_path)
+        checkpoint = get_checkpoint(checkpoint_key("retag"), db_path=self.db_path)
+        self.assertGreater(checkpoint, 0)
+
+        report = retag_items(chunk_size=5, workers=1, db_path=self.db_path)
+        self.assertEqual(report["processed"], 7)
+        self.assertEqual(get_checkpoint(checkpoint_key("retag"), db_path=self.db_path), 0)
+        self.assertTrue(all("ancien" not in tags for tags in self.tags_by_content().values()))
+
+    def test_checkpoint_per_type_filter(self):
+        """Un run filtré ne reprend pas le curseur d'un run interrompu sur un autre filtre"""
+        def interrupt(report):
+            if report["processed"] >= 5:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            retag_items(chunk_size=5, workers=1, progress=interrupt, db_path=self.db_path)
+
+        report = retag_items(type="note", chunk_size=5, workers=1, db_path=self.db_path)
+        self.assertEqual(report["processed"], 10)
+        # Le point de reprise du run complet est intact
+        self.assertEqual(get_checkpoint(checkpoint_key("retag"), db_path=self.db_path), 5)
+        self.assertEqual(get_checkpoint(checkpoint_key("retag", "note"), db_path=self.db_path), 0)
+
+    def test_process_pool(self):
+        """L'extraction dans un pool de processus donne les mêmes tags"""
+        report = retag_items(chunk_size=3, workers=2, db_path=self.db_path)
+        self.assertEqual(report["processed"], 12)
+        self.assertEqual(self.tags_by_content()["ok"], ["todo"])
+
+
+if __name__ == '__main__':
+    unittest.main()
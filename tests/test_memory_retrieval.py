@@ -0,0 +1,92 @@
+# Tests pour la récupération de contexte
+"""
+Tests unitaires pour memory/retrieval.py (fusion BM25 + vecteurs, budget de tokens)
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import memory.contacts
+from memory.memory_core import init_db, save_item, save_preference
+from memory.contacts import save_contact
+from memory.connection import close_connections
+from memory.retrieval import retrieve_context, bm25_scores
+from agents.orchestrator import Orchestrator
+
+
+class TestRetrieval(unittest.TestCase):
+    """Tests de retrieve_context"""
+
+    def setUp(self):
+        """Base temporaire avec le schéma réel (items, préférences, contacts)"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "memory.sqlite")
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+        self.original_contacts_db = memory.contacts.DB_PATH
+        memory.contacts.DB_PATH = self.db_path
+
+        # Le plus récent n'est pas le plus pertinent
+        save_item(type="note", content="Réunion budget 2025 avec le comptable", db_path=self.db_path)
+        save_item(type="todo", content="Envoyer le budget au comptable", db_path=self.db_path)
+        for i in range(10):
+            save_item(type="note", content=f"Idée de recette numéro {i}", db_path=self.db_path)
+        save_preference({"key": "format_budget", "value": "tableaux en euros"}, db_path=self.db_path)
+        save_contact({"first_name": "Paul", "last_name": "Martin", "company": "Cabinet comptable",
+                      "emails": [{"address": "paul@compta.fr", "primary": True}]})
+
+    def tearDown(self):
+        memory.contacts.DB_PATH = self.original_contacts_db
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+
+    def test_relevant_before_recent(self):
+        """Les éléments pertinents passent avant les plus récents"""
+        result = retrieve_context("budget comptable", db_path=self.db_path)
+        sources = {(entry["source"], entry["line"].split("]")[0]) for entry in result["entries"]}
+        self.assertIn("Réunion budget", result["context"])
+        self.assertIn("Envoyer le budget", result["context"])
+        self.assertIn("format_budget", result["context"])
+        self.assertIn("Paul Martin", result["context"])
+        self.assertNotIn("recette", result["context"])
+        self.assertIn(("contacts", "- [contact #1"), sources)
+
+    def test_types_filter(self):
+        """Le filtre de types restreint les items"""
+        result = retrieve_context("budget", types=["todo"], sources=("items",), db_path=self.db_path)
+        self.assertEqual([entry["line"][:8] for entry in result["entries"]], ["- [todo "])
+
+    def test_top_k_and_token_budget(self):
+        """Le bloc respecte top_k et le budget de tokens"""
+        result = retrieve_context("recette", top_k=3, db_path=self.db_path)
+        self.assertEqual(len(result["entries"]), 3)
+
+        result = retrieve_context("recette", token_budget=20, db_path=self.db_path)
+        self.assertLessEqual(result["tokens"], 20)
+        self.assertGreaterEqual(len(result["entries"]), 1)
+
+    def test_empty_query(self):
+        """Une requête sans terme ne retourne rien"""
+        self.assertEqual(retrieve_context("le la les", db_path=self.db_path)["context"], "")
+
+    def test_bm25_scores(self):
+        """BM25 favorise les documents contenant les termes rares"""
+        scores = bm25_scores(["budget"], [["budget", "comptable"], ["recette"], ["recette", "budget", "idee", "soir"]])
+        self.assertGreater(scores[0], scores[2])
+        self.assertEqual(scores[1], 0.0)
+
+    def test_orchestrator_retrieval_query(self):
+        """L'orchestrateur retire les mots d'intention de la requête"""
+        orchestrator = Orchestrator.__new__(Orchestrator)
+        self.assertEqual(orchestrator._retrieval_query("cherche mes notes sur le budget"), "budget")
+
+
+if __name__ == '__main__':
+    unittest.main()
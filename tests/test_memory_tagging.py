@@ -0,0 +1,91 @@
+# Tests pour l'auto-tagging
+"""
+Tests unitaires pour memory/tagging.py (racinisation, TF-IDF, statistiques incrémentales)
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+from unittest import mock
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.memory_core import init_db, save_item, save_items, update_item, delete_item, get_schema_version, SCHEMA_VERSION
+from memory.connection import get_connection, close_connections
+from memory.tagging import stem, extract_terms, generate_tags, generate_tags_batch, load_term_stats
+
+
+class TestTagging(unittest.TestCase):
+    """Tests du moteur de tags TF-IDF"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "memory.sqlite")
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+        self.conn = get_connection(self.db_path)
+
+    def tearDown(self):
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+
+    def test_stemming(self):
+        """Pluriels, féminins et flexions anglaises partagent un radical"""
+        self.assertEqual(stem("réunions"), stem("Réunion"))
+        self.assertEqual(stem("chevaux"), stem("cheval"))
+        self.assertEqual(stem("grande"), stem("grand"))
+        self.assertEqual(stem("meetings"), stem("meeting"))
+        self.assertEqual(stem("virus"), "virus")
+        self.assertEqual(extract_terms("Les réunions, la réunion"), {stem("réunion"): (2, "réunion")})
+
+    def test_rare_terms_preferred(self):
+        """Un terme présent dans toute la mémoire passe derrière un terme rare"""
+        self.assertEqual(generate_tags("projet projet budget", max_tags=1, conn=self.conn), ["projet"])
+
+        save_items([{"type": "note", "content": f"Projet numéro {i}"} for i in range(20)], db_path=self.db_path)
+        self.assertEqual(generate_tags("projet projet budget", max_tags=1, conn=self.conn), ["budget"])
+        self.assertEqual(
+            generate_tags_batch(["projet budget", "", "projets jardin"], max_tags=1, conn=self.conn),
+            [["budget"], [], ["jardin"]]
+        )
+
+    def test_plain_frequency_without_connection(self):
+        """Sans connexion : classement par fréquence, sans ouvrir de base"""
+        with mock.patch("memory.connection.get_connection", side_effect=AssertionError("connexion ouverte")):
+            self.assertEqual(generate_tags("budget projet projets", max_tags=1), ["projet"])
+
+    def test_incremental_statistics(self):
+        """Les fréquences suivent créations, modifications et suppressions"""
+        first = save_item(type="note", content="Réunion budget", db_path=self.db_path)
+        save_item(type="note", content="Réunions du lundi", db_path=self.db_path)
+        df, documents = load_term_stats([stem("réunion"), stem("budget")], self.conn)
+        self.assertEqual((documents, df[stem("réunion")], df[stem("budget")]), (2, 2, 1))
+
+        update_item(first, content="Budget vacances", db_path=self.db_path)
+        delete_item(first + 1, db_path=self.db_path)
+        df, documents = load_term_stats([stem("réunion"), stem("vacances")], self.conn)
+        self.assertEqual((documents, df.get(stem("réunion")), df[stem("vacances")]), (1, None, 1))
+
+    def test_migration_backfill(self):
+        """La migration indexe les items déjà présents"""
+        save_item(type="note", content="Jardin potager", db_path=self.db_path)
+        conn = get_connection(self.db_path)
+        conn.executescript("""
+            DROP TRIGGER memory_terms_ad;
+            DROP TABLE item_terms;
+            DROP TABLE term_stats;
+            PRAGMA user_version = 6;
+        """)
+
+        init_db(db_path=self.db_path)
+        self.assertEqual(get_schema_version(self.db_path), SCHEMA_VERSION)
+        df, documents = load_term_stats([stem("jardin")], self.conn)
+        self.assertEqual((documents, df[stem("jardin")]), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+# Tests pour la mémoire vectorielle
+"""
+Tests unitaires pour memory/vector (embedders, index, recherche sémantique)
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+from unittest import mock
+from pathlib import Path
+import sys
+
+import numpy as np
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.memory_core import init_db, save_item, update_item, delete_item, reset_memory
+from memory.connection import close_connections
+from memory.vector.embedders import HashingEmbedder, get_embedder
+from memory.vector.index import VectorIndex
+from memory.vector import semantic
+from memory.vector.semantic import search_semantic, sync_vector_index, save_vector_indexes
+
+
+class TestHashingEmbedder(unittest.TestCase):
+    """Tests de l'embedder hors ligne"""
+
+    def test_normalized_and_deterministic(self):
+        """Vecteurs normalisés et identiques d'un appel à l'autre"""
+        embedder = HashingEmbedder(dim=128)
+        first = embedder.embed(["Réunion budget jeudi", ""])
+        second = embedder.embed(["Réunion budget jeudi"])
+        self.assertEqual(first.shape, (2, 128))
+        self.assertAlmostEqual(float(np.linalg.norm(first[0])), 1.0, places=5)
+        self.assertEqual(float(np.linalg.norm(first[1])), 0.0)
+        np.testing.assert_array_equal(first[0], second[0])
+
+    def test_accents_and_plurals(self):
+        """Accents et pluriels restent proches"""
+        embedder = HashingEmbedder()
+        a, b, c = embedder.embed(["réunions", "reunion", "jardinage"])
+        self.assertGreater(float(a @ b), float(a @ c))
+
+    def test_unknown_embedder(self):
+        """Un nom d'embedder inconnu est refusé"""
+        with self.assertRaises(ValueError):
+            get_embedder("inexistant")
+
+
+class TestVectorIndex(unittest.TestCase):
+    """Tests de l'index vectoriel persistant"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(42)
+        vectors = rng.normal(size=(3000, 32)).astype(np.float32)
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_exact_search_and_persistence(self):
+        """Recherche exacte, suppression et réouverture depuis le disque"""
+        index = VectorIndex(self.temp_dir, dim=32, signature="test")
+        index.upsert(range(1, 2001), self.vectors[:2000])
+        self.assertEqual(index.search(self.vectors[10], k=1)[0][0], 11)
+
+        index.remove([11])
+        self.assertNotEqual(index.search(self.vectors[10], k=1)[0][0], 11)
+        index.save()
+
+        reopened = VectorIndex(self.temp_dir, dim=32, signature="test")
+        self.assertEqual(len(reopened), 1999)
+        self.assertEqual(reopened.search(self.vectors[20], k=1)[0][0], 21)
+
+    def test_signature_change_resets(self):
+        """Un index construit avec un autre embedder est vidé"""
+        index = VectorIndex(self.temp_dir, dim=32, signature="a")
+        index.upsert([1], self.vectors[:1])
+        index.save()
+        self.assertEqual(len(VectorIndex(self.temp_dir, dim=32, signature="b")), 0)
+
+    def test_ivf_search(self):
+        """L'index IVF retrouve les plus proches voisins exacts"""
+        index = VectorIndex(self.temp_dir, dim=32, signature="test", ivf_min_rows=1000, nprobe=16)
+        index.upsert(range(len(self.vectors)), self.vectors)
+        self.assertIsNotNone(index._centroids)
+
+        for row in (0, 500, 2999):
+            self.assertEqual(index.search(self.vectors[row], k=1)[0][0], row)
+
+    def test_allowed_ids_filter(self):
+        """La recherche peut être restreinte à un sous-ensemble d'ids"""
+        index = VectorIndex(self.temp_dir, dim=32, signature="test")
+        index.upsert(range(100), self.vectors[:100])
+        hits = index.search(self.vectors[5], k=3, allowed_ids=[7, 8, 9])
+        self.assertEqual(sorted(item_id for item_id, _ in hits), [7, 8, 9])
+
+
+class TestSemanticSearch(unittest.TestCase):
+    """Tests de search_semantic sur une base réelle"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "memory.sqlite")
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+
+    def tearDown(self):
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+        semantic._indexes.clear()
+        semantic._unsaved.clear()
+
+    def test_search_semantic(self):
+        """Les items proches du sens de la requête passent en premier"""
+        save_item(type="note", content="Réunion budget avec le comptable jeudi", db_path=self.db_path)
+        save_item(type="note", content="Recette de la tarte aux pommes", db_path=self.db_path)
+        todo_id = save_item(type="todo", content="Préparer les réunions budgétaires", db_path=self.db_path)
+
+        results = search_semantic("reunion budget", k=2, db_path=self.db_path)
+        self.assertEqual(results[0]["content"], "Réunion budget avec le comptable jeudi")
+        self.assertIn("score", results[0])
+
+        results = search_semantic("reunion budget", k=5, type="todo", db_path=self.db_path)
+        self.assertEqual([item["id"] for item in results], [todo_id])
+
+    def test_incremental_sync(self):
+        """Seuls les items modifiés sont ré-encodés, les supprimés sont retirés"""
+        first = save_item(type="note", content="Appeler le plombier", db_path=self.db_path)
+        second = save_item(type="note", content="Acheter du pain", db_path=self.db_path)
+        self.assertEqual(sync_vector_index(self.db_path)["embedded"], 2)
+        self.assertEqual(sync_vector_index(self.db_path)["embedded"], 0)
+
+        update_item(first, content="Appeler l'électricien", db_path=self.db_path)
+        delete_item(second, db_path=self.db_path)
+        self.assertEqual(sync_vector_index(self.db_path), {"embedded": 1, "removed": 1})
+
+        results = search_semantic("électricien", k=5, db_path=self.db_path)
+        self.assertEqual([item["id"] for item in results], [first])
+
+    def test_search_reads_only_changes(self):
+        """Après la synchronisation initiale, une recherche ne relit que les items écrits depuis"""
+        save_item(type="note", content="Appeler le plombier", db_path=self.db_path)
+        sync_vector_index(self.db_path)
+
+        new_id = save_item(type="note", content="Réserver le restaurant", db_path=self.db_path)
+        with mock.patch("memory.vector.semantic.iter_items", side_effect=AssertionError("parcours complet")):
+            results = search_semantic("restaurant", k=1, db_path=self.db_path)
+        self.assertEqual([item["id"] for item in results], [new_id])
+
+    def test_changes_survive_reopen(self):
+        """Les changements non écrits sont réappliqués depuis le journal ; écrits, le journal est purgé"""
+        sync_vector_index(self.db_path)
+        item_id = save_item(type="note", content="Réserver le restaurant", db_path=self.db_path)
+        self.assertEqual(sync_vector_index(self.db_path)["embedded"], 1)
+
+        semantic._indexes.clear()  # redémarrage sans save_vector_indexes
+        self.assertEqual(sync_vector_index(self.db_path)["embedded"], 1)
+        save_vector_indexes()
+        conn = semantic.get_connection(self.db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM vector_changes").fetchone()[0], 0)
+
+        semantic._indexes.clear()
+        self.assertEqual(sync_vector_index(self.db_path), {"embedded": 0, "removed": 0})
+        self.assertIn(item_id, semantic.get_vector_index(self.db_path))
+
+    def test_search_after_hard_reset(self):
+        """Une base recréée (ids et seq réutilisés) ne réutilise pas l'index de l'ancienne"""
+        schema_path = str(Path(__file__).parent.parent / "memory" / "schema.sql")
+        save_item(type="note", content="banane pomme kiwi", db_path=self.db_path)
+        sync_vector_index(self.db_path)
+        save_item(type="note", content="cerise fraise", db_path=self.db_path)
+        sync_vector_index(self.db_path)  # changement appliqué, pas encore écrit
+
+        reset_memory(hard=True, db_path=self.db_path)
+        self.assertFalse(os.path.exists(semantic.index_dir_for(self.db_path)))
+        init_db(db_path=self.db_path, schema_path=schema_path)
+        item_id = save_item(type="note", content="voiture garage pneu", db_path=self.db_path)
+
+        # L'index périmé n'est pas écrit et ne purge pas le journal de la nouvelle base
+        save_vector_indexes()
+        conn = semantic.get_connection(self.db_path)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM vector_changes").fetchone()[0], 1)
+
+        self.assertEqual(search_semantic("banane", k=5, db_path=self.db_path), [])
+        results = search_semantic("voiture", k=5, db_path=self.db_path)
+        self.assertEqual([item["id"] for item in results], [item_id])
+
+        # Base recréée hors reset_memory, index laissé sur disque, redémarrage
+        save_vector_indexes()
+        close_connections(self.db_path)
+        os.remove(self.db_path)
+        semantic._indexes.clear()
+        init_db(db_path=self.db_path, schema_path=schema_path)
+        other_id = save_item(type="note", content="banane mangue", db_path=self.db_path)
+
+        self.assertEqual(search_semantic("voiture", k=5, db_path=self.db_path), [])
+        results = search_semantic("banane", k=5, db_path=self.db_path)
+        self.assertEqual([item["id"] for item in results], [other_id])
+
+
+if __name__ == '__main__':
+    unittest.main()
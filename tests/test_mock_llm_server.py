@@ -0,0 +1,117 @@
+# Tests pour le serveur LLM simulé
+"""
+Tests unitaires pour mock_llm_server.py (compatibilité avec le client OpenAI,
+streaming, appels de fonctions, latences, bascule des drivers)
+"""
+
+import unittest
+import os
+import json
+import random
+import tempfile
+from unittest import mock
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import yaml
+from fastapi.testclient import TestClient
+from openai import OpenAI
+
+from mock_llm_server import create_app, sample_latency
+from drivers.llm_driver import LLMDriver, LLMResilience
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "settings.yaml"
+
+
+def make_client(**settings):
+    """Client OpenAI branché directement sur l'application (sans réseau)"""
+    app = create_app(settings)
+    client = OpenAI(api_key="mock", base_url="http://testserver/v1", max_retries=0, http_client=TestClient(app))
+    return client, app
+
+
+class TestMockLLMServer(unittest.TestCase):
+    """Tests du serveur simulé"""
+
+    def test_scripted_memory_action(self):
+        """Une demande de note reçoit un bloc memory_action save_note avec le message"""
+        client, _ = make_client()
+        resp = client.chat.completions.create(
+            model="gpt-test", messages=[{"role": "user", "content": 'Note que "Paul" arrive lundi'}]
+        )
+        text = resp.choices[0].message.content
+        block = json.loads(text.split("```json")[1].split("```")[0])
+        self.assertEqual(block, {"memory_action": "save_note", "content": 'Note que "Paul" arrive lundi', "tags": ["mock"]})
+        self.assertEqual(resp.model, "gpt-test")
+        self.assertGreater(resp.usage.prompt_tokens, 0)
+
+    def test_streaming(self):
+        """Le flux SSE se reconstitue en la réponse complète, usage en dernier fragment"""
+        client, _ = make_client()
+        stream = client.chat.completions.create(
+            model="m", messages=[{"role": "user", "content": "liste les fichiers"}],
+            stream=True, stream_options={"include_usage": True},
+        )
+        chunks = list(stream)
+        text = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+        self.assertIn('"intent": "filesystem"', text)
+        self.assertGreater(len(chunks), 3)
+        self.assertIsNotNone(chunks[-1].usage)
+
+    def test_function_calling(self):
+        """Un outil proposé et scripté est appelé ; après son résultat, réponse texte"""
+        client, _ = make_client()
+        tools = [{"type": "function", "function": {"name": "list_dir", "parameters": {"type": "object"}}}]
+        messages = [{"role": "user", "content": "Que contient ce dossier ?"}]
+        resp = client.chat.completions.create(model="m", messages=messages, tools=tools)
+        call = resp.choices[0].message.tool_calls[0]
+        self.assertEqual(resp.choices[0].finish_reason, "tool_calls")
+        self.assertEqual((call.function.name, json.loads(call.function.arguments)), ("list_dir", {"path": "."}))
+
+        messages += [
+            resp.choices[0].message.model_dump(exclude_none=True),
+            {"role": "tool", "tool_call_id": call.id, "content": "a.txt\nb.txt"},
+        ]
+        resp = client.chat.completions.create(model="m", messages=messages, tools=tools)
+        self.assertIn("a.txt", resp.choices[0].message.content)
+
+    def test_error_injection_retried(self):
+        """Les erreurs injectées sont reprises par LLMResilience"""
+        client, app = make_client(error_rate=0.5, seed=3, default_words=5)
+        resilience = LLMResilience(max_retries=10, backoff_base=0)
+        for _ in range(5):
+            resilience.call(lambda: client.chat.completions.create(model="m", messages=[]), [], 0)
+        self.assertEqual(app.state.engine.requests, 5 + resilience.retries)
+        self.assertGreater(resilience.retries, 0)
+
+    def test_sample_latency(self):
+        """Les latences tirées respectent la loi et les bornes"""
+        rng = random.Random(0)
+        self.assertEqual(sample_latency({"mean_ms": 250}, rng), 0.25)
+        samples = [sample_latency({"distribution": "lognormal", "mean_ms": 100, "stddev_ms": 50, "max_ms": 300}, rng)
+                   for _ in range(2000)]
+        self.assertAlmostEqual(sum(samples) / len(samples), 0.1, delta=0.01)
+        self.assertLessEqual(max(samples), 0.3)
+        self.assertGreaterEqual(min(sample_latency({"distribution": "normal", "mean_ms": 1, "stddev_ms": 50}, rng)
+                                    for _ in range(100)), 0)
+
+    def test_driver_switch(self):
+        """Avec mock_llm.enabled, LLMDriver vise le serveur simulé sans OPENAI_API_KEY"""
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            cfg = yaml.safe_load(f)
+        cfg["mock_llm"]["enabled"] = True
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "settings.yaml")
+            with open(path, "w", encoding="utf-8") as f:
+                yaml.safe_dump(cfg, f)
+            with mock.patch.dict(os.environ):
+                os.environ.pop("OPENAI_API_KEY", None)
+                driver = LLMDriver(path)
+        self.assertEqual(str(driver.client.base_url), cfg["mock_llm"]["base_url"] + "/")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# Tests pour l'assemblage du prompt
+"""
+Tests unitaires pour utils/prompt.py et utils/tokens.py (budget, priorités, troncature)
+"""
+
+import unittest
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.prompt import assemble_prompt, MIN_CURRENT_TOKENS
+from utils.tokens import estimate_tokens, estimate_message_tokens, truncate_to_tokens, TRUNCATION_MARKER
+
+
+def message(role, words):
+    return {'role': role, 'content': ' '.join(['mot'] * words)}
+
+
+class TestAssemblePrompt(unittest.TestCase):
+    """Tests du budget de tokens"""
+
+    def test_truncate_to_tokens(self):
+        """Le texte tronqué tient dans le budget et porte le marqueur"""
+        text = "a" * 1000
+        self.assertEqual(truncate_to_tokens("court", 10), "court")
+        truncated = truncate_to_tokens(text, 20)
+        self.assertTrue(truncated.endswith(TRUNCATION_MARKER))
+        self.assertLessEqual(estimate_tokens(truncated), 20)
+        self.assertEqual(truncate_to_tokens(text, 0), "")
+
+    def test_everything_fits(self):
+        """Sous le budget, rien n'est retiré"""
+        history = [message('user', 5), message('assistant', 5)]
+        messages, metrics = assemble_prompt("system", history, message('user', 3), ["contexte"], token_budget=1000)
+        self.assertEqual(len(messages), 5)
+        self.assertEqual(messages[-1]['content'], "contexte")
+        self.assertEqual(metrics['tokens_saved'], 0)
+        self.assertEqual(metrics['tokens_after'], sum(estimate_message_tokens(m) for m in messages))
+
+    def test_priorities(self):
+        """L'historique ancien part avant le contexte, le contexte est tronqué avant le tour courant"""
+        history = [message('user', 100), message('assistant', 100), message('user', 20)]
+        current = message('user', 10)
+        big_file = "x" * 4000  # ~1000 tokens
+
+        messages, metrics = assemble_prompt("system", history, current, ["mémoire", big_file], token_budget=400)
+        self.assertEqual(messages[0]['content'], "system")
+        self.assertIn(current, messages)
+        self.assertEqual(messages[-2]['content'], "mémoire")
+        self.assertTrue(messages[-1]['content'].endswith(TRUNCATION_MARKER))
+        self.assertEqual(metrics['contexts_truncated'], 1)
+        self.assertEqual(metrics['history_dropped'], 3)
+        self.assertLessEqual(metrics['tokens_after'], 400)
+        self.assertGreater(metrics['tokens_saved'], 0)
+
+        # Sans le fichier : les messages récents reviennent, sans trou
+        messages, metrics = assemble_prompt("system", history, current, ["mémoire"], token_budget=200)
+        self.assertEqual(messages[1:4], history[1:] + [current])
+        self.assertEqual(metrics['history_dropped'], 1)
+
+    def test_system_prompt_over_budget(self):
+        """Un prompt système plus grand que le budget ne vide pas le tour courant"""
+        current = message('user', 20)
+        with self.assertLogs('utils.prompt', level='WARNING'):
+            messages, metrics = assemble_prompt(
+                "x" * 4000, [message('user', 5)], current, ["contexte"], token_budget=500
+            )
+        self.assertEqual(messages[-1], current)
+        self.assertEqual(len(messages), 2)
+        self.assertEqual((metrics['history_dropped'], metrics['contexts_dropped']), (1, 1))
+        self.assertTrue(metrics['over_budget'])
+
+        long_current = message('user', 2000)
+        messages, _ = assemble_prompt("x" * 4000, [], long_current, token_budget=500)
+        self.assertTrue(messages[-1]['content'])
+        self.assertLessEqual(estimate_message_tokens(messages[-1]), MIN_CURRENT_TOKENS)
+
+    def test_summary_placement(self):
+        """Le résumé suit le prompt système et part avant les contextes, pas avant l'historique récent"""
+        history = [message('user', 5)]
+        messages, _ = assemble_prompt("system", history, message('user', 3), ["contexte"], summary="résumé")
+        self.assertEqual([m['content'] for m in messages[:2]], ["system", "résumé"])
+        self.assertEqual(messages[-1]['content'], "contexte")
+
+        messages, metrics = assemble_prompt("system", [], message('user', 3), ["x" * 400], token_budget=130,
+                                            summary="y" * 400)
+        self.assertEqual(messages[-1]['content'], "x" * 400)
+        self.assertEqual(metrics['contexts_dropped'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
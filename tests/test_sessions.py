@@ -0,0 +1,183 @@
+# Tests pour les sessions
+"""
+Tests unitaires pour agents/sessions.py et agents/summarizer.py
+(isolation, LRU, réhydratation, concurrence, résumé glissant)
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+from unittest import mock
+import threading
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from memory.memory_core import init_db
+from memory.connection import close_connections
+from agents.sessions import SessionManager
+from agents.summarizer import ConversationSummarizer, extractive_summary, llm_summarizer
+from utils.tokens import estimate_tokens
+
+
+class TestSessionManager(unittest.TestCase):
+    """Tests du gestionnaire de sessions"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "memory.sqlite")
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+
+    def tearDown(self):
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+
+    def test_sessions_isolated_and_truncated(self):
+        """Chaque session a son historique, borné à max_history"""
+        manager = SessionManager(max_history=3, db_path=self.db_path)
+        alice, bob = manager.get("alice"), manager.get("bob")
+        for i in range(5):
+            alice.append("user", f"message {i}")
+        bob.append("user", "bonjour")
+
+        self.assertIs(manager.get("alice"), alice)
+        self.assertEqual([m["content"] for m in alice.history], ["message 2", "message 3", "message 4"])
+        self.assertEqual(bob.history, [{"role": "user", "content": "bonjour"}])
+
+    def test_zero_history(self):
+        """max_history <= 0 : aucun message gardé, tous confiés au résumeur"""
+        summarizer = mock.Mock()
+        for max_history in (0, -1):
+            manager = SessionManager(max_history=max_history, db_path=self.db_path, summarizer=summarizer)
+            state = manager.get(f"session {max_history}")
+            state.append("user", "bonjour")
+            state.append("assistant", "salut")
+            self.assertEqual(state.history, [])
+            self.assertEqual(SessionManager(max_history=max_history, db_path=self.db_path).get(state.session_id).history, [])
+        self.assertEqual(summarizer.submit.call_count, 4)
+
+    def test_max_history_boundary(self):
+        """max_history = 1 : seul le dernier message reste"""
+        state = SessionManager(max_history=1, db_path=self.db_path).get("alice")
+        state.append("user", "a")
+        state.append("assistant", "b")
+        self.assertEqual(state.history, [{"role": "assistant", "content": "b"}])
+
+    def test_rehydration_after_eviction(self):
+        """Une session évincée (taille ou redémarrage) est rechargée depuis la base"""
+        manager = SessionManager(max_sessions=1, max_history=3, db_path=self.db_path)
+        state = manager.get("alice")
+        for i in range(4):
+            state.append("user" if i % 2 == 0 else "assistant", f"message {i}")
+        del state
+        manager.get("bob")  # évince alice
+
+        restarted = SessionManager(max_history=3, db_path=self.db_path)
+        for current in (manager, restarted):
+            history = current.get("alice").history
+            self.assertEqual([m["content"] for m in history], ["message 1", "message 2", "message 3"])
+            self.assertEqual(history[0]["role"], "assistant")
+
+        manager.delete("alice")
+        self.assertEqual(SessionManager(db_path=self.db_path).get("alice").history, [])
+
+    def test_live_state_survives_eviction(self):
+        """Un état encore utilisé n'est jamais dupliqué, même évincé du cache"""
+        manager = SessionManager(max_sessions=1, db_path=self.db_path)
+        alice = manager.get("alice")
+        manager.get("bob")
+        self.assertIs(manager.get("alice"), alice)
+
+    def test_concurrent_appends(self):
+        """Des tours concurrents sur une même session ne perdent aucun message"""
+        manager = SessionManager(max_history=200, db_path=self.db_path)
+
+        def worker(n):
+            for i in range(20):
+                state = manager.get("partagée")
+                with state.lock:
+                    state.append("user", f"{n}-{i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(manager.get("partagée").history), 100)
+        self.assertEqual(len(SessionManager(max_history=200, db_path=self.db_path).get("partagée").history), 100)
+
+
+class TestSummarizer(unittest.TestCase):
+    """Tests du résumé glissant"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "memory.sqlite")
+        schema_path = Path(__file__).parent.parent / "memory" / "schema.sql"
+        init_db(db_path=self.db_path, schema_path=str(schema_path))
+
+    def tearDown(self):
+        close_connections(self.db_path)
+        shutil.rmtree(self.temp_dir)
+
+    def test_extractive_summary_bounded(self):
+        """Le résumé extractif garde les phrases centrales, dans le budget"""
+        messages = [
+            {'role': 'user', 'content': "Je prépare le budget du voyage au Japon. Il fait beau."},
+            {'role': 'assistant', 'content': "Le budget du voyage au Japon est noté."},
+        ] * 20
+        summary = extractive_summary("", messages, max_tokens=30)
+        self.assertLessEqual(estimate_tokens(summary) + summary.count("\n"), 30)
+        self.assertEqual(summary.splitlines(), [
+            "Utilisateur : Je prépare le budget du voyage au Japon.",
+            "Clara : Le budget du voyage au Japon est noté.",
+        ])
+
+    def test_background_summary_persisted(self):
+        """Les messages évincés sont résumés hors requête, le résumé est réhydraté"""
+        summarizer = ConversationSummarizer(max_tokens=100)
+        manager = SessionManager(max_history=2, db_path=self.db_path, summarizer=summarizer)
+        state = manager.get("alice")
+        state.append("user", "Mon chat s'appelle Pixel.")
+        state.append("assistant", "Enchantée, Pixel !")
+        state.append("user", "Quelle heure est-il ?")
+        summarizer.flush()
+        self.assertEqual(state.summary, "Utilisateur : Mon chat s'appelle Pixel.")
+
+        restarted = SessionManager(max_history=2, db_path=self.db_path)
+        self.assertEqual(restarted.get("alice").summary, state.summary)
+        manager.delete("alice")
+        self.assertEqual(restarted._load("alice").summary, "")
+        manager.shutdown()
+
+    def test_llm_summary_fallback(self):
+        """Le résumé LLM remplace le précédent ; une erreur LLM retombe sur l'extractif"""
+        prompts = []
+
+        def generate(messages):
+            prompts.append(messages)
+            return {'text': "  Résumé LLM  ", 'usage': None}
+
+        summarize = llm_summarizer(generate)
+        self.assertEqual(summarize("Ancien", [{'role': 'user', 'content': "Bonjour"}], 50), "Résumé LLM")
+        self.assertIn("Ancien", prompts[0][1]['content'])
+
+        def failing(messages):
+            raise RuntimeError("API indisponible")
+
+        summarizer = ConversationSummarizer(llm_summarizer(failing))
+        state = SessionManager(max_history=1, db_path=self.db_path, summarizer=summarizer).get("bob")
+        state.append("user", "Rappelle-moi le dentiste.")
+        state.append("user", "Merci.")
+        summarizer.flush()
+        self.assertEqual(state.summary, "Utilisateur : Rappelle-moi le dentiste.")
+        summarizer.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# Tests pour le streaming
+"""
+Tests unitaires pour agents/streaming.py (filtrage incrémental des blocs d'action)
+"""
+
+import unittest
+from pathlib import Path
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.streaming import ActionBlockFilter
+
+
+def stream(text, size=1):
+    """Passe text au filtre par fragments de size caractères, retourne (prose, filtre)"""
+    action_filter = ActionBlockFilter()
+    out = [action_filter.feed(text[i:i + size]) for i in range(0, len(text), size)]
+    out.append(action_filter.flush())
+    return "".join(out), action_filter
+
+
+class TestActionBlockFilter(unittest.TestCase):
+    """Tests du filtre de blocs d'action"""
+
+    def test_fenced_action_held_back(self):
+        """Un bloc ```json d'action est retenu, la prose autour est transmise"""
+        block = '```json\n{"memory_action": "save_note", "content": "a } b"}\n```'
+        for size in (1, 3, 7, 1000):
+            prose, action_filter = stream(f"C'est noté !\n{block}\nÀ bientôt.", size)
+            self.assertEqual(prose, "C'est noté !\n\nÀ bientôt.")
+            self.assertEqual(action_filter.blocks, [block])
+
+    def test_bare_action_held_back(self):
+        """Un objet JSON nu d'action est retenu ; les autres accolades sont transmises"""
+        text = 'Je lis le fichier. {"intent": "filesystem", "action": "read", "path": "{x}.txt"} Voilà {nom}.'
+        prose, action_filter = stream(text)
+        self.assertEqual(prose, "Je lis le fichier.  Voilà {nom}.")
+        self.assertEqual(len(action_filter.blocks), 1)
+
+    def test_code_and_inline_ticks_forwarded(self):
+        """Code non-JSON et code en ligne sont transmis tels quels"""
+        text = "Utilise `ls` ou ``pwd`` :\n```bash\necho {a}\n```\nFin"
+        prose, action_filter = stream(text)
+        self.assertEqual(prose, text)
+        self.assertEqual(action_filter.blocks, [])
+
+    def test_first_prose_not_delayed(self):
+        """La prose est transmise dès réception, un bloc ouvert est retenu jusqu'à sa fin"""
+        action_filter = ActionBlockFilter()
+        self.assertEqual(action_filter.feed("Bonjour"), "Bonjour")
+        self.assertEqual(action_filter.feed(" ``"), " ")
+        self.assertEqual(action_filter.feed('`json {"a": 1'), "")
+        self.assertEqual(action_filter.feed("}``` ok"), " ok")
+        self.assertEqual(action_filter.blocks, ['```json {"a": 1}```'])
+
+    def test_unterminated_block_flushed(self):
+        """Un bloc jamais fermé est rendu à la fin du flux"""
+        prose, _ = stream("Voici { une accolade")
+        self.assertEqual(prose, "Voici { une accolade")
+
+
+if __name__ == '__main__':
+    unittest.main()
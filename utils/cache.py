@@ -0,0 +1,111 @@
+# Clara - Cache LRU
+"""
+Cache en mémoire borné (LRU) avec expiration optionnelle (TTL)
+Thread-safe, avec compteurs hits / misses
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """Cache LRU borné en taille, avec TTL optionnel par entrée"""
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None):
+        """
+        Args:
+            max_size: Nombre maximum d'entrées (les moins récemment utilisées sont évincées)
+            ttl: Durée de vie d'une entrée en secondes (None = pas d'expiration)
+        """
+        if max_size <= 0:
+            raise ValueError("max_size doit être > 0")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retourne la valeur en cache (et la marque récente), ou default"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Ajoute ou remplace une entrée (ttl surcharge le TTL par défaut)"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Retire une entrée et retourne sa valeur (sans compter de hit/miss)"""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def invalidate(self, key: Hashable) -> None:
+        """Retire une entrée si présente"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Retire toutes les entrées dont la clé vérifie predicate, retourne leur nombre"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._lock:
+            self._data.clear()
+
+    def keys(self) -> list:
+        """Clés présentes, de la moins à la plus récemment utilisée"""
+        with self._lock:
+            return list(self._data.keys())
+
+    def stats(self) -> dict:
+        """Compteurs du cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
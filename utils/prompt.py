@@ -0,0 +1,118 @@
+# Clara - Assemblage du prompt
+"""
+Assemblage d'un prompt chat sous budget de tokens
+
+Priorités, de la plus haute à la plus basse :
+system > tour courant > contexte injecté (mémoire, fichiers) > résumé de la
+conversation > historique ancien.
+Le prompt système est toujours conservé ; le tour courant et les contextes sont
+tronqués si nécessaire (le tour courant garde au moins MIN_CURRENT_TOKENS, même
+si le prompt système dépasse à lui seul le budget) ; l'historique est gardé du plus récent au plus ancien,
+sans trou, tant qu'il tient dans le budget restant.
+"""
+
+import logging
+from typing import Optional
+
+from utils.tokens import estimate_message_tokens, truncate_to_tokens, MESSAGE_OVERHEAD_TOKENS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPT_TOKEN_BUDGET = 8000
+
+# Part du tour courant toujours préservée : la question n'est jamais vidée
+MIN_CURRENT_TOKENS = 200
+
+# En dessous, un contexte tronqué n'apporte plus rien : il est abandonné
+MIN_CONTEXT_TOKENS = 50
+
+
+def assemble_prompt(
+    system_prompt: str,
+    history: list[dict],
+    current: Optional[dict] = None,
+    contexts: Optional[list[str]] = None,
+    token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET,
+    summary: Optional[str] = None
+) -> tuple[list[dict], dict]:
+    """
+    Construit la liste de messages envoyée au LLM dans un budget de tokens
+
+    Args:
+        system_prompt: Prompt système (jamais tronqué)
+        history: Messages précédents, du plus ancien au plus récent
+        current: Message du tour courant (si fourni)
+        contexts: Blocs de contexte (messages system), par priorité décroissante
+        token_budget: Budget total estimé du prompt
+        summary: Résumé des échanges sortis de l'historique (message system)
+
+    Returns:
+        (messages, métriques) ; messages dans l'ordre system, résumé, historique,
+        tour courant, contextes. Métriques : {token_budget, tokens_before,
+        tokens_after, tokens_saved, history_dropped, contexts_truncated, contexts_dropped,
+        over_budget} ; over_budget : le prompt dépasse le budget (prompt système trop long)
+    """
+    system = {'role': 'system', 'content': system_prompt}
+    context_messages = [{'role': 'system', 'content': text} for text in contexts or [] if text]
+    summary_messages = [{'role': 'system', 'content': summary}] if summary else []
+    remaining = token_budget - estimate_message_tokens(system)
+    tokens_before = estimate_message_tokens(system) + sum(
+        estimate_message_tokens(m)
+        for m in summary_messages + history + context_messages + ([current] if current else [])
+    )
+
+    if remaining < MIN_CURRENT_TOKENS:
+        logger.warning(
+            f"Prompt système de {estimate_message_tokens(system)} tokens pour un budget de {token_budget} : "
+            f"tour courant réduit à {MIN_CURRENT_TOKENS} tokens, historique et contextes abandonnés"
+        )
+
+    # Tour courant : conservé, tronqué seulement s'il dépasse à lui seul le budget
+    if current:
+        current = _fit(current, max(remaining, MIN_CURRENT_TOKENS))
+        remaining -= estimate_message_tokens(current)
+
+    # Contextes par priorité, puis résumé : entiers, tronqués, ou abandonnés
+    kept_contexts, kept_summary, truncated, dropped = [], [], 0, 0
+    blocks = [(m, kept_contexts) for m in context_messages] + [(m, kept_summary) for m in summary_messages]
+    for message, kept in blocks:
+        cost = estimate_message_tokens(message)
+        if cost <= remaining:
+            kept.append(message)
+            remaining -= cost
+        elif remaining - MESSAGE_OVERHEAD_TOKENS >= MIN_CONTEXT_TOKENS:
+            message = _fit(message, remaining)
+            kept.append(message)
+            remaining -= estimate_message_tokens(message)
+            truncated += 1
+        else:
+            dropped += 1
+
+    # Historique : du plus récent au plus ancien, sans trou
+    kept_history = []
+    for message in reversed(history):
+        cost = estimate_message_tokens(message)
+        if cost > remaining:
+            break
+        kept_history.append(message)
+        remaining -= cost
+    kept_history.reverse()
+
+    messages = [system] + kept_summary + kept_history + ([current] if current else []) + kept_contexts
+    tokens_after = sum(estimate_message_tokens(m) for m in messages)
+    return messages, {
+        'token_budget': token_budget,
+        'tokens_before': tokens_before,
+        'tokens_after': tokens_after,
+        'tokens_saved': tokens_before - tokens_after,
+        'history_dropped': len(history) - len(kept_history),
+        'contexts_truncated': truncated,
+        'contexts_dropped': dropped,
+        'over_budget': tokens_after > token_budget,
+    }
+
+
+def _fit(message: dict, max_tokens: int) -> dict:
+    """Copie du message dont le contenu tient dans max_tokens (surcoût inclus)"""
+    content = truncate_to_tokens(message['content'], max_tokens - MESSAGE_OVERHEAD_TOKENS)
+    return message if content == message['content'] else {**message, 'content': content}
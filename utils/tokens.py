@@ -0,0 +1,55 @@
+# Clara - Estimation de tokens
+"""
+Estimation rapide du nombre de tokens d'un texte (sans tokenizer)
+"""
+
+import math
+
+# Moyenne observée pour du français / anglais avec les tokenizers OpenAI
+CHARS_PER_TOKEN = 4.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estime le nombre de tokens d'un texte
+
+    Args:
+        text: Texte à estimer
+
+    Returns:
+        Nombre de tokens estimé (0 pour un texte vide)
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+# Surcoût par message d'un prompt chat (rôle, séparateurs)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+TRUNCATION_MARKER = " […]"
+
+
+def estimate_message_tokens(message: dict) -> int:
+    """Estime le coût d'un message chat {role, content} dans le prompt"""
+    return estimate_tokens(message.get('content') or '') + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Tronque un texte pour que son estimation tienne dans max_tokens
+
+    Args:
+        text: Texte à tronquer
+        max_tokens: Budget en tokens
+
+    Returns:
+        Le texte inchangé s'il tient, sinon son début suivi de TRUNCATION_MARKER
+        ("" si le budget ne laisse pas de place)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = int(max_tokens * CHARS_PER_TOKEN) - len(TRUNCATION_MARKER)
+    if limit <= 0:
+        return ""
+    return text[:limit].rstrip() + TRUNCATION_MARKER